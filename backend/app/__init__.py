@@ -31,11 +31,42 @@ def create_app(config_class=Config):
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
-    CORS(app, resources={r"/*": {"origins": ["http://localhost:3000", "http://localhost:3001"], "supports_credentials": True}})
+    CORS(app, resources={r"/*": {"origins": ["http://localhost:3000", "http://localhost:3001"], "supports_credentials": True,
+                                 "expose_headers": ["X-Next-Cursor", "Link"]}})
     
     # Setup Flask-Login
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+
+    # Setup the shared scraper services
+    from app.services.chrome_profiles import chrome_profiles
+    from app.services.driver_pool import driver_pool
+    from app.services.html_parser import html_parser
+    from app.services.http_extractor import http_extractor
+    from app.services.load_profile import load_profile
+    from app.services.order_events import order_events
+    from app.services.product_cache import product_cache
+    from app.services.readiness import page_readiness
+    from app.services.replay import replay
+    from app.services.resilience import retailer_guard
+    from app.services.retailers import retailers
+    from app.services.scrape_jobs import scrape_jobs
+    from app.services.selector_stats import selector_stats
+    from app.services.thumbnails import thumbnails
+    chrome_profiles.init_app(app)
+    driver_pool.init_app(app)
+    html_parser.init_app(app)
+    http_extractor.init_app(app)
+    load_profile.init_app(app)
+    order_events.init_app(app)
+    product_cache.init_app(app)
+    page_readiness.init_app(app)
+    replay.init_app(app)
+    retailer_guard.init_app(app)
+    retailers.init_app(app)
+    scrape_jobs.init_app(app)
+    selector_stats.init_app(app)
+    thumbnails.init_app(app)
     
     @login_manager.user_loader
     def load_user(user_id):
@@ -56,15 +87,36 @@ def create_app(config_class=Config):
     from app.routes.auth import auth_bp
     from app.routes.scraper import scraper_bp
     from app.routes.products import products_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.images import images_bp
+    from app.routes.events import events_bp
     
     # Register blueprints
     app.register_blueprint(orders_bp, url_prefix='/orders')
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(scraper_bp, url_prefix='/scrape')
     app.register_blueprint(products_bp, url_prefix='/products')
+    app.register_blueprint(metrics_bp, url_prefix='/metrics')
+    app.register_blueprint(images_bp, url_prefix='/images')
+    app.register_blueprint(events_bp, url_prefix='/events')
     
     # Create tables
     with app.app_context():
         db.create_all()
+
+    from app.services.order_expiry import order_expiry
+    from app.services.price_refresh import price_refresher
+    order_expiry.init_app(app)
+    price_refresher.init_app(app)
+
+    @app.cli.command('refresh-prices')
+    def refresh_prices():
+        """Re-scrape one batch of stale, in-demand products."""
+        print(price_refresher.run_once())
+
+    @app.cli.command('expire-orders')
+    def expire_orders():
+        """Move open orders past their expiry time to 'expired'."""
+        print(order_expiry.run_once())
     
     return app
\ No newline at end of file
@@ -72,6 +72,8 @@ class Order(db.Model):
     """
     
     __tablename__ = 'orders'
+    # Serves the /orders/available feed: open orders by expiry
+    __table_args__ = (db.Index('ix_orders_status_expiry_time', 'status', 'expiry_time'),)
 
     id = db.Column(db.Integer, primary_key=True)
     buyer_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -111,4 +113,82 @@ class OrderAssignment(db.Model):
     carrier_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(20), default='assigned') # assigned, in_progress, ready_for_pickup, completed
     accepted_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    completed_at = db.Column(db.DateTime, nullable=True)
\ No newline at end of file
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+class ScrapeJob(db.Model):
+    """ScrapeJob model backing the durable scrape queue.
+
+    The web tier inserts a row per URL and standalone workers (``worker.py``)
+    lease rows, scrape them and record the outcome. A lease that isn't
+    completed before ``lease_expires_at`` makes the job visible to other
+    workers again; failures are retried with backoff until ``max_attempts``,
+    after which the job is dead-lettered.
+
+    Attributes:
+        id (str): Primary key (opaque hex job ID)
+        url (str): Product URL to scrape
+        status (str): Job status
+            ('queued', 'running', 'succeeded', 'dead')
+        attempts (int): Number of times a worker has leased the job
+        max_attempts (int): Attempts allowed before dead-lettering
+        available_at (datetime): Earliest time the job may be leased
+        leased_by (str): Identifier of the worker holding the lease
+        lease_expires_at (datetime): When the current lease runs out
+        result (JSON): Product data once succeeded
+        error (str): Last failure message
+        callback_url (str): Optional URL notified when the job finishes
+        created_at (datetime): Job creation timestamp
+        finished_at (datetime): When the job succeeded or was dead-lettered
+    """
+
+    __tablename__ = 'scrape_jobs'
+    __table_args__ = (
+        db.Index('ix_scrape_jobs_status_available_at', 'status', 'available_at'),
+        # Finds running jobs whose lease has expired
+        db.Index('ix_scrape_jobs_status_lease_expires_at', 'status', 'lease_expires_at'),
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    url = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued') # queued, running, succeeded, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    available_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    leased_by = db.Column(db.String(120), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    callback_url = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'status': self.status,
+            'attempts': self.attempts,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+class ProductDemand(db.Model):
+    """Recent product lookups, shared by every process that serves them.
+
+    Web and worker processes add their lookup counts to ``score`` every
+    ``SCRAPER_PRODUCT_DEMAND_FLUSH`` seconds; the price refresher reads the
+    scores and decays them once per cycle, so old spikes fade out.
+
+    Attributes:
+        url (str): Primary key (canonical product URL)
+        score (float): Decayed number of lookups
+        updated_at (datetime): When lookups were last added
+    """
+
+    __tablename__ = 'product_demand'
+
+    url = db.Column(db.String(500), primary_key=True)
+    score = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
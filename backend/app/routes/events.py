@@ -0,0 +1,122 @@
+import json
+
+from flask import Blueprint, Response, jsonify, request
+from app.services.order_events import order_events
+
+try:
+    from flask_sock import Sock
+except ImportError:  # The WebSocket endpoint is only available with flask-sock
+    Sock = None
+
+events_bp = Blueprint('events', __name__)
+
+# How long EventSource clients wait before reconnecting, in milliseconds
+RETRY_MS = 3000
+
+def _subscription_args():
+    """Read the stream filters and resume point from the request.
+
+    Raises:
+        ValueError: If ``order_id`` or the last event ID isn't an integer
+    """
+    store_name = request.args.get('store_name') or None
+    order_ids = [
+        int(order_id)
+        for value in request.args.getlist('order_id')
+        for order_id in value.split(',') if order_id.strip()
+    ]
+    # Browsers resend the header on reconnect; the query string works for the first connect
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return store_name, order_ids, int(last_event_id) if last_event_id else None
+
+def _payload(event):
+    return dict(event['data'], created_at=event['created_at'])
+
+def _sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(_payload(event))}\n\n"
+
+def _resync():
+    return f"event: resync\ndata: {json.dumps({'reason': 'Missed events are no longer available'})}\n\n"
+
+@events_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """Stream order events as Server-Sent Events.
+
+    Query Parameters:
+        store_name (str): Only events for orders from this store
+        order_id (int): Only events for this order; repeat or comma-separate for several
+        last_event_id (int): Resume after this event (the ``Last-Event-ID`` header takes precedence)
+
+    Sends ``order.created``, ``order.accepted`` and ``order.status_changed``
+    events with the order as JSON data. A ``resync`` event means events were
+    missed and the client should reload the orders it shows.
+
+    Returns:
+        text/event-stream response, or 400 JSON for invalid parameters
+    """
+    try:
+        store_name, order_ids, last_event_id = _subscription_args()
+    except ValueError:
+        return jsonify({"error": "order_id and Last-Event-ID must be integers"}), 400
+
+    subscription, backlog, missed = order_events.subscribe(store_name, order_ids, last_event_id)
+
+    def stream():
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            if missed:
+                yield _resync()
+            for event in backlog:
+                yield _sse(event)
+            while True:
+                # A subscriber that fell too far behind gets what it has queued, then reconnects
+                event = subscription.get(0 if subscription.overflowed else order_events.heartbeat)
+                if event:
+                    yield _sse(event)
+                elif subscription.overflowed:
+                    break
+                else:
+                    yield ": keep-alive\n\n"
+        finally:
+            order_events.unsubscribe(subscription)
+
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Keep nginx from buffering the stream
+    })
+
+@events_bp.route('/stats', methods=['GET'])
+def event_stats():
+    """Report connected subscribers and published event counts."""
+    return jsonify(order_events.stats()), 200
+
+if Sock is not None:
+    sock = Sock()
+
+    @sock.route('/ws', bp=events_bp)
+    def event_socket(ws):
+        """Send order events over a WebSocket, one JSON message per event.
+
+        Takes the same query parameters as ``/events/stream``. Messages are
+        ``{"id", "type", "data"}``; a ``resync`` message means events were missed.
+        """
+        try:
+            store_name, order_ids, last_event_id = _subscription_args()
+        except ValueError:
+            ws.send(json.dumps({"type": "error", "error": "order_id and last_event_id must be integers"}))
+            return
+
+        subscription, backlog, missed = order_events.subscribe(store_name, order_ids, last_event_id)
+        try:
+            if missed:
+                ws.send(json.dumps({"type": "resync"}))
+            for event in backlog:
+                ws.send(json.dumps({"id": event['id'], "type": event['type'], "data": _payload(event)}))
+            while ws.connected:
+                event = subscription.get(0 if subscription.overflowed else order_events.heartbeat)
+                if event:
+                    ws.send(json.dumps({"id": event['id'], "type": event['type'], "data": _payload(event)}))
+                elif subscription.overflowed:
+                    break
+        finally:
+            order_events.unsubscribe(subscription)
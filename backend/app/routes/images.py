@@ -0,0 +1,29 @@
+import os
+
+from flask import Blueprint, jsonify, send_file
+from app.services.thumbnails import DIGEST_RE, thumbnails
+
+images_bp = Blueprint('images', __name__)
+
+# Thumbnails are content-addressed, so a digest's bytes never change
+ONE_YEAR = 365 * 24 * 3600
+
+@images_bp.route('/<digest>', methods=['GET'])
+def get_thumbnail(digest):
+    """Serve a product thumbnail by the SHA-256 digest of its content.
+    
+    Returns:
+        JPEG thumbnail with an ETag and an immutable one-year ``Cache-Control``;
+        304 when the client's ``If-None-Match`` matches, 404 if unknown
+    """
+    if not DIGEST_RE.match(digest) or not thumbnails.root:
+        return jsonify({"error": "Image not found"}), 404
+
+    path = thumbnails.path_for(digest)
+    if not os.path.exists(path):
+        return jsonify({"error": "Image not found"}), 404
+
+    response = send_file(path, mimetype='image/jpeg', etag=digest, conditional=True, max_age=ONE_YEAR)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
@@ -0,0 +1,14 @@
+from flask import Blueprint, Response
+from app.services.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('', methods=['GET'])
+def prometheus_metrics():
+    """Expose scraper phase timings in the Prometheus text format.
+    
+    Returns:
+        text/plain response with ``scraper_phase_seconds``, ``scraper_scrape_seconds``
+        and ``scraper_selector_seconds`` histograms for this process
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
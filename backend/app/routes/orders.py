@@ -15,18 +15,82 @@ Additional statuses:
 - expired: Order wasn't accepted within time limit
 """
 
-from flask import Blueprint, request, jsonify
+import base64
+import json
+
+from flask import Blueprint, current_app, request, jsonify, url_for
 from flask_login import login_required, current_user
-from app.models import db, Order, User
+from app.models import db, Order, OrderAssignment, User
 from datetime import datetime, timedelta, timezone
-from app.services.selenium_scraper import (
-    scrape_target_product,
-    scrape_trader_joes_product,
-    create_driver
-)
+from sqlalchemy import insert, tuple_
+from app.services.order_events import order_data, order_events
+from app.services.product_cache import product_cache
+from app.services.resilience import CircuitOpenError
+from app.services.retailers import retailers
+from app.services.selenium_scraper import scrape_products
+from app.services.thumbnails import thumbnails
+from app.utils.urls import canonicalize_url
+from app.utils.validators import is_valid_retailer_url
 
 orders_bp = Blueprint('orders', __name__)
 
+BATCH_MODES = ('best_effort', 'atomic')
+
+AVAILABLE_PAGE_SIZE = 50
+AVAILABLE_MAX_PAGE_SIZE = 200
+
+def _encode_cursor(order):
+    """Return an opaque cursor pointing just past ``order`` in the available feed."""
+    position = json.dumps([order.expiry_time.isoformat(), order.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(position).decode('ascii').rstrip('=')
+
+def _decode_cursor(cursor):
+    """Return the ``(expiry_time, id)`` a cursor points past; raises ValueError if malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        expiry_time, order_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(expiry_time), int(order_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {str(e)}") from e
+
+def _insert_orders(rows, atomic):
+    """Insert ``rows`` as orders in one transaction and return their IDs.
+
+    Uses a single multi-row ``INSERT ... RETURNING``. If that fails in
+    best-effort mode, the rows are retried one by one in savepoints so a
+    bad row doesn't sink the rest, still committing only once.
+
+    Args:
+        rows: Column values for each order
+        atomic: Raise instead of creating only the rows that can be inserted
+
+    Returns:
+        list: The new order ID for each row, or the exception that kept it
+            from being inserted
+    """
+    if not rows:
+        return []
+    statement = insert(Order).returning(Order.id, sort_by_parameter_order=True)
+    try:
+        order_ids = db.session.execute(statement, rows).scalars().all()
+        db.session.commit()
+        return order_ids
+    except Exception as e:
+        db.session.rollback()
+        if atomic:
+            raise
+        print(f"Bulk order insert failed, retrying row by row: {str(e)}")
+
+    order_ids = []
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                order_ids.append(db.session.execute(insert(Order).returning(Order.id), [row]).scalar_one())
+        except Exception as e:
+            order_ids.append(e)
+    db.session.commit()
+    return order_ids
+
 @orders_bp.route('/test', methods=['GET'])
 def test_route():
     """Test endpoint to verify the orders blueprint is working.
@@ -44,22 +108,22 @@ def fetch_product_info():
     if not product_url:
         return jsonify({"error": "Missing URL"}), 400
     
-    if not validate_retailer_urls(product_url):
+    if not is_valid_retailer_url(product_url):
         return jsonify({"error": "Invalid retailer URL"}), 400
 
     try:
-        if 'target.com' in product_url:
-            product_info = scrape_target_product(product_url)
-        elif 'ralphs.com' in product_url:
-            product_info = scrape_ralphs_product(product_url)
-        elif 'traderjoes.com' in product_url:
-            product_info = scrape_trader_joes_product(product_url)
-        else:
-            return jsonify({"error": "Scraper not available for this retailer"}), 400
+        product_info = product_cache.lookup(product_url)
+        # Clients read the scraper's image_url key, which Product.to_dict() calls image
+        return jsonify(dict(product_info, image_url=product_info.get('image'))), 200
 
-        return jsonify(product_info), 200
+    except ValueError:
+        return jsonify({"error": "Scraper not available for this retailer"}), 400
+
+    except CircuitOpenError as e:
+        return jsonify({"error": str(e)}), 503
 
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
 @orders_bp.route('/batch_create', methods=['POST'])
@@ -76,13 +140,22 @@ def batch_create_orders():
                 "url": str,      # Product URL
                 "quantity": int   # Quantity to order
             }
-        ]
+        ],
+        "mode": str               # Optional: 'best_effort' (default) or 'atomic'
     }
     
+    Products are looked up in the product cache first; pages that still
+    need scraping are scraped concurrently (up to SCRAPER_BATCH_CONCURRENCY
+    at a time). All orders are then inserted in a single transaction with
+    one multi-row INSERT. In ``best_effort`` mode every product that could
+    be scraped gets its order; in ``atomic`` mode nothing is created unless
+    every product can be. ``results`` reports ``ok``, ``error`` or
+    ``skipped`` for every submitted product, in the order they were submitted.
+    
     Returns:
         tuple: JSON response with created orders and status code
             201: Orders created successfully
-            400: Invalid request
+            400: Invalid request, or an atomic batch with a failed product
             500: Server error
     """
     try:
@@ -99,73 +172,138 @@ def batch_create_orders():
         if not isinstance(data['products'], list) or not data['products']:
             return jsonify({"error": "Products must be a non-empty list"}), 400
 
-        # Create a driver for scraping
-        driver = create_driver()
-        created_orders = []
-
-        try:
-            # Process each product
-            for product in data['products']:
-                url = product.get('url')
-                quantity = product.get('quantity', 1)
+        mode = data.get('mode', 'best_effort')
+        if mode not in BATCH_MODES:
+            return jsonify({"error": f"mode must be one of: {', '.join(BATCH_MODES)}"}), 400
+        atomic = mode == 'atomic'
 
-                if not url:
-                    continue
+        # Only pages of registered retailers can be scraped
+        scrapable = {
+            i for i, product in enumerate(data['products'])
+            if isinstance(product, dict) and isinstance(product.get('url'), str)
+            and retailers.for_url(product['url'])
+        }
 
-                # Scrape product information
+        # Resolve products from the cache first so each missing page is scraped once
+        lookups = {}
+        urls_by_key = {}
+        for index in sorted(scrapable):
+            url = data['products'][index]['url']
+            key = canonicalize_url(url)
+            if key not in lookups:
+                cached = product_cache.get(url)
+                lookups[key] = {"ok": True, "info": cached} if cached else None
+                urls_by_key[key] = url
+
+        # Scrape the misses concurrently, one pooled browser per page
+        missing = [key for key, outcome in lookups.items() if outcome is None]
+        scraped = scrape_products(
+            [urls_by_key[key] for key in missing],
+            max_workers=current_app.config['SCRAPER_BATCH_CONCURRENCY']
+        )
+        for key, outcome in zip(missing, scraped):
+            if outcome['ok']:
                 try:
-                    if 'target.com' in url:
-                        product_info = scrape_target_product(url, driver)
-                    elif 'traderjoes.com' in url:
-                        product_info = scrape_trader_joes_product(url, driver)
-                    else:
-                        continue
-
-                    # Create order with scraped information
-                    store_name = 'Target' if 'target.com' in url else 'Trader Joes'
-
-                    order = Order(
-                        buyer_id=current_user.id,
-                        store_name=store_name,
-                        items=[{
-                            'name': product_info['name'],
-                            'quantity': quantity,
-                            'price': product_info['price']
-                        }],
-                        delivery_address=data['delivery_address'],
-                        status='open',
-                        expiry_time=datetime.now(timezone.utc) + timedelta(hours=24),
-                        product_page_url=url,
-                        product_image_url=product_info.get('image_url')
-                    )
-
-                    db.session.add(order)
-                    db.session.commit()  # Commit to get the order ID
-                    created_orders.append({
-                        "id": order.id,
-                        "url": url,
-                        "name": product_info['name'],
-                        "quantity": quantity,
-                        "price": product_info['price'],
-                        "store": store_name,
-                        "status": order.status
-                    })
-
+                    outcome = {"ok": True, "info": product_cache.put(outcome['url'], outcome['info'])}
                 except Exception as e:
-                    print(f"Error processing {url}: {str(e)}")
-                    continue
+                    db.session.rollback()
+                    outcome = {"ok": False, "error": str(e)}
+            lookups[key] = outcome
+
+        results = []
+        pending = []
+        expiry_time = datetime.now(timezone.utc) + timedelta(hours=24)
+
+        # Collect the orders to create, in the same order the products were submitted
+        for index, product in enumerate(data['products']):
+            if not isinstance(product, dict):
+                results.append({
+                    "index": index,
+                    "url": None,
+                    "status": "error",
+                    "error": "Product must be an object with a url"
+                })
+                continue
+
+            url = product.get('url')
+            quantity = product.get('quantity', 1)
+
+            if index not in scrapable:
+                results.append({
+                    "index": index,
+                    "url": url,
+                    "status": "error",
+                    "error": "Missing URL" if not url else "Scraper not available for this retailer"
+                })
+                continue
+
+            outcome = lookups[canonicalize_url(url)]
+            if not outcome['ok']:
+                results.append({"index": index, "url": url, "status": "error", "error": outcome['error']})
+                continue
+
+            product_info = outcome['info']
+            result = {"index": index, "url": url, "status": "ok"}
+            results.append(result)
+            pending.append((result, product_info, {
+                'buyer_id': current_user.id,
+                'store_name': retailers.store_name(url),
+                'items': [{
+                    'name': product_info['name'],
+                    'quantity': quantity,
+                    'price': product_info['price']
+                }],
+                'delivery_address': data['delivery_address'],
+                'status': 'open',
+                'expiry_time': expiry_time,
+                'product_page_url': url,
+                'product_image_url': product_info.get('image')
+            }))
+
+        failed = any(result['status'] == 'error' for result in results)
+        if atomic and failed:
+            for result, _, _ in pending:
+                result.update(status="skipped", error="Not created because another product failed")
+            return jsonify({
+                "error": "Some products could not be ordered, so no orders were created",
+                "mode": mode,
+                "orders": [],
+                "results": results
+            }), 400
 
-            # Commit all orders
-            db.session.commit()
+        try:
+            order_ids = _insert_orders([row for _, _, row in pending], atomic)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error creating batch orders: {str(e)}")
+            for result, _, _ in pending:
+                result.update(status="error", error=str(e))
+            return jsonify({"error": str(e), "mode": mode, "orders": [], "results": results}), 500
 
-            return jsonify({
-                "message": "Orders created successfully",
-                "orders": created_orders
-            }), 201
+        created_orders = []
+        for (result, product_info, row), order_id in zip(pending, order_ids):
+            if isinstance(order_id, Exception):
+                result.update(status="error", error=str(order_id))
+                continue
+            order_events.publish('order.created', order_data(Order(id=order_id, **row)))
+            created = {
+                "id": order_id,
+                "url": row['product_page_url'],
+                "name": product_info['name'],
+                "quantity": row['items'][0]['quantity'],
+                "price": product_info['price'],
+                "store": row['store_name'],
+                "status": row['status']
+            }
+            created_orders.append(created)
+            result["order"] = created
 
-        finally:
-            # Always close the driver
-            driver.quit()
+        return jsonify({
+            "message": "Orders created successfully",
+            "mode": mode,
+            "orders": created_orders,
+            "results": results
+        }), 201
 
     except Exception as e:
         db.session.rollback()
@@ -216,6 +354,7 @@ def create_order():
 
         db.session.add(new_order)
         db.session.commit()
+        order_events.publish('order.created', order_data(new_order))
 
         return jsonify({
             "message": "Order created successfully",
@@ -229,25 +368,68 @@ def create_order():
 
 @orders_bp.route('/available', methods=['GET'])
 def get_available_orders():
-    """Get all open orders that haven't expired.
+    """Get open orders that haven't expired, one page at a time.
     
     This endpoint is used by carriers to view orders they can accept.
     Only returns orders that:
     1. Have status 'open'
     2. Haven't reached their expiry time
     
+    Orders are sorted by expiry time (soonest first), then ID. Pages are
+    keyset-paginated, so fetching any page costs the same however many
+    orders are open.
+    
+    Query Parameters:
+        limit (int): Orders per page (default 50, at most 200)
+        cursor (str): ``X-Next-Cursor`` of the previous page
+        store_name (str): Only orders from this store
+        created_since (str): Only orders created at or after this ISO 8601 time
+    
     Returns:
-        tuple: JSON response with list of available orders and status code
+        tuple: JSON response with list of available orders and status code.
+            When more orders follow, the ``X-Next-Cursor`` header and a
+            ``Link: <...>; rel="next"`` header point to the next page.
             200: Success
+            400: Invalid query parameter
             500: Server error
     """
     try:
-        # Fetch all open orders that haven't expired
+        limit = AVAILABLE_PAGE_SIZE
+        if 'limit' in request.args:
+            # type=int yields None rather than an error for values that aren't integers
+            limit = request.args.get('limit', type=int)
+            if limit is None or limit < 1:
+                return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit, AVAILABLE_MAX_PAGE_SIZE)
+
+        store_name = request.args.get('store_name')
+        created_since = request.args.get('created_since')
+        cursor = request.args.get('cursor')
+
+        # Fetch open orders that haven't expired, soonest expiry first
         now = datetime.now(timezone.utc)
-        open_orders = Order.query.filter(
+        query = Order.query.filter(
             Order.status == 'open',
             Order.expiry_time > now
-        ).all()
+        )
+        if store_name:
+            query = query.filter(Order.store_name == store_name)
+        if created_since:
+            try:
+                query = query.filter(Order.created_at >= datetime.fromisoformat(created_since))
+            except ValueError:
+                return jsonify({"error": "created_since must be an ISO 8601 datetime"}), 400
+        if cursor:
+            try:
+                expiry_time, order_id = _decode_cursor(cursor)
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            query = query.filter(tuple_(Order.expiry_time, Order.id) > tuple_(expiry_time, order_id))
+
+        # One extra row tells us whether there is a next page
+        open_orders = query.order_by(Order.expiry_time, Order.id).limit(limit + 1).all()
+        has_more = len(open_orders) > limit
+        open_orders = open_orders[:limit]
 
         orders_list = []
         for order in open_orders:
@@ -256,10 +438,19 @@ def get_available_orders():
                 "store_name": order.store_name,
                 "items": order.items,  # Already in JSON format
                 "delivery_address": order.delivery_address,
-                "expiry_time": order.expiry_time.isoformat()
+                "expiry_time": order.expiry_time.isoformat(),
+                "product_image_url": order.product_image_url,
+                "thumbnail_url": thumbnails.thumbnail_url(order.product_image_url)
             })
 
-        return jsonify(orders_list), 200
+        response = jsonify(orders_list)
+        if has_more:
+            next_cursor = _encode_cursor(open_orders[-1])
+            next_url = url_for('orders.get_available_orders', limit=limit, store_name=store_name,
+                               created_since=created_since, cursor=next_cursor)
+            response.headers['X-Next-Cursor'] = next_cursor
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+        return response, 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -291,7 +482,7 @@ def accept_order(order_id):
     data = request.get_json()
 
     try:
-        user = current_user
+        carrier_id = data['carrier_id']
         
         # Find the order 
         order = Order.query.get(order_id)
@@ -321,6 +512,7 @@ def accept_order(order_id):
 
         db.session.add(assignment)
         db.session.commit()
+        order_events.publish('order.accepted', order_data(order, previous_status='open'))
 
         return jsonify({
             "message": "Order accepted successfully",
@@ -382,6 +574,7 @@ def update_order_status(order_id):
             return jsonify({"error": "Invalid status transition"}), 400
         
         # Update order status
+        previous_status = order.status
         order.status = new_status 
 
         # Update assignment status too
@@ -392,6 +585,7 @@ def update_order_status(order_id):
                 assignment.completed_at = datetime.now(timezone.utc)
             
         db.session.commit()
+        order_events.publish('order.status_changed', order_data(order, previous_status=previous_status))
 
         return jsonify({
             "message": f"Order status updated to {new_status}",
@@ -460,6 +654,7 @@ def confirm_delivery(order_id):
             assignment.completed_at = datetime.now(timezone.utc) 
 
         db.session.commit()
+        order_events.publish('order.status_changed', order_data(order, previous_status='ready_for_pickup'))
 
         return jsonify({
             "message": "Delivery confirmed and order completed",
@@ -1,5 +1,8 @@
 from flask import Blueprint, jsonify, request
 from app import db
+from app.services.retailers import retailers
+from app.services.thumbnails import thumbnails
+from app.utils.urls import canonicalize_url
 from datetime import datetime
 
 class Product(db.Model):
@@ -10,7 +13,7 @@ class Product(db.Model):
     price = db.Column(db.Float, nullable=False)
     image_url = db.Column(db.String(500))
     url = db.Column(db.String(500), unique=True)
-    store = db.Column(db.String(50))  # 'Target' or 'Trader Joes'
+    store = db.Column(db.String(50))  # Retailer store name, e.g. 'Target' or 'Trader Joes'
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -21,6 +24,7 @@ class Product(db.Model):
             'description': self.description,
             'price': self.price,
             'image': self.image_url,
+            'thumbnail': thumbnails.thumbnail_url(self.image_url),
             'url': self.url,
             'store': self.store,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -29,6 +33,14 @@ class Product(db.Model):
 
 products_bp = Blueprint('products', __name__)
 
+def _product_url(url):
+    """Return the URL a product is stored under: canonical for supported retailers.
+
+    Demand tracking and the product cache key products by canonical URL, so
+    rows saved under a raw retailer URL would never be matched.
+    """
+    return canonicalize_url(url) if url and retailers.for_url(url) else url
+
 @products_bp.route('/', methods=['GET'])
 def get_products():
     """Get all products.
@@ -43,6 +55,7 @@ def get_products():
         'description': p.description,
         'price': p.price,
         'image': p.image_url,
+        'thumbnail': thumbnails.thumbnail_url(p.image_url),
         'url': p.url,
         'store': p.store
     } for p in products]), 200
@@ -55,7 +68,7 @@ def add_product():
         tuple: JSON response with the added product and 201 status code
     """
     data = request.get_json()
-    url = data.get('url', '')
+    url = _product_url(data.get('url', ''))
     
     # Check if product with this URL already exists
     existing_product = Product.query.filter_by(url=url).first() if url else None
@@ -68,6 +81,10 @@ def add_product():
         existing_product.image_url = data.get('image', '')
         existing_product.store = data.get('store', '')
         db.session.commit()
+
+        # Don't keep serving the old details from the scraper's product cache
+        from app.services.product_cache import product_cache
+        product_cache.invalidate(url)
         product = existing_product
     else:
         # Create new product
@@ -81,6 +98,8 @@ def add_product():
         )
         db.session.add(product)
         db.session.commit()
+
+    thumbnails.schedule(product.image_url)
     
     return jsonify({
         'id': str(product.id),
@@ -96,9 +115,10 @@ def add_product():
 def add_product_to_system():
     """Add a new product to the system."""
     data = request.get_json()
+    url = _product_url(data['url'])
     
     # Check if product with this URL already exists
-    existing_product = Product.query.filter_by(url=data['url']).first()
+    existing_product = Product.query.filter_by(url=url).first()
     if existing_product:
         return jsonify(existing_product.to_dict())
         
@@ -107,12 +127,13 @@ def add_product_to_system():
         description=data.get('description', ''),
         price=data['price'],
         image_url=data.get('image'),
-        url=data['url'],
+        url=url,
         store=data['store']
     )
     
     db.session.add(product)
     db.session.commit()
+    thumbnails.schedule(product.image_url)
     
     return jsonify({
         'id': product.id,
@@ -1,13 +1,24 @@
 from flask import Blueprint, jsonify, request
-from app.services.selenium_scraper import scrape_product_info
+from app.services.chrome_profiles import chrome_profiles
+from app.services.driver_pool import driver_pool
+from app.services.http_extractor import http_extractor
+from app.services.job_queue import queue_stats
+from app.services.load_profile import load_profile
+from app.services.product_cache import product_cache
+from app.services.readiness import page_readiness
+from app.services.resilience import CircuitOpenError, retailer_guard
+from app.services.retailers import retailers
+from app.services.scrape_jobs import scrape_jobs
+from app.services.selector_stats import selector_stats
+from app.services.selenium_scraper import scrape_flights
+from app.utils.validators import is_valid_retailer_url
 from app import db
-from app.routes.products import Product
 
 scraper_bp = Blueprint('scraper', __name__)
 
 @scraper_bp.route('/', methods=['POST'])
 def scrape_product():
-    """Scrape product information from Target or Trader Joe's URL.
+    """Scrape product information from a supported retailer's URL.
     
     Request body:
     {
@@ -16,6 +27,10 @@ def scrape_product():
     
     Returns:
         JSON with product information
+            200: Success
+            400: Missing or unsupported URL
+            503: The retailer is temporarily unavailable
+            500: Scrape failed
     """
     data = request.get_json()
     
@@ -23,29 +38,99 @@ def scrape_product():
         return jsonify({'error': 'URL is required'}), 400
         
     url = data['url']
+    # Checked before the cache, which would count demand for any string
+    if not is_valid_retailer_url(url):
+        return jsonify({'error': 'Invalid retailer URL'}), 400
     
     try:
-        # Check if product already exists
-        existing_product = Product.query.filter_by(url=url).first()
-        if existing_product:
-            return jsonify(existing_product.to_dict())
-            
-        # Scrape new product info
-        product_info = scrape_product_info(url)
-        
-        # Create new product
-        product = Product(
-            name=product_info['name'],
-            description=product_info.get('description', ''),
-            price=product_info['price'],
-            image_url=product_info.get('image_url') or product_info.get('image'),
-            url=url,
-            store='Target' if 'target.com' in url else 'Trader Joes'
-        )
-        
-        db.session.add(product)
-        db.session.commit()
-        
-        return jsonify(product.to_dict()), 200
+        # Served from the product cache unless the page needs scraping
+        product = product_cache.lookup(url)
+        return jsonify(product), 200
+    except CircuitOpenError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
+
+@scraper_bp.route('/jobs', methods=['POST'])
+def submit_scrape_jobs():
+    """Queue one or more URLs for scraping in the background.
+    
+    Request body:
+    {
+        "url": "https://www.target.com/p/...",    # or "urls": [...] for a batch
+        "callback_url": "https://example.com/hook" # optional, receives the finished job
+    }
+    
+    Returns:
+        tuple: JSON with the queued job (or jobs) and status code
+            202: Jobs accepted
+            400: Missing or unsupported URL, or a callback URL the server may not call
+    """
+    data = request.get_json() or {}
+    urls = data.get('urls') if 'urls' in data else [data.get('url')]
+
+    if not isinstance(urls, list) or not urls or not all(urls):
+        return jsonify({'error': 'URL is required'}), 400
+    invalid = [url for url in urls if not is_valid_retailer_url(url)]
+    if invalid:
+        return jsonify({'error': 'Invalid retailer URL', 'urls': invalid}), 400
+
+    callback_url = data.get('callback_url')
+    if callback_url is not None and not scrape_jobs.callback_allowed(callback_url):
+        return jsonify({'error': 'callback_url must be a public http(s) URL or an allowed callback host'}), 400
+
+    jobs = [scrape_jobs.submit(url, callback_url).to_dict() for url in urls]
+    if 'urls' in data:
+        return jsonify({'jobs': jobs}), 202
+    return jsonify({'job': jobs[0]}), 202
+
+@scraper_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_scrape_job(job_id):
+    """Get the status and result of a scrape job.
+    
+    Query parameters:
+        wait (float): Optional seconds to long-poll for completion (max 30)
+    
+    Returns:
+        tuple: JSON with the job and status code
+            200: Job found
+            404: Unknown or expired job
+    """
+    job = scrape_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    wait = min(request.args.get('wait', 0, type=float), 30)
+    if wait > 0:
+        scrape_jobs.wait(job, wait)
+
+    return jsonify({'job': job.to_dict()}), 200
+
+@scraper_bp.route('/stats', methods=['GET'])
+def scraper_stats():
+    """Report scraper health: driver pool usage, page timings and HTTP hit rates.
+    
+    Returns:
+        JSON with ``adapters`` (registered retailers and their strategy),
+        ``driver_pool``, ``page_timings``, ``http_fast_path``, ``product_cache``,
+        ``single_flight``, ``retailers`` (circuit breaker state and retry counts),
+        ``page_weight``, ``selectors`` (learned selector order) and
+        ``chrome_profiles`` sections, plus ``scrape_queue`` job counts when the
+        durable queue is in use
+    """
+    stats = {
+        'adapters': [adapter.to_dict() for adapter in retailers],
+        'driver_pool': driver_pool.stats(),
+        'page_timings': page_readiness.stats(),
+        'http_fast_path': http_extractor.stats(),
+        'product_cache': product_cache.stats(),
+        'single_flight': scrape_flights.stats(),
+        'retailers': retailer_guard.stats(),
+        'page_weight': load_profile.stats(),
+        'selectors': selector_stats.stats(),
+        'chrome_profiles': chrome_profiles.stats()
+    }
+    if scrape_jobs.backend == 'queue':
+        stats['scrape_queue'] = queue_stats()
+    return jsonify(stats), 200
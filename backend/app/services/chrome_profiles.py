@@ -0,0 +1,194 @@
+"""Persistent Chrome profiles for scraper drivers.
+
+A fresh Chrome profile has an empty HTTP cache and no cookies, so every new
+driver re-downloads the retailers' JS bundles and goes through consent
+banners again. When ``SCRAPER_PROFILE_DIR`` is set, each driver instead
+starts from one of ``SCRAPER_PROFILE_SLOTS`` persistent profiles under that
+directory:
+
+- a slot is claimed with an exclusive ``fcntl`` lock held for the life of
+  the driver, so two Chrome processes (even from different workers) never
+  share a profile. When every slot is taken the driver falls back to a
+  throwaway profile;
+- before Chrome starts, cache directories are deleted once they grow past
+  ``SCRAPER_PROFILE_MAX_CACHE_MB``, keeping cookies and site settings;
+- stale ``Singleton*`` files left by a crashed Chrome are removed, and a
+  profile with unreadable preferences, or one Chrome fails to start with
+  because of the profile (see :func:`is_profile_error`), is wiped and
+  recreated. Other start failures, such as a port clash, keep the warm
+  profile. A slot whose profile can't be wiped is unlocked and skipped.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Profile locking needs POSIX; profiles are disabled without it
+    fcntl = None
+
+# Directories inside a profile that only hold cached data
+CACHE_DIRS = [
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+    'GrShaderCache',
+    'ShaderCache',
+    'GraphiteDawnCache'
+]
+
+SINGLETON_FILES = ['SingletonLock', 'SingletonSocket', 'SingletonCookie']
+
+# Chrome start errors that point at a broken profile rather than a transient problem
+PROFILE_ERROR_MARKERS = [
+    'user data directory',
+    'profile',
+    'preferences',
+    'exited abnormally',
+    'crashed'
+]
+
+
+def is_profile_error(error):
+    """Return True if Chrome failing to start with ``error`` suggests a corrupt profile."""
+    message = str(error).lower()
+    return any(marker in message for marker in PROFILE_ERROR_MARKERS)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+class ChromeProfile:
+    """A claimed profile slot; the lock is held until :meth:`ChromeProfiles.release`."""
+
+    def __init__(self, slot, path, lock_file):
+        self.slot = slot
+        self.path = path
+        self.lock_file = lock_file
+
+
+class ChromeProfiles:
+    """Hands out locked, persistent Chrome user-data directories.
+
+    Args:
+        root (str): Directory holding the profiles, or None to disable them
+        slots (int): Number of profiles, i.e. drivers that can run warm at once
+        max_cache (int): Cache bytes a profile may keep before it is trimmed
+    """
+
+    def __init__(self, root=None, slots=4, max_cache=256 * 1024 * 1024):
+        self.root = root
+        self.slots = slots
+        self.max_cache = max_cache
+        self._stats = {'acquired': 0, 'fallbacks': 0, 'trimmed': 0, 'reset': 0}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read the profile directory, slot count and cache limit from the Flask config."""
+        self.root = app.config.get('SCRAPER_PROFILE_DIR', self.root) or None
+        self.slots = app.config.get('SCRAPER_PROFILE_SLOTS', self.slots)
+        self.max_cache = app.config.get('SCRAPER_PROFILE_MAX_CACHE_MB', self.max_cache // (1024 * 1024)) * 1024 * 1024
+
+    @property
+    def enabled(self):
+        return bool(self.root) and fcntl is not None
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def acquire(self):
+        """Claim a free profile slot and prepare it for a new Chrome.
+
+        Returns:
+            ChromeProfile: The claimed profile, or None if profiles are
+                disabled or every slot is in use
+        """
+        if not self.enabled:
+            return None
+        os.makedirs(self.root, exist_ok=True)
+
+        for slot in range(self.slots):
+            lock_file = open(os.path.join(self.root, f'slot-{slot}.lock'), 'w')
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+
+            profile = ChromeProfile(slot, os.path.join(self.root, f'slot-{slot}'), lock_file)
+            try:
+                self._prepare(profile)
+            except Exception as e:
+                print(f"Failed to prepare Chrome profile {profile.path}: {str(e)}")
+                try:
+                    self.reset(profile)
+                except Exception as e:
+                    # Don't keep a slot locked that no driver can use
+                    print(f"Failed to reset Chrome profile {profile.path}, skipping it: {str(e)}")
+                    self.release(profile)
+                    continue
+            self._count('acquired')
+            return profile
+
+        self._count('fallbacks')
+        print("All Chrome profile slots are in use, starting with a temporary profile")
+        return None
+
+    def _prepare(self, profile):
+        os.makedirs(profile.path, exist_ok=True)
+
+        # We hold the slot lock, so these were left behind by a Chrome that died
+        for name in SINGLETON_FILES:
+            path = os.path.join(profile.path, name)
+            if os.path.lexists(path):
+                os.remove(path)
+
+        preferences = os.path.join(profile.path, 'Default', 'Preferences')
+        if os.path.exists(preferences):
+            try:
+                with open(preferences) as f:
+                    json.load(f)
+            except ValueError:
+                print(f"Chrome profile {profile.path} has corrupt preferences, resetting it")
+                self.reset(profile)
+                return
+
+        cache_dirs = [os.path.join(profile.path, name) for name in CACHE_DIRS]
+        if sum(_dir_size(path) for path in cache_dirs) > self.max_cache:
+            for path in cache_dirs:
+                shutil.rmtree(path, ignore_errors=True)
+            self._count('trimmed')
+
+    def reset(self, profile):
+        """Wipe ``profile`` so Chrome recreates it from scratch. The slot stays claimed."""
+        shutil.rmtree(profile.path, ignore_errors=True)
+        os.makedirs(profile.path, exist_ok=True)
+        self._count('reset')
+
+    def release(self, profile):
+        """Unlock ``profile``'s slot once its Chrome has exited."""
+        if profile is None:
+            return
+        try:
+            fcntl.flock(profile.lock_file, fcntl.LOCK_UN)
+        finally:
+            profile.lock_file.close()
+
+    def stats(self):
+        """Return whether profiles are enabled plus acquire/fallback/trim/reset counts."""
+        with self._lock:
+            return dict(self._stats, enabled=self.enabled, slots=self.slots)
+
+
+chrome_profiles = ChromeProfiles()
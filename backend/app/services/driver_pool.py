@@ -0,0 +1,320 @@
+"""Process-wide pool of reusable headless Chrome drivers.
+
+Starting Chrome costs 1-3 seconds and a few hundred MB per launch, so the
+scraper keeps a small set of warm drivers around and hands them out to
+callers instead of creating one per scrape. Drivers are health-checked when
+they come back to the pool and are recycled after a number of pages, once
+they reach a maximum age, or when the Chrome process tree behind them grows
+past a memory ceiling (measured with ``psutil`` when it is installed).
+Recycling happens on check-in, so it never interrupts a scrape in progress.
+
+Usage:
+    with driver_pool.driver() as driver:
+        driver.get(url)
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import WebDriverException
+
+from app.services.chrome_profiles import chrome_profiles
+from app.services.metrics import metrics, span
+
+try:
+    import psutil
+except ImportError:  # Memory limits are skipped without psutil
+    psutil = None
+
+driver_recycles = metrics.counter(
+    'scraper_driver_recycles_total', 'Pooled drivers shut down, by reason', labels=('reason',))
+driver_rss = metrics.histogram(
+    'scraper_driver_rss_bytes', 'Memory of a driver process tree when it is checked in',
+    buckets=tuple(mb * 1024 * 1024 for mb in (128, 256, 384, 512, 768, 1024, 1536, 2048, 3072)))
+driver_peak_rss = metrics.gauge(
+    'scraper_driver_peak_rss_bytes', 'Highest memory seen for a single driver process tree')
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no driver becomes available within the checkout timeout."""
+
+
+class PooledDriver:
+    """A Chrome driver plus the bookkeeping the pool needs to recycle it.
+
+    Attributes:
+        driver (WebDriver): The underlying Selenium driver
+        created_at (float): Monotonic timestamp of when the driver was started
+        pages (int): Number of checkouts served by this driver
+        peak_rss (int): Highest memory measured for the driver's process tree, in bytes
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.pages = 0
+        self.peak_rss = 0
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created_at
+
+
+class DriverPool:
+    """Thread-safe pool of Selenium drivers with checkout/return semantics.
+
+    Args:
+        factory (callable): Zero-argument callable returning a new driver
+        min_size (int): Number of drivers kept alive even when idle
+        max_size (int): Maximum number of live drivers (idle + checked out)
+        max_pages (int): Recycle a driver after serving this many checkouts
+        max_age (float): Recycle a driver after this many seconds
+        checkout_timeout (float): Seconds to wait for a free driver
+        max_rss (int): Recycle a driver whose process tree uses this many
+            bytes or more; 0 disables the check
+        tabs_per_browser (int): Pages a batch scrape may load at once in one
+            driver's tabs; 1 keeps one page per driver
+    """
+
+    def __init__(self, factory=None, min_size=1, max_size=4, max_pages=50,
+                 max_age=1800, checkout_timeout=60, max_rss=0, tabs_per_browser=1):
+        self.factory = factory
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.checkout_timeout = checkout_timeout
+        self.max_rss = max_rss
+        self.tabs_per_browser = tabs_per_browser
+
+        self._idle = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {'created': 0, 'recycled': 0, 'discarded': 0, 'checkouts': 0, 'peak_rss_bytes': 0}
+        self._recycle_reasons = {}
+        atexit.register(self.shutdown)
+
+    def init_app(self, app):
+        """Read pool settings from the Flask config and optionally warm up."""
+        self.min_size = app.config.get('SCRAPER_POOL_MIN_SIZE', self.min_size)
+        self.max_size = max(app.config.get('SCRAPER_POOL_MAX_SIZE', self.max_size), 1)
+        self.max_pages = app.config.get('SCRAPER_POOL_MAX_PAGES', self.max_pages)
+        self.max_age = app.config.get('SCRAPER_POOL_MAX_AGE', self.max_age)
+        self.checkout_timeout = app.config.get('SCRAPER_POOL_CHECKOUT_TIMEOUT', self.checkout_timeout)
+        self.max_rss = app.config.get('SCRAPER_POOL_MAX_RSS_MB', self.max_rss // (1024 * 1024)) * 1024 * 1024
+        self.tabs_per_browser = max(app.config.get('SCRAPER_TABS_PER_BROWSER', self.tabs_per_browser), 1)
+
+        if app.config.get('SCRAPER_POOL_WARM_ON_START'):
+            threading.Thread(target=self.warm, name='driver-pool-warm', daemon=True).start()
+
+    def _create(self):
+        if self.factory is None:
+            from app.services.selenium_scraper import create_driver
+            self.factory = create_driver
+        pooled = PooledDriver(self.factory())
+        with self._cond:
+            self._stats['created'] += 1
+        return pooled
+
+    def _quit(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"Failed to quit pooled driver: {str(e)}")
+        # Free the driver's persistent Chrome profile for the next driver
+        chrome_profiles.release(getattr(pooled.driver, '_grabbit_profile', None))
+
+    def _memory(self, pooled):
+        """Return the RSS of the driver's chromedriver + Chrome process tree, or None.
+
+        RSS counts pages shared between Chrome processes more than once, so
+        this overstates real usage somewhat; it is a safe basis for a ceiling.
+        """
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(pooled.driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except Exception:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total
+
+    def _recycle_reason(self, pooled):
+        """Return why ``pooled`` should be retired, or None if it can be reused."""
+        if pooled.pages >= self.max_pages:
+            return 'pages'
+        if pooled.age >= self.max_age:
+            return 'age'
+
+        # Measured before the page is unloaded, while memory use is at its highest
+        rss = self._memory(pooled)
+        if rss is not None:
+            pooled.peak_rss = max(pooled.peak_rss, rss)
+            driver_rss.observe(rss)
+            driver_peak_rss.set_max(rss)
+            with self._cond:
+                self._stats['peak_rss_bytes'] = max(self._stats['peak_rss_bytes'], rss)
+            if self.max_rss and rss >= self.max_rss:
+                print(f"Recycling driver using {rss / 1024 / 1024:.0f} MB after {pooled.pages} pages")
+                return 'memory'
+        return None
+
+    def _is_alive(self, pooled):
+        """Check that the browser session still responds and the tab hasn't crashed."""
+        try:
+            pooled.driver.execute_script('return 1')
+            return True
+        except WebDriverException:
+            return False
+
+    def warm(self):
+        """Start drivers until the pool holds at least ``min_size`` of them."""
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + self._in_use >= self.min_size:
+                    return
+                # Reserve the slot so concurrent checkouts respect max_size
+                self._in_use += 1
+            try:
+                pooled = self._create()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._in_use -= 1
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def checkout(self, timeout=None):
+        """Take a driver out of the pool, starting a new one if there is room.
+
+        Raises:
+            PoolTimeoutError: If the pool is at capacity for longer than ``timeout``
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError('Driver pool has been shut down')
+                if self._idle:
+                    pooled = self._idle.pop()
+                    self._in_use += 1
+                    self._stats['checkouts'] += 1
+                    return pooled
+                if self._in_use < self.max_size:
+                    self._in_use += 1
+                    self._stats['checkouts'] += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError('Timed out waiting for a scraper driver')
+                self._cond.wait(remaining)
+
+        # Start Chrome outside the lock so other callers aren't blocked on it
+        try:
+            return self._create()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def checkin(self, pooled, broken=False):
+        """Return a driver to the pool, recycling it if it is unhealthy or worn out.
+
+        Args:
+            pooled (PooledDriver): The driver obtained from :meth:`checkout`
+            broken (bool): True if the caller saw the session fail
+        """
+        pooled.pages += 1
+        if broken:
+            reason = 'broken'
+        elif self._closed:
+            reason = 'shutdown'
+        else:
+            reason = self._recycle_reason(pooled)
+        if reason is None:
+            try:
+                # Drop the previous page so its memory is released while idle
+                pooled.driver.get('about:blank')
+            except WebDriverException:
+                reason = 'dead'
+            if reason is None and not self._is_alive(pooled):
+                reason = 'dead'
+
+        if reason is not None:
+            self._quit(pooled)
+            driver_recycles.inc(reason=reason)
+
+        with self._cond:
+            self._in_use -= 1
+            if reason is None:
+                self._idle.append(pooled)
+            else:
+                self._stats['discarded' if reason in ('broken', 'dead') else 'recycled'] += 1
+                self._recycle_reasons[reason] = self._recycle_reasons.get(reason, 0) + 1
+            self._cond.notify()
+            below_min = not self._closed and len(self._idle) + self._in_use < self.min_size
+
+        if below_min:
+            threading.Thread(target=self._warm_quietly, name='driver-pool-warm', daemon=True).start()
+
+    def _warm_quietly(self):
+        try:
+            self.warm()
+        except Exception as e:
+            print(f"Failed to replenish driver pool: {str(e)}")
+
+    @contextmanager
+    def driver(self, timeout=None, retailer='', pages=1):
+        """Check out a driver for the duration of a ``with`` block.
+
+        A ``WebDriverException`` escaping the block marks the session as broken
+        so it is discarded instead of being handed to the next caller. The wait
+        for a driver is recorded as the ``checkout`` phase of ``retailer``'s scrape.
+        ``pages`` is how many pages the block loads (e.g. one per tab), counted
+        towards the driver's recycling limit.
+        """
+        with span('checkout', retailer):
+            pooled = self.checkout(timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            pooled.pages += max(pages - 1, 0)
+            self.checkin(pooled, broken=broken)
+
+    def stats(self):
+        """Return a snapshot of pool occupancy and lifetime counters."""
+        with self._cond:
+            return dict(self._stats, idle=len(self._idle), in_use=self._in_use,
+                        min_size=self.min_size, max_size=self.max_size,
+                        recycle_reasons=dict(self._recycle_reasons))
+
+    def shutdown(self):
+        """Quit every idle driver and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+
+
+driver_pool = DriverPool()
@@ -0,0 +1,77 @@
+"""HTML parsing backend for product extraction.
+
+Product pages run to 1-2 MB of HTML, and building a BeautifulSoup tree
+for all of it with the pure-Python ``html.parser`` is the most expensive
+thing a scrape does on our side. The extractors only need a handful of
+``<meta>``, ``<script>`` and price tags, so :meth:`HtmlParser.parse`:
+
+- uses lxml's C parser when it is installed (``SCRAPER_HTML_PARSER``);
+- only builds tree nodes for the tag names the caller asks for;
+- with ``head_only``, stops at ``</head>`` for callers that only read
+  meta tags.
+
+The result is a regular BeautifulSoup object, so callers keep using
+``find``/``find_all``.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+except ImportError:  # Falls back to the pure-Python parser
+    lxml = None
+
+BACKENDS = ('lxml', 'html.parser')
+
+HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+
+
+class HtmlParser:
+    """Builds (partial) BeautifulSoup trees with the fastest available backend.
+
+    Args:
+        backend (str): 'auto' for lxml when installed, or 'lxml' / 'html.parser'
+    """
+
+    def __init__(self, backend='auto'):
+        self.backend = self._resolve(backend)
+
+    def init_app(self, app):
+        """Read the parser backend from the Flask config."""
+        self.backend = self._resolve(app.config.get('SCRAPER_HTML_PARSER', self.backend))
+
+    @staticmethod
+    def _resolve(backend):
+        if backend == 'auto':
+            return 'lxml' if lxml is not None else 'html.parser'
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser '{backend}', expected 'auto' or one of {', '.join(BACKENDS)}")
+        if backend == 'lxml' and lxml is None:
+            print("lxml is not installed, parsing HTML with html.parser")
+            return 'html.parser'
+        return backend
+
+    def parse(self, html, tags=None, head_only=False, backend=None):
+        """Parse ``html`` into a BeautifulSoup tree.
+
+        Args:
+            html: Page HTML
+            tags: Tag names to keep, e.g. ``('meta', 'script')``; everything
+                else is skipped while parsing. None keeps the whole tree
+            head_only: Stop at ``</head>``, for callers that only need meta tags
+            backend: Parser to use instead of the configured one
+
+        Returns:
+            BeautifulSoup: The parsed (partial) document
+        """
+        if head_only:
+            match = HEAD_END_RE.search(html)
+            if match:
+                html = html[:match.end()]
+        parse_only = SoupStrainer(list(tags)) if tags else None
+        return BeautifulSoup(html, backend or self.backend, parse_only=parse_only)
+
+
+html_parser = HtmlParser()
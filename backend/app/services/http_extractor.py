@@ -0,0 +1,258 @@
+"""HTTP-first product extraction.
+
+Many product pages already carry what we need in their server-rendered HTML:
+``og:*`` meta tags, JSON-LD ``Product`` blocks or a ``__NEXT_DATA__`` blob.
+Fetching that HTML over a pooled keep-alive connection takes a fraction of a
+second, so the scraper tries it first and only starts a browser when the
+required fields for the retailer are still missing.
+"""
+
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.services.html_parser import html_parser
+from app.services.metrics import span
+from app.utils.urls import product_id_from_url
+
+USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+def _first(value):
+    """Return the first element of a list, or the value itself."""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _find_product_ld(node):
+    """Depth-first search of JSON-LD data for a schema.org Product object."""
+    if isinstance(node, list):
+        for item in node:
+            found = _find_product_ld(item)
+            if found:
+                return found
+    elif isinstance(node, dict):
+        node_type = node.get('@type')
+        if node_type == 'Product' or (isinstance(node_type, list) and 'Product' in node_type):
+            return node
+        for key in ('@graph', 'mainEntity', 'itemListElement'):
+            if key in node:
+                found = _find_product_ld(node[key])
+                if found:
+                    return found
+    return None
+
+
+# Keys naming the product an object (and everything nested in it) describes
+NEXT_ID_KEYS = ('tcin', 'product_id', 'productId', 'sku', 'id')
+
+
+def _next_candidates(node, product_id=None, depth=0):
+    """Yield ``(object, id)`` for every object with a name and a price in a ``__NEXT_DATA__`` blob.
+
+    ``id`` is the nearest product id on the object or one of its parents.
+    """
+    if depth > 12:
+        return
+    if isinstance(node, dict):
+        for key in NEXT_ID_KEYS:
+            value = node.get(key)
+            if isinstance(value, (str, int)) and not isinstance(value, bool):
+                product_id = str(value)
+                break
+        name = node.get('name') or node.get('title')
+        price = node.get('price') or node.get('retail_price') or node.get('current_retail')
+        if isinstance(name, str) and price not in (None, '', {}):
+            yield node, product_id
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return
+    for child in children:
+        yield from _next_candidates(child, product_id, depth + 1)
+
+
+def _find_next_product(node, product_id=None):
+    """Find the page's own product in a ``__NEXT_DATA__`` blob.
+
+    Product pages also carry recommendations and carousels, so with a
+    ``product_id`` only an object under that id counts. Without one (or
+    when nothing carries an id) the blob must hold a single candidate;
+    anything ambiguous returns None so the fields come from elsewhere.
+    """
+    candidates = list(_next_candidates(node))
+    if product_id is not None:
+        for candidate, candidate_id in candidates:
+            if candidate_id == str(product_id):
+                return candidate
+    if len(candidates) == 1 and candidates[0][1] is None:
+        return candidates[0][0]
+    return None
+
+
+def _format_price(price):
+    """Normalize a structured-data price into the ``$x.yy`` strings the scrapers return."""
+    if isinstance(price, dict):
+        price = price.get('amount') or price.get('value') or price.get('current_retail')
+    if isinstance(price, (int, float)):
+        return f"${price:.2f}"
+    if isinstance(price, str) and price.strip():
+        price = price.strip()
+        return price if '$' in price else f"${price}"
+    return None
+
+
+def parse_product_html(html, head_only=False, backend=None, product_id=None):
+    """Extract name, price and image from server-rendered product HTML.
+
+    Args:
+        html: Raw page HTML
+        head_only: Only read ``<head>``, for pages whose product data is all there
+        backend: HTML parser to use instead of the configured one
+        product_id: The page's product id (see :func:`app.utils.urls.product_id_from_url`),
+            used to tell its product apart from related items in ``__NEXT_DATA__``
+
+    Returns:
+        dict: ``name``, ``price`` and ``image_url``; any of them may be None
+    """
+    # Structured data and meta tags are all we read, so skip building the rest of the tree
+    soup = html_parser.parse(html, tags=('script', 'meta'), head_only=head_only, backend=backend)
+    info = {'name': None, 'price': None, 'image_url': None}
+
+    # JSON-LD is the most reliable source when present
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            product = _find_product_ld(json.loads(script.string or ''))
+        except ValueError:
+            continue
+        if product:
+            offers = _first(product.get('offers')) or {}
+            info['name'] = info['name'] or product.get('name')
+            info['image_url'] = info['image_url'] or _first(product.get('image'))
+            info['price'] = info['price'] or _format_price(offers.get('price') or offers.get('lowPrice'))
+            break
+
+    next_data = soup.find('script', id='__NEXT_DATA__')
+    if next_data and next_data.string and not all(info.values()):
+        try:
+            product = _find_next_product(json.loads(next_data.string), product_id)
+        except ValueError:
+            product = None
+        if product:
+            info['name'] = info['name'] or product.get('name') or product.get('title')
+            info['price'] = info['price'] or _format_price(
+                product.get('price') or product.get('retail_price') or product.get('current_retail'))
+
+    # og:* meta tags fill in whatever structured data didn't provide
+    meta_fields = {
+        'name': ('og:title',),
+        'image_url': ('og:image',),
+        'price': ('product:price:amount', 'og:price:amount')
+    }
+    for field, properties in meta_fields.items():
+        if info[field]:
+            continue
+        for prop in properties:
+            meta = soup.find('meta', property=prop)
+            if meta and meta.get('content', '').strip():
+                content = meta['content'].strip()
+                info[field] = _format_price(content) if field == 'price' else content
+                break
+
+    if isinstance(info['image_url'], dict):
+        info['image_url'] = info['image_url'].get('url')
+    return info
+
+
+class HttpExtractor:
+    """Fetches product pages over a pooled HTTP session and tracks hit rates.
+
+    Args:
+        timeout (float): Per-request timeout in seconds
+        pool_size (int): Keep-alive connections kept per host
+    """
+
+    def __init__(self, timeout=5, pool_size=10):
+        self.enabled = True
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._session = None
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def init_app(self, app):
+        """Read HTTP fast path settings from the Flask config."""
+        self.enabled = app.config.get('SCRAPER_HTTP_FIRST', self.enabled)
+        self.timeout = app.config.get('SCRAPER_HTTP_TIMEOUT', self.timeout)
+        self.pool_size = app.config.get('SCRAPER_HTTP_POOL_SIZE', self.pool_size)
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({
+                    'User-Agent': USER_AGENT,
+                    'Accept': 'text/html,application/xhtml+xml',
+                    'Accept-Language': 'en-US,en;q=0.9'
+                })
+                self._session = session
+            return self._session
+
+    def _count(self, retailer, outcome):
+        with self._lock:
+            counts = self._stats.setdefault(retailer, {'attempts': 0, 'hits': 0, 'misses': 0, 'errors': 0})
+            counts['attempts'] += 1
+            counts[outcome] += 1
+
+    def extract(self, url, retailer, required=('name', 'price', 'image_url'), timeout=None, head_only=False):
+        """Try to scrape ``url`` without a browser.
+
+        Args:
+            url: Product page URL
+            retailer: Retailer domain, used for hit-rate stats
+            required: Fields that must all be found in the HTML
+            timeout: Request timeout in seconds, defaulting to ``SCRAPER_HTTP_TIMEOUT``
+            head_only: Stop parsing at ``</head>`` when the retailer's meta tags suffice
+
+        Returns:
+            dict: Product info if every required field was found in the HTML,
+                otherwise None so the caller can fall back to Selenium
+        """
+        try:
+            with span('http_fetch', retailer):
+                response = self.session.get(url, timeout=timeout or self.timeout)
+                response.raise_for_status()
+            with span('parse', retailer):
+                info = parse_product_html(response.text, head_only=head_only,
+                                          product_id=product_id_from_url(url))
+        except Exception as e:
+            print(f"HTTP extraction failed for {url}: {str(e)}")
+            self._count(retailer, 'errors')
+            return None
+
+        if not all(info.get(field) for field in required):
+            self._count(retailer, 'misses')
+            return None
+
+        self._count(retailer, 'hits')
+        info['price'] = info['price'] or "Price not listed"
+        return info
+
+    def stats(self):
+        """Return attempts, hits, misses, errors and hit rate per retailer."""
+        with self._lock:
+            return {
+                retailer: dict(counts, hit_rate=counts['hits'] / counts['attempts'])
+                for retailer, counts in self._stats.items()
+            }
+
+
+http_extractor = HttpExtractor()
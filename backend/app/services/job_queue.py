@@ -0,0 +1,264 @@
+"""Durable scrape job queue backed by the ``scrape_jobs`` table.
+
+The web tier only enqueues rows; any number of ``worker.py`` processes, on
+any machine that can reach the database, lease jobs one at a time:
+
+- :func:`lease_job` claims the oldest available job with a conditional
+  ``UPDATE``, so two workers can never win the same row. A lease that isn't
+  completed before it expires (crashed worker, killed browser) makes the job
+  visible again.
+- :func:`fail_job` schedules a retry with exponential backoff and jitter,
+  and dead-letters the job once it has used up ``max_attempts``.
+- :func:`complete_job`, :func:`fail_job` and :func:`renew_lease` only
+  change a job while the worker still holds its lease, so a worker whose
+  lease ran out can't overwrite what the next worker recorded.
+  :func:`keep_lease` renews the lease while a long scrape runs.
+
+All functions need an application context.
+"""
+
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app import db
+from app.models import ScrapeJob
+from app.services.scrape_jobs import scrape_jobs
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _available(now):
+    """Jobs that are due, or whose worker let the lease expire."""
+    return or_(
+        and_(ScrapeJob.status == 'queued', ScrapeJob.available_at <= now),
+        and_(ScrapeJob.status == 'running', ScrapeJob.lease_expires_at <= now)
+    )
+
+
+def enqueue_job(url, callback_url=None):
+    """Insert a queued scrape job for ``url`` and return it."""
+    job = ScrapeJob(
+        id=uuid.uuid4().hex,
+        url=url,
+        callback_url=callback_url,
+        status='queued',
+        max_attempts=current_app.config.get('SCRAPE_QUEUE_MAX_ATTEMPTS', 5),
+        available_at=_now()
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def lease_job(worker_id, lease_seconds=None):
+    """Claim the next available job for ``worker_id``.
+
+    Args:
+        worker_id: Identifier recorded on the lease, e.g. ``host:pid:thread``
+        lease_seconds: How long the job stays invisible to other workers
+
+    Returns:
+        ScrapeJob: The leased job, or None if the queue is empty
+    """
+    lease_seconds = lease_seconds or current_app.config.get('SCRAPE_QUEUE_LEASE_SECONDS', 120)
+
+    while True:
+        now = _now()
+        candidate = ScrapeJob.query.filter(_available(now)).order_by(ScrapeJob.available_at).first()
+        if candidate is None:
+            return None
+
+        if candidate.attempts >= candidate.max_attempts:
+            # The last lease expired without the job finishing
+            _dead_letter(candidate, candidate.error or 'Lease expired on final attempt', _available(now))
+            continue
+
+        # Only one worker's conditional update can match the row
+        claimed = ScrapeJob.query.filter(ScrapeJob.id == candidate.id, _available(now)).update({
+            'status': 'running',
+            'leased_by': worker_id,
+            'lease_expires_at': now + timedelta(seconds=lease_seconds),
+            'attempts': ScrapeJob.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if claimed:
+            return db.session.get(ScrapeJob, candidate.id)
+
+
+def _holds_lease(job_id, worker_id):
+    return and_(ScrapeJob.id == job_id, ScrapeJob.leased_by == worker_id, ScrapeJob.status == 'running')
+
+
+def _update_leased(job, worker_id, values):
+    """Apply ``values`` to ``job`` only while ``worker_id`` holds its lease.
+
+    Returns:
+        bool: False if the lease was lost and nothing was changed
+    """
+    updated = ScrapeJob.query.filter(_holds_lease(job.id, worker_id)).update(values, synchronize_session=False)
+    db.session.commit()
+    if not updated:
+        print(f"Scrape job {job.id}: {worker_id} no longer holds the lease, outcome discarded")
+    return bool(updated)
+
+
+def renew_lease(job_id, worker_id, lease_seconds=None):
+    """Extend ``worker_id``'s lease on a running job.
+
+    Returns:
+        bool: False if the lease was already lost
+    """
+    lease_seconds = lease_seconds or current_app.config.get('SCRAPE_QUEUE_LEASE_SECONDS', 120)
+    renewed = ScrapeJob.query.filter(_holds_lease(job_id, worker_id)).update({
+        'lease_expires_at': _now() + timedelta(seconds=lease_seconds)
+    }, synchronize_session=False)
+    db.session.commit()
+    return bool(renewed)
+
+
+@contextmanager
+def keep_lease(job, worker_id, lease_seconds=None):
+    """Renew ``job``'s lease in the background until the ``with`` block exits.
+
+    The lease is renewed every third of ``lease_seconds``, so it only runs
+    out if the whole process stops.
+    """
+    app = current_app._get_current_object()
+    lease_seconds = lease_seconds or app.config.get('SCRAPE_QUEUE_LEASE_SECONDS', 120)
+    job_id = job.id
+    stopped = threading.Event()
+
+    def renew():
+        with app.app_context():
+            try:
+                while not stopped.wait(lease_seconds / 3):
+                    if not renew_lease(job_id, worker_id, lease_seconds):
+                        print(f"Scrape job {job_id}: lease lost while running")
+                        return
+            except Exception as e:
+                print(f"Failed to renew lease on scrape job {job_id}: {str(e)}")
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=renew, name=f'lease-{job_id}', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def _notify(job):
+    """Send a finished (succeeded or dead-lettered) job to its callback URL."""
+    if job.callback_url:
+        scrape_jobs.send_callback(job.callback_url, job.to_dict())
+
+
+def complete_job(job, worker_id, result):
+    """Mark a job leased by ``worker_id`` as succeeded with ``result`` and notify its callback.
+
+    Returns:
+        bool: False if the lease was lost and the result was discarded
+    """
+    completed = _update_leased(job, worker_id, {
+        'status': 'succeeded',
+        'result': result,
+        'error': None,
+        'lease_expires_at': None,
+        'finished_at': _now()
+    })
+    if completed:
+        _notify(job)
+    return completed
+
+
+def fail_job(job, worker_id, error):
+    """Record a failed attempt by ``worker_id``, retrying with backoff or dead-lettering.
+
+    Returns:
+        str: The job's new status, 'queued' (retrying) or 'dead', or None
+            if the lease was lost and the failure was discarded
+    """
+    if job.attempts >= job.max_attempts:
+        return 'dead' if _dead_letter(job, error, _holds_lease(job.id, worker_id)) else None
+
+    base = current_app.config.get('SCRAPE_QUEUE_BACKOFF_BASE', 10)
+    cap = current_app.config.get('SCRAPE_QUEUE_BACKOFF_MAX', 600)
+    delay = min(cap, base * 2 ** (job.attempts - 1))
+    delay = delay / 2 + random.uniform(0, delay / 2)
+
+    retried = _update_leased(job, worker_id, {
+        'status': 'queued',
+        'error': error,
+        'leased_by': None,
+        'lease_expires_at': None,
+        'available_at': _now() + timedelta(seconds=delay)
+    })
+    return 'queued' if retried else None
+
+
+def _dead_letter(job, error, condition):
+    """Dead-letter ``job`` if it still matches ``condition`` and notify its callback.
+
+    Both a final failed attempt and a final lease that expired end here.
+
+    Returns:
+        bool: False if another worker changed the job first
+    """
+    updated = ScrapeJob.query.filter(ScrapeJob.id == job.id, condition).update({
+        'status': 'dead',
+        'error': error,
+        'lease_expires_at': None,
+        'finished_at': _now()
+    }, synchronize_session=False)
+    db.session.commit()
+    if updated:
+        print(f"Scrape job {job.id} dead-lettered after {job.attempts} attempts: {error}")
+        _notify(job)
+    return bool(updated)
+
+
+def process_next_job(worker_id):
+    """Lease one job, scrape it through the product cache and record the outcome.
+
+    Returns:
+        bool: True if a job was processed, False if the queue was empty
+    """
+    from app.services.product_cache import product_cache
+
+    job = lease_job(worker_id)
+    if job is None:
+        return False
+
+    try:
+        # Long scrapes keep the job hidden from other workers until they finish
+        with keep_lease(job, worker_id):
+            result = product_cache.lookup(job.url)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Scrape job {job.id} attempt {job.attempts} failed: {str(e)}")
+        fail_job(job, worker_id, str(e))
+    else:
+        complete_job(job, worker_id, result)
+    return True
+
+
+def get_job(job_id):
+    """Return the job with ``job_id`` or None."""
+    return db.session.get(ScrapeJob, job_id)
+
+
+def queue_stats():
+    """Return the number of jobs in each status."""
+    rows = db.session.query(ScrapeJob.status, db.func.count(ScrapeJob.id)).group_by(ScrapeJob.status).all()
+    return {status: count for status, count in rows}
@@ -0,0 +1,147 @@
+"""Lightweight page-load profile for scraper drivers.
+
+The scrapers only read a handful of DOM nodes and meta tags, yet a default
+Chrome session downloads every image, font, stylesheet, ad and tracker on
+the page. With the ``light`` profile (the default):
+
+- drivers use the ``eager`` page-load strategy, so ``driver.get()`` returns
+  at DOMContentLoaded and readiness detection takes it from there;
+- requests are blocked at the DevTools level (``Network.setBlockedURLs``)
+  by resource type and by ad/tracker domain, with per-retailer allowlists
+  for anything a retailer's page needs to render product data;
+- requests and bytes transferred are counted per page from the Resource
+  Timing API. Cross-origin responses without ``Timing-Allow-Origin`` report
+  zero bytes, so byte counts are a lower bound.
+
+The ``full`` profile keeps Chrome's normal behaviour.
+"""
+
+import threading
+
+# URL patterns blocked for each resource type
+RESOURCE_TYPE_PATTERNS = {
+    'image': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico'],
+    'font': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.m3u8', '*.mp3'],
+    'stylesheet': ['*.css']
+}
+
+# Ads, analytics and trackers that never affect product data
+BLOCKED_DOMAINS = [
+    'doubleclick.net', 'googlesyndication.com', 'googletagmanager.com', 'google-analytics.com',
+    'googleadservices.com', 'facebook.net', 'connect.facebook.net', 'criteo.com', 'criteo.net',
+    'adsrvr.org', 'bing.com', 'pinterest.com', 'tiktok.com', 'quantummetric.com',
+    'hotjar.com', 'optimizely.com', 'branch.io', 'segment.io', 'newrelic.com', 'nr-data.net'
+]
+
+PAGE_WEIGHT_JS = """
+const entries = performance.getEntriesByType('resource');
+const nav = performance.getEntriesByType('navigation')[0];
+let bytes = nav ? (nav.transferSize || 0) : 0;
+for (const entry of entries) {
+    bytes += entry.transferSize || 0;
+}
+return {requests: entries.length + (nav ? 1 : 0), bytes: bytes};
+"""
+
+
+class LoadProfile:
+    """Configures drivers for cheap page loads and tracks page weight.
+
+    Args:
+        name (str): 'light' to block heavy resources, 'full' for normal loads
+        blocked_types (list): Resource types blocked in the light profile
+        allowlists (dict): Per-retailer ``resource_types`` and ``domains`` to keep,
+            set from ``SCRAPER_RESOURCE_ALLOWLISTS``
+    """
+
+    def __init__(self, name='light', blocked_types=None, allowlists=None):
+        self.name = name
+        self.blocked_types = list(blocked_types or RESOURCE_TYPE_PATTERNS)
+        self.allowlists = dict(allowlists or {})
+        self._weights = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read the profile, blocked resource types and allowlists from the Flask config."""
+        self.name = app.config.get('SCRAPER_LOAD_PROFILE', self.name)
+        self.blocked_types = app.config.get('SCRAPER_BLOCKED_RESOURCE_TYPES', self.blocked_types)
+        self.allowlists = dict(app.config.get('SCRAPER_RESOURCE_ALLOWLISTS', self.allowlists))
+
+    @property
+    def light(self):
+        return self.name == 'light'
+
+    @property
+    def page_load_strategy(self):
+        return 'eager' if self.light else 'normal'
+
+    def blocked_patterns(self, retailer):
+        """Return the ``Network.setBlockedURLs`` patterns for ``retailer``."""
+        allow = self.allowlists.get(retailer, {})
+        allowed_types = set(allow.get('resource_types', []))
+        allowed_domains = set(allow.get('domains', []))
+
+        patterns = []
+        for resource_type in self.blocked_types:
+            if resource_type not in allowed_types:
+                patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+        for domain in BLOCKED_DOMAINS:
+            if domain not in allowed_domains:
+                # Anchored to the host, so e.g. 'bing.com' doesn't also block '...?ref=bing.com'
+                patterns.extend([f'*://{domain}/*', f'*://*.{domain}/*'])
+        return patterns
+
+    def prepare(self, driver, retailer, new_tab=False):
+        """Apply ``retailer``'s request blocking to ``driver`` before navigation.
+
+        Blocking rules belong to a tab, so pass ``new_tab=True`` when the
+        driver has just switched to a tab it opened.
+        """
+        if not self.light:
+            return
+        if not new_tab and getattr(driver, '_grabbit_load_profile', None) == retailer:
+            return
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_patterns(retailer)})
+            if not new_tab:
+                # Remember which retailer's rules the main tab has, so reuse is free
+                driver._grabbit_load_profile = retailer
+        except Exception as e:
+            print(f"Failed to apply load profile for {retailer}: {str(e)}")
+
+    def record(self, driver, retailer):
+        """Record the number of requests and bytes the current page used.
+
+        Returns:
+            dict: ``requests`` and ``bytes`` for the page, or None if unavailable
+        """
+        try:
+            weight = driver.execute_script(PAGE_WEIGHT_JS) or {}
+        except Exception as e:
+            print(f"Failed to measure page weight for {retailer}: {str(e)}")
+            return None
+
+        with self._lock:
+            totals = self._weights.setdefault(retailer, {'pages': 0, 'requests': 0, 'bytes': 0})
+            totals['pages'] += 1
+            totals['requests'] += weight.get('requests', 0)
+            totals['bytes'] += weight.get('bytes', 0)
+        return weight
+
+    def stats(self):
+        """Return the profile name and average requests/bytes per page per retailer."""
+        with self._lock:
+            retailers = {
+                retailer: {
+                    'pages': totals['pages'],
+                    'avg_requests': totals['requests'] / totals['pages'],
+                    'avg_bytes': totals['bytes'] / totals['pages']
+                }
+                for retailer, totals in self._weights.items()
+            }
+        return {'profile': self.name, 'retailers': retailers}
+
+
+load_profile = LoadProfile()
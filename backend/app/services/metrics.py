@@ -0,0 +1,196 @@
+"""In-process scraper metrics with Prometheus text exposition.
+
+Scrapes are broken into timed phases with :func:`span`::
+
+    with span('navigation', retailer):
+        driver.get(url)
+
+Each span is recorded in the ``scraper_phase_seconds`` histogram labelled
+by ``phase``, ``retailer`` and ``outcome`` ('ok' unless the block raised or
+set ``span.outcome`` itself). ``GET /metrics`` renders every metric in the
+Prometheus text format. Metrics are per process, so scrape each worker.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_format_labels(self.labels, key)} {value}'
+
+
+class Gauge:
+    """Value that can go up and down, with a fixed set of label names."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_max(self, value, **labels):
+        """Raise the gauge to ``value`` if it is higher, for high-water marks."""
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, value), value)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_format_labels(self.labels, key)} {value}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed set of label names."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def samples(self):
+        with self._lock:
+            series = {key: dict(value, buckets=list(value['buckets'])) for key, value in self._series.items()}
+        for key, value in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, value['buckets']):
+                cumulative += count
+                yield f'{self.name}_bucket{_format_labels(self.labels, key, ("le", bound))} {cumulative}'
+            yield f'{self.name}_bucket{_format_labels(self.labels, key, ("le", "+Inf"))} {value["count"]}'
+            yield f'{self.name}_sum{_format_labels(self.labels, key)} {value["sum"]}'
+            yield f'{self.name}_count{_format_labels(self.labels, key)} {value["count"]}'
+
+
+class MetricsRegistry:
+    """Named counters, gauges and histograms, rendered together for ``/metrics``."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, labels, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labels, **kwargs)
+            return metric
+
+    def counter(self, name, help, labels=()):
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name, help, labels=()):
+        return self._get_or_create(Gauge, name, help, labels)
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+phase_seconds = metrics.histogram(
+    'scraper_phase_seconds', 'Time spent in each phase of a product scrape',
+    labels=('phase', 'retailer', 'outcome'))
+scrape_seconds = metrics.histogram(
+    'scraper_scrape_seconds', 'End-to-end time to scrape one product page',
+    labels=('retailer', 'method', 'outcome'))
+selector_seconds = metrics.histogram(
+    'scraper_selector_seconds', 'Time spent trying each price selector in the page',
+    labels=('retailer', 'selector', 'outcome'), buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05))
+
+
+class Span:
+    """A running timed phase; set ``outcome`` to override 'ok'/'error'."""
+
+    def __init__(self, phase, retailer):
+        self.phase = phase
+        self.retailer = retailer
+        self.outcome = None
+        self.started = time.monotonic()
+
+
+@contextmanager
+def span(phase, retailer):
+    """Time the enclosed block as ``phase`` of a scrape of ``retailer``."""
+    current = Span(phase, retailer)
+    try:
+        yield current
+    except Exception:
+        current.outcome = current.outcome or 'error'
+        raise
+    finally:
+        phase_seconds.observe(time.monotonic() - current.started, phase=phase,
+                              retailer=retailer, outcome=current.outcome or 'ok')
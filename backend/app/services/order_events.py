@@ -0,0 +1,222 @@
+"""Order lifecycle events pushed to connected clients.
+
+Carriers learn about new work and buyers about status changes by polling,
+which at any useful interval is most of our request volume. Instead, the
+order routes publish an event whenever an order changes:
+
+    order.created          a buyer created an order (one per order in a batch)
+    order.accepted         a carrier accepted an open order
+    order.status_changed   the carrier or buyer moved the order along
+
+and ``GET /events/stream`` pushes them to subscribers as Server-Sent Events
+(or over a WebSocket at ``/events/ws`` when flask-sock is installed).
+
+Every event gets an increasing integer ID and the most recent ones are kept
+in a ring buffer, so a client reconnecting with ``Last-Event-ID`` receives
+what it missed. If it missed more than the buffer holds it gets a
+``resync`` event and should reload ``/orders/available``.
+
+Events go through a transport. :class:`LocalTransport` delivers them to
+subscribers of this process only; to fan out across several web processes,
+set ``ORDER_EVENTS_TRANSPORT`` to a ``'module:factory'`` path returning an
+object with the same ``start(deliver)`` and ``send(event)`` methods, backed
+by e.g. Redis pub/sub or PostgreSQL ``LISTEN/NOTIFY``. It must number
+events with consecutive integers and call ``deliver`` with every event, in
+order, in every process.
+"""
+
+import importlib
+import itertools
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from app.services.thumbnails import thumbnails
+
+EVENT_TYPES = ('order.created', 'order.accepted', 'order.status_changed')
+
+
+def order_data(order, **extra):
+    """Return the event payload describing ``order``."""
+    data = {
+        'order_id': order.id,
+        'store_name': order.store_name,
+        'status': order.status,
+        'items': order.items,
+        'delivery_address': order.delivery_address,
+        'expiry_time': order.expiry_time.isoformat() if order.expiry_time else None,
+        'assigned_carrier_id': order.assigned_carrier_id,
+        'product_image_url': order.product_image_url,
+        'thumbnail_url': thumbnails.thumbnail_url(order.product_image_url)
+    }
+    data.update(extra)
+    return data
+
+
+class LocalTransport:
+    """Delivers events to subscribers in this process only.
+
+    IDs start from the current time in milliseconds, so they keep
+    increasing across restarts and a stale ``Last-Event-ID`` is detected.
+    """
+
+    def __init__(self):
+        self._ids = itertools.count(int(time.time() * 1000))
+        self._lock = threading.Lock()
+        self._deliver = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def send(self, event):
+        # Numbering and delivery happen together so subscribers see IDs in order
+        with self._lock:
+            event['id'] = next(self._ids)
+            self._deliver(event)
+
+
+class Subscription:
+    """One connected client's queue of events matching its filters.
+
+    Args:
+        store_name (str): Only events for orders from this store
+        order_ids (set): Only events for these orders
+        queue_size (int): Events buffered before the client counts as too slow
+    """
+
+    def __init__(self, store_name=None, order_ids=None, queue_size=256):
+        self.store_name = store_name
+        self.order_ids = order_ids
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=queue_size)
+
+    def matches(self, event):
+        data = event['data']
+        if self.store_name and data.get('store_name') != self.store_name:
+            return False
+        if self.order_ids and data.get('order_id') not in self.order_ids:
+            return False
+        return True
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # Dropping events silently would break resume; end the stream instead
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Return the next event, or None if none arrived within ``timeout`` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class OrderEvents:
+    """Publishes order events and fans them out to subscriptions.
+
+    Args:
+        history (int): Events kept for clients resuming with ``Last-Event-ID``
+        queue_size (int): Events buffered per subscriber
+        heartbeat (float): Seconds between keep-alives on idle streams
+    """
+
+    def __init__(self, history=1000, queue_size=256, heartbeat=15):
+        self.history = history
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self._buffer = deque(maxlen=history)
+        self._subscriptions = set()
+        self._stats = {'published': 0, 'overflows': 0}
+        self._lock = threading.Lock()
+        self.transport = None
+        self.set_transport(LocalTransport())
+
+    def init_app(self, app):
+        """Read buffer sizes and the transport from the Flask config."""
+        self.history = app.config.get('ORDER_EVENTS_HISTORY', self.history)
+        self.queue_size = app.config.get('ORDER_EVENTS_QUEUE_SIZE', self.queue_size)
+        self.heartbeat = app.config.get('ORDER_EVENTS_HEARTBEAT', self.heartbeat)
+        with self._lock:
+            self._buffer = deque(self._buffer, maxlen=self.history)
+
+        transport = app.config.get('ORDER_EVENTS_TRANSPORT', 'local')
+        if transport and transport != 'local':
+            module_name, _, attr = transport.partition(':')
+            self.set_transport(getattr(importlib.import_module(module_name), attr)())
+
+    def set_transport(self, transport):
+        self.transport = transport
+        transport.start(self._deliver)
+
+    def publish(self, event_type, data):
+        """Publish an event. Failures are logged, never raised to the caller.
+
+        Args:
+            event_type: One of :data:`EVENT_TYPES`
+            data: JSON-serializable payload, normally :func:`order_data`
+        """
+        event = {
+            'type': event_type,
+            'data': data,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+        try:
+            self.transport.send(event)
+        except Exception as e:
+            print(f"Failed to publish {event_type} event: {str(e)}")
+
+    def _deliver(self, event):
+        with self._lock:
+            self._buffer.append(event)
+            self._stats['published'] += 1
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.matches(event):
+                subscription.put(event)
+                if subscription.overflowed:
+                    self.unsubscribe(subscription)
+                    with self._lock:
+                        self._stats['overflows'] += 1
+
+    def subscribe(self, store_name=None, order_ids=None, last_event_id=None):
+        """Register a subscription and return it with the events it missed.
+
+        Args:
+            store_name: Only events for orders from this store
+            order_ids: Only events for these order IDs
+            last_event_id: ID of the last event the client received, if resuming
+
+        Returns:
+            tuple: The :class:`Subscription`, the buffered events after
+                ``last_event_id`` that match it, and whether some events
+                were already dropped from the buffer (so the client must resync)
+        """
+        subscription = Subscription(store_name, set(order_ids) if order_ids else None, self.queue_size)
+        with self._lock:
+            # Registering under the lock means no event falls between the backlog and the queue
+            self._subscriptions.add(subscription)
+            buffered = list(self._buffer)
+
+        backlog = []
+        missed = False
+        if last_event_id is not None:
+            backlog = [event for event in buffered if event['id'] > last_event_id and subscription.matches(event)]
+            # The event right after the client's last one is no longer (or was never) buffered here
+            missed = not buffered or buffered[0]['id'] > last_event_id + 1
+        return subscription, backlog, missed
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def stats(self):
+        """Return connected subscribers, buffered events and publish counts."""
+        with self._lock:
+            return dict(self._stats, subscribers=len(self._subscriptions), buffered=len(self._buffer))
+
+
+order_events = OrderEvents()
@@ -0,0 +1,115 @@
+"""Moving stale open orders to 'expired'.
+
+Orders that no carrier accepts before their ``expiry_time`` used to stay
+``open`` forever, so the set of open rows (and every ``/orders/available``
+query over it) kept growing. :class:`OrderExpirySweeper` runs from
+``worker.py --scheduler`` and marks them ``expired`` in bounded batches:
+each batch is one conditional ``UPDATE`` of at most ``batch_size`` rows and
+its own short transaction, so a backlog never holds long locks.
+
+Every expired batch is passed to the callbacks registered with
+:meth:`OrderExpirySweeper.on_expired`. By default that publishes an
+``order.status_changed`` event per order, so caches and event streams can
+drop them. The sweeper runs in the worker, so those events only reach web
+processes' streams through a cross-process ``ORDER_EVENTS_TRANSPORT``.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+
+from app import db
+from app.models import Order
+from app.services.metrics import metrics
+from app.services.order_events import order_data, order_events
+
+orders_expired = metrics.counter('orders_expired_total', 'Open orders moved to expired by the sweeper')
+
+
+class OrderExpirySweeper:
+    """Expires open orders past their ``expiry_time``, a batch at a time.
+
+    Args:
+        batch_size (int): Orders expired per transaction
+        max_batches (int): Batches per run, bounding how long one run takes
+    """
+
+    def __init__(self, batch_size=500, max_batches=20):
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._hooks = []
+
+    def init_app(self, app):
+        """Read batch sizes from the Flask config."""
+        self.batch_size = app.config.get('ORDER_EXPIRY_BATCH_SIZE', self.batch_size)
+        self.max_batches = app.config.get('ORDER_EXPIRY_MAX_BATCHES', self.max_batches)
+
+    def on_expired(self, callback):
+        """Call ``callback(orders)`` with every batch of newly expired orders.
+
+        Callbacks run after the batch is committed. Their failures are logged
+        and don't stop the sweep.
+        """
+        self._hooks.append(callback)
+        return callback
+
+    def expire_batch(self, now=None):
+        """Expire up to ``batch_size`` overdue open orders and commit.
+
+        Returns:
+            list: The orders that were expired
+        """
+        now = now or datetime.now(timezone.utc)
+        due = db.session.query(Order.id).filter(
+            Order.status == 'open',
+            Order.expiry_time <= now
+        ).order_by(Order.expiry_time, Order.id).limit(self.batch_size)
+        order_ids = [order_id for (order_id,) in due]
+        if not order_ids:
+            return []
+
+        # Re-checking the status skips orders a carrier accepted in the meantime
+        expired_ids = db.session.execute(
+            update(Order)
+            .where(Order.id.in_(order_ids), Order.status == 'open')
+            .values(status='expired', updated_at=now)
+            .returning(Order.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.session.commit()
+        return Order.query.filter(Order.id.in_(expired_ids)).all() if expired_ids else []
+
+    def run_once(self):
+        """Expire overdue open orders, up to ``max_batches`` batches.
+
+        Returns:
+            dict: Number of orders ``expired``, and ``remaining`` if the run
+                stopped at ``max_batches`` with more orders possibly due
+        """
+        expired = 0
+        remaining = False
+        for batch in range(self.max_batches):
+            orders = self.expire_batch()
+            if not orders:
+                break
+            expired += len(orders)
+            orders_expired.inc(len(orders))
+            for hook in self._hooks:
+                try:
+                    hook(orders)
+                except Exception as e:
+                    print(f"Order expiry hook {getattr(hook, '__name__', hook)} failed: {str(e)}")
+            remaining = batch == self.max_batches - 1 and len(orders) == self.batch_size
+
+        if expired:
+            print(f"Order expiry: {expired} orders expired" + (", more may be due" if remaining else ""))
+        return {'expired': expired, 'remaining': remaining}
+
+
+order_expiry = OrderExpirySweeper()
+
+
+@order_expiry.on_expired
+def publish_expired(orders):
+    for order in orders:
+        order_events.publish('order.status_changed', order_data(order, previous_status='open'))
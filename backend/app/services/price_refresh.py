@@ -0,0 +1,192 @@
+"""Background price refresh for the Product catalog.
+
+Prices are otherwise scraped once and never updated, so orders copy stale
+prices. :class:`PriceRefresher` periodically re-scrapes products whose
+``updated_at`` is older than ``PRICE_REFRESH_STALE_AFTER``, most-demanded
+first, within a global hourly scrape budget. Keeping the staleness threshold
+below ``SCRAPER_PRODUCT_FRESHNESS`` means popular products are refreshed
+before request-time lookups would have to scrape them.
+
+Demand is the number of recent orders for a product plus its lookup score
+in the ``product_demand`` table, which every process's product cache adds
+to and each cycle decays, so old spikes fade out.
+
+Failed scrapes don't update ``updated_at``, so products that can't be
+refreshed would otherwise stay the oldest and be picked every cycle. Products
+no registered retailer supports are never picked, products whose retailer's
+circuit breaker is open wait for it, and a product whose refresh failed is
+skipped for ``PRICE_REFRESH_FAILURE_BACKOFF`` seconds, doubling with every
+further failure up to a day. Only scrapes that actually run count against
+the budget.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from app import db
+from app.models import Order, ProductDemand
+from app.routes.products import Product
+from app.services.product_cache import product_cache
+from app.services.resilience import retailer_guard
+from app.services.retailers import retailers
+from app.services.selenium_scraper import scrape_products
+from app.utils.urls import canonicalize_url
+
+
+class PriceRefresher:
+    """Picks stale, in-demand products and re-scrapes them within a budget.
+
+    Args:
+        stale_after (float): Seconds after which a product's price is stale
+        budget_per_hour (int): Maximum refresh scrapes in any rolling hour
+        batch_size (int): Maximum products refreshed per cycle
+        concurrency (int): Pages scraped at the same time
+        demand_window (float): Seconds of order history counted as demand
+        demand_decay (float): Factor applied to lookup scores every cycle
+        failure_backoff (float): Seconds a product is skipped after a failed refresh,
+            doubled for every further consecutive failure
+    """
+
+    MAX_FAILURE_BACKOFF = 86400
+
+    def __init__(self, stale_after=4 * 3600, budget_per_hour=120, batch_size=20,
+                 concurrency=2, demand_window=7 * 86400, demand_decay=0.5, failure_backoff=3600):
+        self.stale_after = stale_after
+        self.budget_per_hour = budget_per_hour
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.demand_window = demand_window
+        self.demand_decay = demand_decay
+        self.failure_backoff = failure_backoff
+        self._spent = deque()
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read refresh settings from the Flask config."""
+        self.stale_after = app.config.get('PRICE_REFRESH_STALE_AFTER', self.stale_after)
+        self.budget_per_hour = app.config.get('PRICE_REFRESH_BUDGET_PER_HOUR', self.budget_per_hour)
+        self.batch_size = app.config.get('PRICE_REFRESH_BATCH_SIZE', self.batch_size)
+        self.concurrency = app.config.get('PRICE_REFRESH_CONCURRENCY', self.concurrency)
+        self.failure_backoff = app.config.get('PRICE_REFRESH_FAILURE_BACKOFF', self.failure_backoff)
+
+    def remaining_budget(self):
+        """Return how many scrapes the rolling hourly budget still allows."""
+        cutoff = time.monotonic() - 3600
+        with self._lock:
+            while self._spent and self._spent[0] < cutoff:
+                self._spent.popleft()
+            return max(self.budget_per_hour - len(self._spent), 0)
+
+    def _spend(self, count):
+        now = time.monotonic()
+        with self._lock:
+            self._spent.extend([now] * count)
+
+    def _record_failure(self, url):
+        with self._lock:
+            failures = self._failures.get(url, (0, 0))[0] + 1
+            backoff = min(self.failure_backoff * 2 ** (failures - 1), self.MAX_FAILURE_BACKOFF)
+            self._failures[url] = (failures, time.monotonic() + backoff)
+
+    def _refreshable(self, product):
+        """Return True if ``product`` can be re-scraped this cycle."""
+        adapter = retailers.for_url(product.url)
+        if adapter is None or not retailer_guard.available(adapter.domain):
+            return False
+        with self._lock:
+            _, retry_at = self._failures.get(product.url, (0, 0))
+        return retry_at <= time.monotonic()
+
+    def demand(self):
+        """Return a demand score per canonical product URL.
+
+        Lookup scores are read before they are decayed, so lookups since the
+        last cycle count in full once.
+        """
+        # Lookups served by this process count too
+        product_cache.flush_demand()
+
+        scores = {}
+        for url, score in db.session.query(ProductDemand.url, ProductDemand.score):
+            scores[url] = scores.get(url, 0) + score
+        ProductDemand.query.update({'score': ProductDemand.score * self.demand_decay}, synchronize_session=False)
+        ProductDemand.query.filter(ProductDemand.score < 0.01).delete(synchronize_session=False)
+        db.session.commit()
+
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.demand_window)
+        rows = db.session.query(Order.product_page_url, db.func.count(Order.id)).filter(
+            Order.product_page_url.isnot(None),
+            Order.created_at >= since
+        ).group_by(Order.product_page_url).all()
+        for url, count in rows:
+            key = canonicalize_url(url)
+            scores[key] = scores.get(key, 0) + count
+        return scores
+
+    def candidates(self, limit):
+        """Return up to ``limit`` stale, refreshable products, highest demand first.
+
+        Products nobody has asked for recently fill any remaining slots,
+        oldest first.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        is_stale = db.and_(
+            Product.url.isnot(None),
+            db.or_(Product.updated_at.is_(None), Product.updated_at < cutoff)
+        )
+
+        scores = self.demand()
+        ranked = sorted(scores, key=scores.get, reverse=True)[:limit * 5]
+        picked = Product.query.filter(is_stale, Product.url.in_(ranked)).all() if ranked else []
+        picked = [product for product in picked if self._refreshable(product)]
+        picked.sort(key=lambda product: -scores[product.url])
+        picked = picked[:limit]
+
+        if len(picked) < limit:
+            oldest = Product.query.filter(
+                is_stale,
+                Product.id.notin_([product.id for product in picked])
+            ).order_by(Product.updated_at, Product.id).yield_per(100)
+            for product in oldest:
+                if self._refreshable(product):
+                    picked.append(product)
+                    if len(picked) == limit:
+                        break
+        return picked
+
+    def run_once(self):
+        """Refresh one batch of stale products.
+
+        Returns:
+            dict: Number of products ``refreshed`` and ``failed``, and the
+                ``budget`` left afterwards
+        """
+        limit = min(self.batch_size, self.remaining_budget())
+        products = self.candidates(limit) if limit else []
+        urls = [product.url for product in products]
+
+        self._spend(len(urls))
+        refreshed = failed = 0
+        for outcome in scrape_products(urls, max_workers=self.concurrency):
+            try:
+                if not outcome['ok']:
+                    raise RuntimeError(outcome['error'])
+                product_cache.put(outcome['url'], outcome['info'])
+                with self._lock:
+                    self._failures.pop(outcome['url'], None)
+                refreshed += 1
+            except Exception as e:
+                db.session.rollback()
+                print(f"Price refresh failed for {outcome['url']}: {str(e)}")
+                self._record_failure(outcome['url'])
+                failed += 1
+
+        if urls:
+            print(f"Price refresh: {refreshed} refreshed, {failed} failed")
+        return {'refreshed': refreshed, 'failed': failed, 'budget': self.remaining_budget()}
+
+
+price_refresher = PriceRefresher()
@@ -0,0 +1,228 @@
+"""Shared product lookup with an in-process LRU in front of the Product table.
+
+Every scrape entry point resolves product URLs through :data:`product_cache`:
+
+1. The URL is canonicalized per retailer, so ``?preselect=...`` or
+   ``#lnk=sametab`` variants of the same Target item share one entry.
+2. A small in-process LRU with a TTL answers repeat lookups without a query.
+3. The ``Product`` table answers lookups for rows updated within the
+   freshness window.
+4. Only then is the page scraped, and the result is saved to both tiers.
+
+Lookups are also counted per canonical URL and added to the shared
+``product_demand`` table every ``SCRAPER_PRODUCT_DEMAND_FLUSH`` seconds, so
+the price refresher in ``worker.py --scheduler`` sees what the web
+processes were asked for.
+
+Database access needs an application context; :meth:`ProductCache.get` and
+:meth:`ProductCache.put` must be called from request (or app) context.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ProductDemand
+from app.routes.products import Product
+from app.services.retailers import retailers
+from app.services.thumbnails import thumbnails
+from app.utils.urls import canonicalize_url
+
+
+class ProductCache:
+    """Two-tier product cache keyed by canonical URL.
+
+    Args:
+        max_entries (int): LRU capacity
+        ttl (float): Seconds an entry stays in the in-process tier
+        freshness (float): Seconds a ``Product`` row is trusted before re-scraping
+        demand_flush (float): Seconds between writes of lookup counts to ``product_demand``
+    """
+
+    def __init__(self, max_entries=1024, ttl=600, freshness=6 * 3600, demand_flush=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.freshness = freshness
+        self.demand_flush = demand_flush
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'memory_hits': 0, 'db_hits': 0, 'misses': 0}
+        self._demand = Counter()
+        self._demand_flushed_at = time.monotonic()
+
+    def init_app(self, app):
+        """Read cache sizing and freshness settings from the Flask config."""
+        self.max_entries = app.config.get('SCRAPER_PRODUCT_CACHE_SIZE', self.max_entries)
+        self.ttl = app.config.get('SCRAPER_PRODUCT_CACHE_TTL', self.ttl)
+        self.freshness = app.config.get('SCRAPER_PRODUCT_FRESHNESS', self.freshness)
+        self.demand_flush = app.config.get('SCRAPER_PRODUCT_DEMAND_FLUSH', self.demand_flush)
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _remember(self, key, product):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, product)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, product = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return dict(product)
+
+    def invalidate(self, url):
+        """Drop ``url`` from the in-process tier, e.g. after a manual edit."""
+        with self._lock:
+            self._entries.pop(canonicalize_url(url), None)
+
+    def get(self, url):
+        """Return a fresh cached product for ``url``, or None on a miss.
+
+        Returns:
+            dict: ``Product.to_dict()`` of the cached product
+        """
+        key = canonicalize_url(url)
+        with self._lock:
+            self._demand[key] += 1
+            flush = time.monotonic() - self._demand_flushed_at >= self.demand_flush
+        if flush:
+            self.flush_demand()
+
+        product = self._recall(key)
+        if product is not None:
+            self._count('memory_hits')
+            if not product.get('thumbnail'):
+                # The thumbnail may have been generated since this entry was cached
+                product['thumbnail'] = thumbnails.thumbnail_url(product.get('image'))
+            return product
+
+        # Older rows may still be stored under the URL exactly as submitted
+        row = Product.query.filter(Product.url.in_([key, url])).first()
+        cutoff = datetime.utcnow() - timedelta(seconds=self.freshness)
+        if row is not None and row.updated_at and row.updated_at >= cutoff:
+            product = row.to_dict()
+            self._remember(key, product)
+            self._count('db_hits')
+            return product
+
+        self._count('misses')
+        return None
+
+    def put(self, url, info):
+        """Save freshly scraped ``info`` for ``url`` to the database and the LRU.
+
+        Args:
+            url: Product URL that was scraped
+            info: Scraper output with ``name``, ``price`` and ``image_url``
+
+        Returns:
+            dict: ``Product.to_dict()`` of the saved product
+        """
+        if not info.get('name'):
+            raise RuntimeError(f"Could not read product details from {url}")
+
+        key = canonicalize_url(url)
+        # Unlisted prices are stored as 0.0, matching scrape_product_info
+        price = info['price'] if isinstance(info.get('price'), (int, float)) else 0.0
+
+        # A concurrent request may insert the same URL first; retry once as an update
+        for attempt in range(2):
+            product = Product.query.filter(Product.url.in_([key, url])).first()
+            if product is None:
+                product = Product(url=key)
+                db.session.add(product)
+            product.url = key
+            product.name = info['name']
+            product.price = price
+            product.image_url = info.get('image_url') or info.get('image')
+            product.store = retailers.store_name(key)
+            product.updated_at = datetime.utcnow()
+            if product.description is None:
+                product.description = info.get('description', '')
+            try:
+                db.session.commit()
+                break
+            except IntegrityError:
+                db.session.rollback()
+                if attempt:
+                    raise
+
+        # Fetch the image and build its thumbnail without holding up the caller
+        thumbnails.schedule(product.image_url)
+
+        saved = product.to_dict()
+        self._remember(key, saved)
+        return saved
+
+    def lookup(self, url, scrape=None):
+        """Return product info for ``url``, scraping only on a cache miss.
+
+        Args:
+            url: Product URL
+            scrape: Callable used on a miss, defaults to ``scrape_product_info``
+
+        Returns:
+            dict: ``Product.to_dict()`` of the cached or newly scraped product
+        """
+        product = self.get(url)
+        if product is not None:
+            return product
+
+        if scrape is None:
+            from app.services.selenium_scraper import scrape_product_info as scrape
+        return self.put(url, scrape(url))
+
+    def flush_demand(self):
+        """Add the lookups counted since the last flush to the ``product_demand`` table.
+
+        Runs on its own connection, so it never commits the caller's session.
+        Counts that fail to save are kept for the next flush.
+        """
+        with self._lock:
+            demand, self._demand = self._demand, Counter()
+            self._demand_flushed_at = time.monotonic()
+        if not demand:
+            return
+
+        now = datetime.now(timezone.utc)
+        table = ProductDemand.__table__
+        try:
+            with db.engine.begin() as connection:
+                known = set(connection.execute(
+                    select(table.c.url).where(table.c.url.in_(list(demand)))).scalars())
+                if known:
+                    connection.execute(
+                        update(table).where(table.c.url == bindparam('key')).values(
+                            score=table.c.score + bindparam('count'), updated_at=now),
+                        [{'key': url, 'count': demand[url]} for url in known])
+                new = [{'url': url, 'score': count, 'updated_at': now}
+                       for url, count in demand.items() if url not in known]
+                if new:
+                    connection.execute(insert(table), new)
+        except Exception as e:
+            print(f"Failed to save product demand: {str(e)}")
+            with self._lock:
+                self._demand.update(demand)
+
+    def stats(self):
+        """Return hit/miss counters and the current LRU size."""
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
+
+
+product_cache = ProductCache()
@@ -0,0 +1,187 @@
+"""Event-driven page readiness detection for the scrapers.
+
+Instead of sleeping a fixed number of seconds after ``driver.get()``, the
+scrapers call :meth:`PageReadiness.wait` which injects a ``MutationObserver``
+into the page and returns as soon as every required field (title, price,
+og:image, ...) is present in the DOM, or when the retailer's deadline passes.
+How long each page really took is recorded per retailer.
+
+Usage:
+    started = time.monotonic()
+    driver.get(url)
+    result = page_readiness.wait(driver, 'target.com', started_at=started)
+"""
+
+import threading
+import time
+from collections import deque
+
+from app.services.metrics import phase_seconds
+
+# Candidate price elements on Target product pages, most specific first
+TARGET_PRICE_SELECTORS = [
+    '[data-test="product-price"]',
+    'span[data-test="product-price"]',
+    'div[data-test="product-price"]',
+    'span.h-text-bs',  # Common price class
+    '.style-price'
+]
+
+# Each entry is a list of field groups; a group is satisfied when any of its
+# selectors matches an element with non-empty text or ``content``.
+READY_SELECTORS = {
+    'target.com': [
+        ['[data-test="product-title"]'],
+        TARGET_PRICE_SELECTORS,
+        ['meta[property="og:image"]']
+    ],
+    'traderjoes.com': [
+        ['meta[property="og:title"]'],
+        ['meta[property="og:image"]']
+    ]
+}
+
+# Resolves once every selector group matches, or with ready=false at the deadline
+WAIT_FOR_FIELDS_JS = """
+const groups = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+const started = performance.now();
+
+function hasValue(selector) {
+    const el = document.querySelector(selector);
+    return !!el && ((el.getAttribute('content') || el.textContent || '').trim().length > 0);
+}
+function missing() {
+    return groups.filter(group => !group.some(hasValue)).map(group => group[0]);
+}
+
+let finished = false;
+let observer = null;
+let timer = null;
+function finish() {
+    if (finished) return;
+    const left = missing();
+    finished = true;
+    if (observer) observer.disconnect();
+    if (timer) clearTimeout(timer);
+    done({ready: left.length === 0, missing: left, waited_ms: performance.now() - started});
+}
+
+if (missing().length === 0) {
+    finish();
+} else {
+    observer = new MutationObserver(() => { if (missing().length === 0) finish(); });
+    observer.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    timer = setTimeout(finish, timeoutMs);
+}
+"""
+
+
+class ReadinessResult:
+    """Outcome of waiting for a product page to become scrapeable.
+
+    Attributes:
+        retailer (str): Retailer domain the page belongs to
+        ready (bool): True if every required field appeared before the deadline
+        missing (list): First selector of each group that never matched
+        wait_seconds (float): Time spent waiting for the fields
+        page_seconds (float): Navigation plus wait time, if ``started_at`` was given
+    """
+
+    def __init__(self, retailer, ready, missing, wait_seconds, page_seconds=None):
+        self.retailer = retailer
+        self.ready = ready
+        self.missing = missing
+        self.wait_seconds = wait_seconds
+        self.page_seconds = page_seconds
+
+
+class PageReadiness:
+    """Waits for product fields to appear and keeps per-retailer timing samples.
+
+    Args:
+        deadlines (dict): Seconds to wait per retailer domain
+        default_deadline (float): Deadline for retailers without an entry
+        history (int): Number of recent timings kept per retailer
+    """
+
+    def __init__(self, deadlines=None, default_deadline=10, history=500):
+        self.deadlines = dict(deadlines or {})
+        self.default_deadline = default_deadline
+        self._timings = {}
+        self._history = history
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read per-retailer deadlines from the Flask config."""
+        self.deadlines.update(app.config.get('SCRAPER_READY_DEADLINES', {}))
+        self.default_deadline = app.config.get('SCRAPER_READY_DEFAULT_DEADLINE', self.default_deadline)
+
+    def wait(self, driver, retailer, selectors=None, deadline=None, started_at=None):
+        """Block until the page has the fields needed for ``retailer``.
+
+        Args:
+            driver: Selenium driver that has already navigated to the page
+            retailer: Retailer domain, e.g. ``'target.com'``
+            selectors: Field groups to wait for, defaults to ``READY_SELECTORS``
+            deadline: Seconds to wait, defaults to the retailer's deadline
+            started_at: ``time.monotonic()`` taken before navigation, used to
+                record total page time
+
+        Returns:
+            ReadinessResult: Whether the page became ready and how long it took
+        """
+        groups = selectors if selectors is not None else READY_SELECTORS.get(retailer, [])
+        deadline = deadline if deadline is not None else self.deadlines.get(retailer, self.default_deadline)
+
+        wait_started = time.monotonic()
+        try:
+            # Leave headroom so the in-page timer fires before Selenium's
+            driver.set_script_timeout(deadline + 5)
+            outcome = driver.execute_async_script(WAIT_FOR_FIELDS_JS, groups, int(deadline * 1000))
+        except Exception as e:
+            print(f"Readiness check failed for {retailer}: {str(e)}")
+            outcome = {'ready': False, 'missing': [group[0] for group in groups]}
+
+        now = time.monotonic()
+        result = ReadinessResult(
+            retailer=retailer,
+            ready=bool(outcome.get('ready')),
+            missing=outcome.get('missing') or [],
+            wait_seconds=now - wait_started,
+            page_seconds=now - started_at if started_at is not None else None
+        )
+        self._record(result)
+        phase_seconds.observe(result.wait_seconds, phase='readiness', retailer=retailer,
+                              outcome='ok' if result.ready else 'timeout')
+
+        print(f"Page ready={result.ready} after {result.wait_seconds:.2f}s wait"
+              + (f" (missing {', '.join(result.missing)})" if result.missing else ""))
+        return result
+
+    def _record(self, result):
+        with self._lock:
+            samples = self._timings.setdefault(result.retailer, deque(maxlen=self._history))
+            samples.append((result.page_seconds or result.wait_seconds, result.ready))
+
+    def stats(self):
+        """Return page timing percentiles and ready rate for each retailer."""
+        with self._lock:
+            snapshot = {retailer: list(samples) for retailer, samples in self._timings.items()}
+
+        stats = {}
+        for retailer, samples in snapshot.items():
+            durations = sorted(seconds for seconds, _ in samples)
+            stats[retailer] = {
+                'pages': len(samples),
+                'ready_rate': sum(1 for _, ready in samples if ready) / len(samples),
+                'p50_seconds': durations[len(durations) // 2],
+                'p95_seconds': durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            }
+        return stats
+
+
+page_readiness = PageReadiness(deadlines={'target.com': 10, 'traderjoes.com': 5})
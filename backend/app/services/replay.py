@@ -0,0 +1,55 @@
+"""Routing scraper page loads to recorded pages.
+
+When ``SCRAPER_REPLAY_URL`` points at a replay server (``python -m
+scraper_bench.serve``), the scrapers fetch product pages from it instead of
+the retailer, so scraper changes can be run and timed against a fixed
+corpus of recorded pages. The retailer adapter is still chosen from the
+original URL; only the address the page is loaded from changes::
+
+    https://www.target.com/p/-/A-84780837
+      -> http://127.0.0.1:8765/browser/www.target.com/p/-/A-84780837  (Selenium)
+      -> http://127.0.0.1:8765/http/www.target.com/p/-/A-84780837     (HTTP fast path)
+
+The browser route serves the page as rendered when it was recorded and the
+HTTP route the retailer's raw server response.
+"""
+
+from urllib.parse import urlparse
+
+
+class ReplayRouter:
+    """Rewrites product URLs to a replay server when one is configured.
+
+    Args:
+        base_url (str): Replay server address, or None to load live pages
+    """
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+
+    def init_app(self, app):
+        """Read the replay server address from the Flask config."""
+        self.base_url = app.config.get('SCRAPER_REPLAY_URL', self.base_url) or None
+
+    @property
+    def enabled(self):
+        return bool(self.base_url)
+
+    def url(self, url, mode):
+        """Return where to load ``url`` from.
+
+        Args:
+            url: Live product URL
+            mode: 'browser' for the rendered page, 'http' for the raw HTML
+
+        Returns:
+            str: ``url`` itself, or its address on the replay server
+        """
+        if not self.enabled:
+            return url
+        parsed = urlparse(url)
+        replayed = f"{self.base_url.rstrip('/')}/{mode}/{parsed.netloc}{parsed.path or '/'}"
+        return f'{replayed}?{parsed.query}' if parsed.query else replayed
+
+
+replay = ReplayRouter()
@@ -0,0 +1,251 @@
+"""Per-retailer rate limiting, retries and circuit breaking for scrapes.
+
+Every scrape runs through :data:`retailer_guard`, which for each retailer
+domain keeps:
+
+- a token bucket limiting how fast we open pages,
+- a bounded retry loop with jittered exponential backoff, and
+- a circuit breaker that, after repeated failures, rejects scrapes
+  immediately for a cool-down period instead of burning browser time on
+  pages that can't load. After the cool-down one trial scrape is let
+  through; its outcome closes or re-opens the breaker.
+"""
+
+import random
+import threading
+import time
+
+
+class ScrapeError(RuntimeError):
+    """Raised when a product page could not be scraped."""
+
+
+class CircuitOpenError(ScrapeError):
+    """Raised without scraping while a retailer's circuit breaker is open."""
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens per second, up to ``capacity``.
+
+    Args:
+        rate (float): Tokens added per second
+        capacity (float): Maximum burst size
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Take one token, waiting up to ``timeout`` seconds for it.
+
+        Returns:
+            bool: False if no token became available in time
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """Closed -> open after ``threshold`` consecutive failures -> half-open after ``reset_timeout``.
+
+    Args:
+        threshold (int): Consecutive failures that open the breaker
+        reset_timeout (float): Seconds the breaker stays open before a trial call
+    """
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise ``CircuitOpenError`` unless a call may proceed right now."""
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'open' or (self.state == 'half_open' and self._trial_running):
+                raise CircuitOpenError('Retailer is temporarily unavailable, try again later')
+            if self.state == 'half_open':
+                self._trial_running = True
+
+    def cancel_call(self):
+        """Release a half-open trial slot when the call never happened."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == 'half_open' or self.failures >= self.threshold:
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self.state == 'open':
+                retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+            return {'state': self.state, 'consecutive_failures': self.failures, 'retry_in_seconds': retry_in}
+
+
+class RetailerGuard:
+    """Applies rate limits, retries and circuit breakers per retailer domain.
+
+    Args:
+        rate_limits (dict): ``{domain: (pages_per_second, burst)}``
+        default_rate_limit (tuple): Limit for domains without an entry
+        max_retries (int): Extra attempts after the first failure
+        backoff (float): Base backoff in seconds, doubled per retry
+        breaker_threshold (int): Consecutive failures that open a breaker
+        breaker_reset (float): Seconds a breaker stays open
+        acquire_timeout (float): Seconds to wait for a rate limit token
+    """
+
+    def __init__(self, rate_limits=None, default_rate_limit=(1.0, 4), max_retries=2, backoff=1.0,
+                 breaker_threshold=5, breaker_reset=60, acquire_timeout=30):
+        self.rate_limits = dict(rate_limits or {})
+        self.default_rate_limit = default_rate_limit
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.acquire_timeout = acquire_timeout
+        self._retailers = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read limits, retry and breaker settings from the Flask config."""
+        self.rate_limits.update(app.config.get('SCRAPER_RATE_LIMITS', {}))
+        self.max_retries = app.config.get('SCRAPER_MAX_RETRIES', self.max_retries)
+        self.backoff = app.config.get('SCRAPER_RETRY_BACKOFF', self.backoff)
+        self.breaker_threshold = app.config.get('SCRAPER_BREAKER_THRESHOLD', self.breaker_threshold)
+        self.breaker_reset = app.config.get('SCRAPER_BREAKER_RESET', self.breaker_reset)
+        with self._lock:
+            self._retailers.clear()
+
+    def _retailer(self, retailer):
+        with self._lock:
+            state = self._retailers.get(retailer)
+            if state is None:
+                rate, burst = self.rate_limits.get(retailer, self.default_rate_limit)
+                state = {
+                    'bucket': TokenBucket(rate, burst),
+                    'breaker': CircuitBreaker(self.breaker_threshold, self.breaker_reset),
+                    'counts': {'attempts': 0, 'retries': 0, 'failures': 0, 'rejected': 0, 'throttled': 0}
+                }
+                self._retailers[retailer] = state
+            return state
+
+    def _count(self, state, key):
+        with self._lock:
+            state['counts'][key] += 1
+
+    def call(self, retailer, fn, *args, **kwargs):
+        """Run ``fn(*args, **kwargs)`` under ``retailer``'s limits.
+
+        Raises:
+            CircuitOpenError: If the retailer's breaker is open
+            ScrapeError: If the rate limit wait timed out
+            Exception: The last error once retries are exhausted
+        """
+        state = self._retailer(retailer)
+        breaker = state['breaker']
+
+        for attempt in range(self.max_retries + 1):
+            self._admit(retailer, state)
+            if attempt:
+                self._count(state, 'retries')
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self.report(retailer, ok=False)
+                print(f"Scrape attempt {attempt + 1} for {retailer} failed: {str(e)}")
+                if attempt == self.max_retries or breaker.state == 'open':
+                    raise
+                # Full jitter keeps retries from many requests from lining up
+                time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+            else:
+                self.report(retailer, ok=True)
+                return result
+
+    def _admit(self, retailer, state):
+        try:
+            state['breaker'].before_call()
+        except CircuitOpenError:
+            self._count(state, 'rejected')
+            raise
+
+        if not state['bucket'].acquire(self.acquire_timeout):
+            state['breaker'].cancel_call()
+            self._count(state, 'throttled')
+            raise ScrapeError(f'Rate limit for {retailer} exceeded, try again later')
+        self._count(state, 'attempts')
+
+    def admit(self, retailer):
+        """Claim one scrape attempt for ``retailer`` without running it here.
+
+        For callers that start a page now and finish it later (such as
+        multi-tab scraping); every admitted attempt must be followed by
+        :meth:`report`. Nothing is retried.
+
+        Raises:
+            CircuitOpenError: If the retailer's breaker is open
+            ScrapeError: If the rate limit wait timed out
+        """
+        self._admit(retailer, self._retailer(retailer))
+
+    def available(self, retailer):
+        """Return False while ``retailer``'s breaker is open and would reject a call."""
+        with self._lock:
+            state = self._retailers.get(retailer)
+        if state is None:
+            return True
+        breaker = state['breaker'].snapshot()
+        return breaker['state'] != 'open' or breaker['retry_in_seconds'] == 0
+
+    def report(self, retailer, ok):
+        """Record the outcome of an admitted attempt on ``retailer``'s breaker."""
+        state = self._retailer(retailer)
+        if ok:
+            state['breaker'].record_success()
+        else:
+            state['breaker'].record_failure()
+            self._count(state, 'failures')
+
+    def stats(self):
+        """Return breaker state and attempt/retry/failure counts per retailer."""
+        with self._lock:
+            retailers = dict(self._retailers)
+        return {
+            retailer: dict(state['counts'], breaker=state['breaker'].snapshot())
+            for retailer, state in retailers.items()
+        }
+
+
+retailer_guard = RetailerGuard()
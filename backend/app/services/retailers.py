@@ -0,0 +1,214 @@
+"""Retailer adapter registry.
+
+Every supported retailer is described by a :class:`RetailerAdapter` keyed by
+its hostname. The adapter says how to get product data from its pages as
+cheaply as possible:
+
+- ``strategy = 'http'`` tries the plain HTTP extractor first and only opens
+  a browser if required fields are missing (or fails if the adapter has no
+  browser scraper);
+- ``strategy = 'browser'`` goes straight to a pooled browser.
+
+Adapters also carry their own HTTP timeout, readiness deadline and a limit
+on how many of their pages are scraped at once. Routes and the scraper ask
+:data:`retailers` which adapter handles a URL instead of matching domain
+strings themselves.
+
+Retailers can be added without touching this package by publishing a
+``grabbit.retailers`` entry point that resolves to a ``RetailerAdapter`` (or
+a zero-argument callable returning one)::
+
+    [project.entry-points."grabbit.retailers"]
+    safeway = "grabbit_safeway:adapter"
+"""
+
+import importlib
+import threading
+from contextlib import contextmanager
+from importlib.metadata import entry_points
+from urllib.parse import urlparse
+
+from app.services.readiness import page_readiness
+
+ENTRY_POINT_GROUP = 'grabbit.retailers'
+
+
+class RetailerAdapter:
+    """How to scrape one retailer's product pages.
+
+    Args:
+        domain (str): Registrable domain, e.g. ``'target.com'``; subdomains match too
+        store_name (str): Name saved on products and orders
+        strategy (str): 'http' to try server-rendered HTML first, 'browser' to skip it
+        browser_scraper (callable or str): ``scraper(url, driver)`` returning product
+            info, or a ``'module:function'`` path resolved on first use
+        required_fields (tuple): Fields the HTTP extractor must find to skip the browser
+        http_timeout (float): Timeout for the HTTP fetch, in seconds
+        ready_deadline (float): Seconds to wait for the browser page to become ready
+        concurrency (int): Maximum pages of this retailer scraped at once
+        head_only (bool): Product data is all in ``<head>`` meta tags, so the
+            HTTP extractor can stop parsing at ``</head>``
+    """
+
+    def __init__(self, domain, store_name, strategy='http', browser_scraper=None,
+                 required_fields=('name', 'price', 'image_url'), http_timeout=5,
+                 ready_deadline=10, concurrency=4, head_only=False):
+        if strategy not in ('http', 'browser'):
+            raise ValueError(f"Unknown scrape strategy '{strategy}' for {domain}")
+        if strategy == 'browser' and browser_scraper is None:
+            raise ValueError(f"Browser strategy for {domain} needs a browser scraper")
+        self.domain = domain
+        self.store_name = store_name
+        self.strategy = strategy
+        self.browser_scraper = browser_scraper
+        self.required_fields = tuple(required_fields)
+        self.http_timeout = http_timeout
+        self.ready_deadline = ready_deadline
+        self.concurrency = concurrency
+        self.head_only = head_only
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def matches(self, host):
+        return host == self.domain or host.endswith(f'.{self.domain}')
+
+    def get_browser_scraper(self):
+        """Return the browser scraper, importing it if given as a path."""
+        if isinstance(self.browser_scraper, str):
+            module_name, _, attr = self.browser_scraper.partition(':')
+            self.browser_scraper = getattr(importlib.import_module(module_name), attr)
+        return self.browser_scraper
+
+    def acquire_slot(self, blocking=True):
+        """Take one of this retailer's concurrent scrape slots.
+
+        Returns:
+            bool: False if ``blocking`` is False and no slot is free
+        """
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(self.concurrency)
+            slots = self._slots
+        return slots.acquire(blocking)
+
+    def release_slot(self):
+        """Give back a slot taken with :meth:`acquire_slot`."""
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of this retailer's concurrent scrape slots."""
+        self.acquire_slot()
+        try:
+            yield
+        finally:
+            self.release_slot()
+
+    def to_dict(self):
+        return {
+            'domain': self.domain,
+            'store_name': self.store_name,
+            'strategy': self.strategy,
+            'browser_fallback': self.browser_scraper is not None,
+            'http_timeout': self.http_timeout,
+            'ready_deadline': self.ready_deadline,
+            'concurrency': self.concurrency,
+            'head_only': self.head_only
+        }
+
+
+class RetailerRegistry:
+    """Supported retailers, looked up by the hostname of a product URL."""
+
+    def __init__(self, adapters=()):
+        self._adapters = {}
+        self._plugins_loaded = False
+        for adapter in adapters:
+            self.register(adapter)
+
+    def init_app(self, app):
+        """Load entry point adapters and apply per-retailer config overrides.
+
+        ``SCRAPER_RETAILERS`` maps a domain to adapter attributes to override,
+        e.g. ``{'target.com': {'strategy': 'browser', 'concurrency': 2}}``.
+        ``SCRAPER_READY_DEADLINES`` still sets readiness deadlines.
+        """
+        if app.config.get('SCRAPER_RETAILER_PLUGINS', True):
+            self.load_entry_points()
+
+        deadlines = app.config.get('SCRAPER_READY_DEADLINES', {})
+        for domain, overrides in app.config.get('SCRAPER_RETAILERS', {}).items():
+            adapter = self._adapters.get(domain)
+            if adapter is None:
+                print(f"Ignoring settings for unknown retailer {domain}")
+                continue
+            for name, value in overrides.items():
+                setattr(adapter, name, value)
+        for adapter in self._adapters.values():
+            adapter.ready_deadline = deadlines.get(adapter.domain, adapter.ready_deadline)
+            page_readiness.deadlines[adapter.domain] = adapter.ready_deadline
+
+    def register(self, adapter):
+        """Add ``adapter``, replacing any adapter for the same domain."""
+        self._adapters[adapter.domain] = adapter
+        return adapter
+
+    def load_entry_points(self):
+        """Register adapters published under the ``grabbit.retailers`` entry point group."""
+        if self._plugins_loaded:
+            return
+        self._plugins_loaded = True
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                adapter = entry_point.load()
+                if not isinstance(adapter, RetailerAdapter):
+                    adapter = adapter()
+                self.register(adapter)
+                print(f"Loaded retailer adapter {adapter.domain} from {entry_point.value}")
+            except Exception as e:
+                print(f"Failed to load retailer adapter {entry_point.name}: {str(e)}")
+
+    def for_url(self, url):
+        """Return the adapter for ``url``'s hostname, or None if unsupported."""
+        try:
+            host = (urlparse(url.strip()).hostname or '').lower()
+        except (AttributeError, ValueError):
+            return None
+        for adapter in self._adapters.values():
+            if adapter.matches(host):
+                return adapter
+        return None
+
+    def store_name(self, url):
+        """Return the store name saved on products and orders for ``url``."""
+        adapter = self.for_url(url)
+        return adapter.store_name if adapter else None
+
+    def get(self, domain):
+        return self._adapters.get(domain)
+
+    def __iter__(self):
+        return iter(list(self._adapters.values()))
+
+
+retailers = RetailerRegistry([
+    RetailerAdapter(
+        'target.com', 'Target',
+        browser_scraper='app.services.selenium_scraper:scrape_target_product',
+        required_fields=('name', 'price', 'image_url'),
+        ready_deadline=10
+    ),
+    RetailerAdapter(
+        'traderjoes.com', 'Trader Joes',
+        browser_scraper='app.services.selenium_scraper:scrape_trader_joes_product',
+        # Trader Joe's price is not reliably exposed
+        required_fields=('name', 'image_url'),
+        ready_deadline=5
+    ),
+    # Ralphs product pages carry og:* and JSON-LD data, so no browser is needed
+    RetailerAdapter(
+        'ralphs.com', 'Ralphs',
+        required_fields=('name', 'image_url'),
+        concurrency=2
+    )
+])
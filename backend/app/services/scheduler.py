@@ -0,0 +1,50 @@
+"""Minimal periodic task runner for background maintenance jobs.
+
+Tasks run on daemon threads inside an application context. They are started
+by ``worker.py --scheduler`` so that exactly one process runs them, rather
+than every web worker.
+"""
+
+import threading
+
+from app import db
+
+
+class PeriodicTask:
+    """Calls ``fn()`` every ``interval`` seconds on a background thread.
+
+    Args:
+        name (str): Thread name, also used in log messages
+        fn (callable): Zero-argument function to run
+        interval (float): Seconds between the end of one run and the next
+    """
+
+    def __init__(self, name, fn, interval):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, app):
+        """Start running the task inside ``app``'s context."""
+        self._thread = threading.Thread(target=self._loop, args=(app,), name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Ask the task to stop and wait for the current run to finish."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _loop(self, app):
+        while not self._stop.is_set():
+            with app.app_context():
+                try:
+                    self.fn()
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Periodic task {self.name} failed: {str(e)}")
+                finally:
+                    db.session.remove()
+            self._stop.wait(self.interval)
@@ -0,0 +1,189 @@
+"""Asynchronous scrape jobs.
+
+``POST /scrape/jobs`` hands URLs to :data:`scrape_jobs`, which runs each
+scrape on a background thread pool and returns a job ID immediately, so a
+slow browser session no longer holds a WSGI worker. Clients poll (or
+long-poll) ``GET /scrape/jobs/<id>``, or pass a ``callback_url`` that
+receives the finished job as a JSON POST.
+
+With ``SCRAPE_JOBS_BACKEND = 'thread'`` (the default) jobs live in process
+memory and are dropped after ``SCRAPE_JOBS_RETENTION`` seconds once
+finished. With ``'queue'`` the web tier only inserts rows into the durable
+``scrape_jobs`` table (see ``app/services/job_queue.py``) and standalone
+``worker.py`` processes do the scraping.
+
+Callback URLs are fetched by the server, so they must be http(s) URLs on a
+public address, or on one of ``SCRAPE_JOBS_CALLBACK_HOSTS`` when that
+allowlist is set. They are checked when the job is submitted and again
+before the callback is sent.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+from app import db
+from app.utils.validators import is_public_url
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeJob:
+    """A single URL scrape tracked by the in-process job runner.
+
+    Attributes:
+        id (str): Opaque job identifier
+        url (str): Product URL to scrape
+        status (str): 'queued', 'running', 'succeeded' or 'failed'
+        result (dict): ``Product.to_dict()`` of the product once succeeded
+        error (str): Failure message once failed
+        callback_url (str): Optional URL notified when the job finishes
+    """
+
+    def __init__(self, url, callback_url=None):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.callback_url = callback_url
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ScrapeJobRunner:
+    """Runs scrape jobs on a background executor and keeps their results.
+
+    Args:
+        backend (str): 'thread' to scrape in this process, 'queue' to hand
+            jobs to the durable queue
+        max_workers (int): Scrapes run concurrently in the background
+        retention (float): Seconds a finished job stays queryable
+        callback_hosts (list): Hosts callbacks may be sent to; empty allows
+            any public host
+    """
+
+    def __init__(self, backend='thread', max_workers=4, retention=3600, callback_hosts=None):
+        self.app = None
+        self.backend = backend
+        self.max_workers = max_workers
+        self.retention = retention
+        self.callback_hosts = list(callback_hosts or [])
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Bind the runner to ``app`` so jobs can use the database."""
+        self.app = app
+        self.backend = app.config.get('SCRAPE_JOBS_BACKEND', self.backend)
+        self.max_workers = app.config.get('SCRAPE_JOBS_MAX_WORKERS', self.max_workers)
+        self.retention = app.config.get('SCRAPE_JOBS_RETENTION', self.retention)
+        self.callback_hosts = app.config.get('SCRAPE_JOBS_CALLBACK_HOSTS', self.callback_hosts)
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='scrape-job')
+            return self._executor
+
+    def callback_allowed(self, callback_url):
+        """Return True if the server may POST to ``callback_url``."""
+        return is_public_url(callback_url, self.callback_hosts)
+
+    def send_callback(self, callback_url, payload):
+        """POST a finished job to its callback URL, logging (not raising) failures."""
+        # Checked again here: the host may resolve differently than at submit time
+        if not self.callback_allowed(callback_url):
+            logger.warning("Callback to %s skipped: not an allowed callback URL", callback_url)
+            return
+        try:
+            requests.post(callback_url, json=payload, timeout=5, allow_redirects=False)
+        except Exception as e:
+            logger.warning("Callback to %s failed: %s", callback_url, e)
+
+    def submit(self, url, callback_url=None):
+        """Queue a scrape of ``url`` and return its job without waiting."""
+        if self.backend == 'queue':
+            from app.services.job_queue import enqueue_job
+            return enqueue_job(url, callback_url)
+
+        job = ScrapeJob(url, callback_url)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self.executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id):
+        """Return the job with ``job_id``, or None if unknown or expired."""
+        if self.backend == 'queue':
+            from app.services.job_queue import get_job
+            return get_job(job_id)
+
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job, timeout):
+        """Block up to ``timeout`` seconds for ``job`` to finish (long-polling)."""
+        if self.backend != 'queue':
+            job.done.wait(timeout)
+            return job
+
+        # Queued jobs finish in another process, so poll the row
+        deadline = time.monotonic() + timeout
+        while job.status not in ('succeeded', 'dead') and time.monotonic() < deadline:
+            time.sleep(0.5)
+            db.session.refresh(job)
+        return job
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at and job.finished_at.timestamp() < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job):
+        from app.services.product_cache import product_cache
+
+        job.status = 'running'
+        with self.app.app_context():
+            try:
+                job.result = product_cache.lookup(job.url)
+                job.status = 'succeeded'
+            except Exception as e:
+                db.session.rollback()
+                print(f"Scrape job {job.id} failed: {str(e)}")
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                db.session.remove()
+
+        job.finished_at = datetime.now(timezone.utc)
+        job.done.set()
+
+        if job.callback_url:
+            self.send_callback(job.callback_url, job.to_dict())
+
+
+scrape_jobs = ScrapeJobRunner()
@@ -0,0 +1,159 @@
+"""Adaptive ordering of candidate selectors.
+
+Retailers change their markup without notice, and the price selector that
+used to match first can quietly stop matching. :data:`selector_stats`
+records which candidate selectors hit or miss on every scrape and hands the
+scrapers their candidates ordered by recent success rate, so the selector
+that currently works is tried first (and wins when several match).
+
+Success rates are exponentially decayed so they follow markup changes
+within a few dozen pages. Unseen selectors start at an even prior, which
+lets a fallback overtake a selector that has started to fail. Stats are
+saved to a JSON file so the learned order survives restarts.
+
+When no candidate has matched for ``alert_after`` seconds (over at least
+``alert_min_misses`` scrapes) an alert is logged and counted in the
+``scraper_selector_alerts_total`` metric.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+from app.services.metrics import metrics
+
+selector_alerts = metrics.counter(
+    'scraper_selector_alerts_total', 'Times no candidate selector matched for too long',
+    labels=('retailer', 'field'))
+
+
+class SelectorStats:
+    """Per-retailer selector hit rates, persisted to ``path``.
+
+    Args:
+        path (str): JSON file the stats are loaded from and saved to, or None
+        decay (float): Weight kept by older observations on each new one
+        prior (float): Success rate assumed for selectors never tried
+        alert_after (float): Seconds without any match before alerting
+        alert_min_misses (int): Scrapes without a match needed before alerting
+        save_interval (float): Minimum seconds between writes to ``path``
+    """
+
+    def __init__(self, path=None, decay=0.9, prior=0.5, alert_after=1800,
+                 alert_min_misses=5, save_interval=30):
+        self.path = path
+        self.decay = decay
+        self.prior = prior
+        self.alert_after = alert_after
+        self.alert_min_misses = alert_min_misses
+        self.save_interval = save_interval
+        self._rates = {}
+        self._fields = {}
+        self._last_saved = 0
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+
+    def init_app(self, app):
+        """Read settings from the Flask config and load saved stats."""
+        self.path = app.config.get('SCRAPER_SELECTOR_STATS_PATH', self.path)
+        self.decay = app.config.get('SCRAPER_SELECTOR_DECAY', self.decay)
+        self.alert_after = app.config.get('SCRAPER_SELECTOR_ALERT_AFTER', self.alert_after)
+        self.alert_min_misses = app.config.get('SCRAPER_SELECTOR_ALERT_MIN_MISSES', self.alert_min_misses)
+        self.load()
+
+    def order(self, retailer, field, candidates):
+        """Return ``candidates`` sorted by recent success rate, best first.
+
+        Ties keep the given order, so the hand-written order applies until
+        there is evidence against it.
+        """
+        key = f'{retailer}:{field}'
+        with self._lock:
+            rates = self._rates.get(key, {})
+            return sorted(candidates, key=lambda selector: -rates.get(selector, self.prior))
+
+    def record(self, retailer, field, attempts):
+        """Record the selectors tried on one page, in the order they were tried.
+
+        Args:
+            retailer: Retailer domain
+            field: Field the selectors extract, e.g. ``'price'``
+            attempts: ``[{'selector': str, 'hit': bool}, ...]``
+        """
+        if not attempts:
+            return
+        key = f'{retailer}:{field}'
+        now = time.time()
+        matched = any(attempt['hit'] for attempt in attempts)
+        alert = None
+        with self._lock:
+            rates = self._rates.setdefault(key, {})
+            for attempt in attempts:
+                previous = rates.get(attempt['selector'], self.prior)
+                rates[attempt['selector']] = previous * self.decay + (1 - self.decay) * bool(attempt['hit'])
+
+            state = self._fields.setdefault(key, {'last_hit_at': now, 'misses_since_hit': 0, 'alerted': False})
+            if matched:
+                state.update(last_hit_at=now, misses_since_hit=0, alerted=False)
+            else:
+                state['misses_since_hit'] += 1
+                if (not state['alerted'] and now - state['last_hit_at'] >= self.alert_after
+                        and state['misses_since_hit'] >= self.alert_min_misses):
+                    state['alerted'] = True
+                    alert = (now - state['last_hit_at'], state['misses_since_hit'])
+
+        if alert:
+            selector_alerts.inc(retailer=retailer, field=field)
+            print(f"ALERT: no {field} selector has matched on {retailer} for {alert[0]:.0f}s "
+                  f"({alert[1]} pages); its markup has probably changed")
+
+        if now - self._last_saved >= self.save_interval:
+            self.save()
+
+    def load(self):
+        """Load saved stats from ``path``, starting fresh if it is missing or unreadable."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to load selector stats from {self.path}: {str(e)}")
+            return
+        with self._lock:
+            self._rates = saved.get('rates', {})
+            self._fields = saved.get('fields', {})
+
+    def save(self):
+        """Write the stats to ``path`` atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps({'rates': self._rates, 'fields': self._fields}, indent=2)
+            self._last_saved = time.time()
+        try:
+            tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save selector stats to {self.path}: {str(e)}")
+
+    def stats(self):
+        """Return each field's selector order, success rates and time since the last match."""
+        now = time.time()
+        with self._lock:
+            return {
+                key: {
+                    'order': sorted(rates, key=lambda selector: -rates[selector]),
+                    'success_rates': dict(rates),
+                    'seconds_since_match': now - self._fields.get(key, {}).get('last_hit_at', now),
+                    'alerting': self._fields.get(key, {}).get('alerted', False)
+                }
+                for key, rates in self._rates.items()
+            }
+
+
+selector_stats = SelectorStats()
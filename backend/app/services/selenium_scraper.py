@@ -1,15 +1,71 @@
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.keys import Keys
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import WebDriverException
+from concurrent.futures import ThreadPoolExecutor
+import inspect
 import json
 import time
 import os
 
+from app.services.chrome_profiles import chrome_profiles, is_profile_error
+from app.services.driver_pool import driver_pool
+from app.services.html_parser import html_parser
+from app.services.http_extractor import http_extractor
+from app.services.load_profile import load_profile
+from app.services.metrics import scrape_seconds, selector_seconds, span
+from app.services.readiness import TARGET_PRICE_SELECTORS, page_readiness
+from app.services.replay import replay
+from app.services.resilience import ScrapeError, retailer_guard
+from app.services.retailers import retailers
+from app.services.selector_stats import selector_stats
+from app.services.singleflight import SingleFlight
+from app.utils.urls import canonicalize_url
+
+# Coalesces concurrent scrapes of the same product
+scrape_flights = SingleFlight()
+
+# Collects every field of a Target product page in a single WebDriver call.
+# Price selectors are tried in order inside the page, so a miss costs nothing.
+TARGET_EXTRACT_JS = """
+const priceSelectors = arguments[0];
+function text(selector) {
+    const el = document.querySelector(selector);
+    const value = el ? (el.textContent || '').trim() : '';
+    return value || null;
+}
+function meta(property) {
+    const el = document.querySelector(`meta[property="${property}"]`);
+    const value = el ? (el.getAttribute('content') || '').trim() : '';
+    return value || null;
+}
+
+let price = null;
+let priceSelector = null;
+const selectorAttempts = [];
+for (const selector of priceSelectors) {
+    const started = performance.now();
+    price = text(selector);
+    selectorAttempts.push({selector: selector, ms: performance.now() - started, hit: !!price});
+    if (price) {
+        priceSelector = selector;
+        break;
+    }
+}
+
+const canonical = document.querySelector('link[rel="canonical"]');
+return {
+    name: text('[data-test="product-title"]') || meta('og:title'),
+    price: price,
+    price_selector: priceSelector,
+    selector_attempts: selectorAttempts,
+    image_url: meta('og:image'),
+    canonical_url: canonical ? canonical.href : window.location.href,
+    page_title: document.title
+};
+"""
+
 def create_driver():
     chrome_options = Options()
     chrome_options.add_argument('--headless=new')  # New headless mode
@@ -35,122 +91,131 @@ def create_driver():
         'profile.password_manager_enabled': False
     }
     chrome_options.add_experimental_option('prefs', prefs)
+
+    # 'eager' returns at DOMContentLoaded; readiness detection waits for the fields
+    chrome_options.page_load_strategy = load_profile.page_load_strategy
+    
+    # Start from a persistent profile, when configured, so the HTTP cache and cookies stay warm
+    profile = chrome_profiles.acquire()
+    if profile:
+        chrome_options.add_argument(f'--user-data-dir={profile.path}')
+        chrome_options.add_argument(f'--disk-cache-size={chrome_profiles.max_cache}')
     
     # Create a new ChromeDriver service
     service = Service()
     
     try:
         driver = webdriver.Chrome(service=service, options=chrome_options)
-        return driver
     except Exception as e:
-        print(f"Failed to create Chrome driver: {str(e)}")
-        raise
+        if profile is None or not is_profile_error(e):
+            # Transient failures (a port clash, a slow machine) keep the warm profile
+            chrome_profiles.release(profile)
+            print(f"Failed to create Chrome driver: {str(e)}")
+            raise
+        # The error points at the profile, so start it over once
+        print(f"Chrome failed to start with profile {profile.path}, resetting it: {str(e)}")
+        try:
+            chrome_profiles.reset(profile)
+            driver = webdriver.Chrome(service=Service(), options=chrome_options)
+        except Exception as e:
+            chrome_profiles.release(profile)
+            print(f"Failed to create Chrome driver: {str(e)}")
+            raise
 
-def scrape_target_product(url, driver):
+    # Released by the driver pool once this Chrome has quit
+    driver._grabbit_profile = profile
+    return driver
+
+def quit_driver(driver):
+    """Quit a driver from ``create_driver`` and free its Chrome profile slot.
+
+    For drivers used outside the driver pool, which otherwise does this.
+    """
     try:
-        print("Loading page...")
-        driver.get(url)
-        
-        # Wait for page to load
-        time.sleep(3)  # Give JavaScript time to execute
-        print("Page loaded, starting to scrape...")
+        driver.quit()
+    finally:
+        chrome_profiles.release(getattr(driver, '_grabbit_profile', None))
 
-        # Wait for product details to load
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-test="product-title"]'))
-        )
-        
-        # Try multiple price selectors
-        price_selectors = [
-            '[data-test="product-price"]',
-            'span[data-test="product-price"]',
-            'div[data-test="product-price"]',
-            'span.h-text-bs',  # Common price class
-            '.style-price'
-        ]
-        
-        price = None
-        for selector in price_selectors:
-            try:
-                price_element = WebDriverWait(driver, 2).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                price = price_element.text.strip()
-                if price:
-                    print(f"Found price using selector: {selector}")
-                    break
-            except Exception as e:
-                print(f"Selector {selector} failed: {str(e)}")
-                continue
+def _record_selector_attempts(retailer, attempts):
+    for attempt in attempts or []:
+        selector_seconds.observe(attempt['ms'] / 1000, retailer=retailer, selector=attempt['selector'],
+                                 outcome='hit' if attempt['hit'] else 'miss')
 
-        # If still no price, try JavaScript approach
-        if not price:
-            try:
-                price = driver.execute_script(
-                    'return document.querySelector("[data-test=\'product-price\']").textContent'
-                )
-                if price:
-                    print("Found price using JavaScript")
-            except Exception as e:
-                print(f"JavaScript price extraction failed: {str(e)}")
-
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-
-        # Scrape title
-        name = None
-        try:
-            title_element = driver.find_element(By.CSS_SELECTOR, '[data-test="product-title"]')
-            if title_element:
-                name = title_element.text.strip()
-        except Exception:
-            name_meta = soup.find('meta', property='og:title')
-            name = name_meta['content'].strip() if name_meta else None
-
-        # Scrape image
-        image_meta = soup.find('meta', property='og:image')
-        image = image_meta['content'].strip() if image_meta else None
+def scrape_target_product(url, driver, navigated_at=None):
+    try:
+        started = navigated_at or time.monotonic()
+        if navigated_at is None:
+            print("Loading page...")
+            with span('navigation', 'target.com'):
+                driver.get(url)
+
+        # Wait until title, price and image are rendered instead of sleeping
+        page_readiness.wait(driver, 'target.com', started_at=started)
+        print("Page loaded, starting to scrape...")
+
+        # Try the price selectors that have been matching lately first
+        price_selectors = selector_stats.order('target.com', 'price', TARGET_PRICE_SELECTORS)
+        # Pull every field in one round trip instead of a WebDriver call per selector
+        with span('extraction', 'target.com') as extraction:
+            extracted = driver.execute_script(TARGET_EXTRACT_JS, price_selectors) or {}
+            if not extracted.get('name'):
+                extraction.outcome = 'missing_name'
+                raise ScrapeError(f"No product title on page ({extracted.get('page_title')})")
+            if not extracted.get('price'):
+                extraction.outcome = 'missing_price'
+        _record_selector_attempts('target.com', extracted.get('selector_attempts'))
+        selector_stats.record('target.com', 'price', extracted.get('selector_attempts'))
+        price = extracted.get('price')
+        if price:
+            print(f"Found price using selector: {extracted.get('price_selector')}")
 
         # Print debug info
         print("\nDebug Info:")
         print(f"Price found: {price}")
-        print(f"Page title: {driver.title}")
-        print(f"Current URL: {driver.current_url}")
+        print(f"Page title: {extracted.get('page_title')}")
+        print(f"Canonical URL: {extracted.get('canonical_url')}")
 
         return {
-            "name": name,
-            "image_url": image,
-            "price": price if price else "Price not listed"
+            "name": extracted.get('name'),
+            "image_url": extracted.get('image_url'),
+            "price": price if price else "Price not listed",
+            "canonical_url": extracted.get('canonical_url')
         }
 
+    except WebDriverException:
+        # Left as is so the driver pool discards the crashed session
+        raise
     except Exception as e:
         print(f"Scraping failed: {str(e)}")
-        return {
-            "name": None,
-            "image_url": None,
-            "price": "Error: Failed to scrape product"}
+        raise ScrapeError(f"Failed to scrape product: {str(e)}") from e
 
-    return {
-        "name": name,
-        "image_url": image,
-        "price": price if price else "Price not listed"
-    }
 
+def scrape_trader_joes_product(url, driver, navigated_at=None):
+    started = navigated_at or time.monotonic()
+    if navigated_at is None:
+        with span('navigation', 'traderjoes.com'):
+            driver.get(url)
+    page_readiness.wait(driver, 'traderjoes.com', started_at=started)
 
-def scrape_trader_joes_product(url, driver):
-    driver.get(url)
-    time.sleep(2)  # Trader Joe's is lighter
+    with span('extraction', 'traderjoes.com'):
+        html = driver.page_source
 
-    soup = BeautifulSoup(driver.page_source, 'html.parser')
+    with span('parse', 'traderjoes.com') as parse:
+        # Only the og:* tags and the price span are read
+        soup = html_parser.parse(html, tags=('meta', 'span'))
+        name_meta = soup.find('meta', property='og:title')
+        name = name_meta['content'].strip() if name_meta else None
 
-    name_meta = soup.find('meta', property='og:title')
-    name = name_meta['content'].strip() if name_meta else None
+        image_meta = soup.find('meta', property='og:image')
+        image = image_meta['content'].strip() if image_meta else None
 
-    image_meta = soup.find('meta', property='og:image')
-    image = image_meta['content'].strip() if image_meta else None
+        if not name:
+            parse.outcome = 'missing_name'
+            raise ScrapeError(f"No product title on page ({driver.title})")
 
-    # Trader Joe's price is not reliably exposed
-    price_span = soup.find('span', class_=lambda c: c and c.startswith('ProductPrice_productPrice__price'))
-    price = price_span.text.strip() if price_span else "Price not listed"
+        # Trader Joe's price is not reliably exposed
+        price_span = soup.find('span', class_=lambda c: c and c.startswith('ProductPrice_productPrice__price'))
+        price = price_span.text.strip() if price_span else "Price not listed"
 
     return {
         "name": name,
@@ -158,37 +223,273 @@ def scrape_trader_joes_product(url, driver):
         "price": price
     }
 
+def _fetch_product_info(url, adapter):
+    started = time.monotonic()
+    method = 'http'
+    outcome = 'error'
+    try:
+        info = None
+        # Server-rendered HTML is often enough; only start a browser when it isn't
+        if adapter.strategy == 'http' and (http_extractor.enabled or adapter.browser_scraper is None):
+            info = http_extractor.extract(replay.url(url, 'http'), adapter.domain, adapter.required_fields,
+                                          adapter.http_timeout, head_only=adapter.head_only)
+        if info is None:
+            scraper = adapter.get_browser_scraper()
+            if scraper is None:
+                raise ScrapeError(f"Could not read product details from {adapter.store_name} page")
+            method = 'browser'
+            # Borrow a warm browser from the pool instead of launching a new one
+            with driver_pool.driver(retailer=adapter.domain) as driver:
+                load_profile.prepare(driver, adapter.domain)
+                info = scraper(replay.url(url, 'browser'), driver)
+                load_profile.record(driver, adapter.domain)
+        outcome = 'ok'
+        return info
+    finally:
+        scrape_seconds.observe(time.monotonic() - started, retailer=adapter.domain,
+                               method=method, outcome=outcome)
+
+def _parse_price(info):
+    # Convert price string to number
+    if isinstance(info['price'], str) and '$' in info['price']:
+        # Extract first number after $ sign
+        price_str = info['price'].split('$')[1].split()[0]
+        try:
+            info['price'] = float(price_str)
+        except ValueError:
+            info['price'] = 0.0
+    return info
+
+def _scrape_product_info(url, adapter):
+    # Rate limited, retried and circuit-broken per retailer
+    with adapter.slot():
+        info = retailer_guard.call(adapter.domain, _fetch_product_info, url, adapter)
+    return _parse_price(info)
+
+def _accepts_navigated_at(scraper):
+    """Return True if a browser scraper takes the ``navigated_at`` keyword.
+
+    Scrapers from retailer plugins may only take ``(url, driver)``; those
+    navigate the tab to the page again themselves.
+    """
+    try:
+        parameters = inspect.signature(scraper).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(parameter.name == 'navigated_at' or parameter.kind == parameter.VAR_KEYWORD
+               for parameter in parameters)
+
+def _scrape_in_tabs(adapter, urls):
+    """Scrape several of one retailer's pages in tabs of a single browser.
+
+    Every page starts loading in its own tab before any of them is read, so
+    the page loads overlap while one Chrome process serves all of them.
+    Readiness waits and extraction then run tab by tab.
+
+    Like single scrapes, every tab holds one of the retailer's concurrency
+    slots, and a page already being scraped elsewhere (by canonical URL) is
+    waited for instead of being loaded again.
+
+    Returns:
+        dict: Outcome per URL. URLs that were never reached (no free slot,
+            or the browser crashed) are missing so the caller can retry them.
+    """
+    scraper = adapter.get_browser_scraper()
+    pass_navigated_at = _accepts_navigated_at(scraper)
+    outcomes = {}
+    leading = []
+    following = []
+    slots = 0
+    try:
+        for url in urls:
+            # Only the first tab waits for a slot, so groups never hold some slots while waiting for more
+            if not adapter.acquire_slot(blocking=not slots):
+                break
+            slots += 1
+            key = canonicalize_url(url)
+            future, leader = scrape_flights.begin(key)
+            if not leader:
+                adapter.release_slot()
+                slots -= 1
+                following.append((url, future))
+                continue
+            try:
+                retailer_guard.admit(adapter.domain)
+            except ScrapeError as e:
+                adapter.release_slot()
+                slots -= 1
+                scrape_flights.finish(key, future, error=e)
+                outcomes[url] = {"url": url, "ok": False, "error": str(e)}
+                continue
+            leading.append((url, key, future))
+
+        if leading:
+            _load_tabs(adapter, scraper, pass_navigated_at, leading, outcomes)
+    finally:
+        for _ in range(slots):
+            adapter.release_slot()
+
+    for url, future in following:
+        try:
+            outcomes[url] = {"url": url, "ok": True, "info": dict(future.result())}
+        except Exception as e:
+            outcomes[url] = {"url": url, "ok": False, "error": str(e)}
+    return outcomes
+
+def _load_tabs(adapter, scraper, pass_navigated_at, leading, outcomes):
+    """Load and read the admitted ``leading`` pages in tabs of one pooled driver."""
+    error = None
+    try:
+        with driver_pool.driver(retailer=adapter.domain, pages=len(leading)) as driver:
+            home = driver.current_window_handle
+            opened = []
+            for url, key, future in leading:
+                driver.switch_to.new_window('tab')
+                load_profile.prepare(driver, adapter.domain, new_tab=True)
+                opened.append((driver.current_window_handle, url, key, future, time.monotonic()))
+                # Assigning the location starts the load without waiting for it
+                driver.execute_script('window.location.href = arguments[0];', replay.url(url, 'browser'))
+
+            for handle, url, key, future, started in opened:
+                driver.switch_to.window(handle)
+                page_url = replay.url(url, 'browser')
+                try:
+                    if pass_navigated_at:
+                        info = scraper(page_url, driver, navigated_at=started)
+                    else:
+                        info = scraper(page_url, driver)
+                    info = _parse_price(info)
+                    load_profile.record(driver, adapter.domain)
+                    retailer_guard.report(adapter.domain, ok=True)
+                    outcomes[url] = {"url": url, "ok": True, "info": info}
+                    scrape_flights.finish(key, future, result=info)
+                except WebDriverException:
+                    # The browser itself failed; handled below for every unread tab
+                    raise
+                except Exception as e:
+                    retailer_guard.report(adapter.domain, ok=False)
+                    print(f"Error scraping {url} in tab: {str(e)}")
+                    outcomes[url] = {"url": url, "ok": False, "error": str(e)}
+                    scrape_flights.finish(key, future, error=e)
+                finally:
+                    scrape_seconds.observe(time.monotonic() - started, retailer=adapter.domain, method='tab',
+                                           outcome='ok' if outcomes.get(url, {}).get('ok') else 'error')
+                driver.close()
+            driver.switch_to.window(home)
+    except Exception as e:
+        # The pool has discarded a crashed browser; unread pages are left for a regular scrape
+        print(f"Browser failed while scraping in tabs: {str(e)}")
+        error = e
+    finally:
+        for url, key, future in leading:
+            if not future.done():
+                # Admitted pages that were never read count as failed attempts
+                retailer_guard.report(adapter.domain, ok=False)
+                scrape_flights.finish(key, future, error=error or ScrapeError(f"Scrape of {url} was interrupted"))
+
 def scrape_product_info(url: str) -> dict:
-    """Scrape product information from Target or Trader Joe's URL.
+    """Scrape product information from a supported retailer's URL.
+    
+    The retailer adapter registered for the URL's hostname decides whether
+    the page is read over plain HTTP or in a browser. Concurrent calls for
+    the same product (by canonical URL) share a single scrape: the first
+    caller does the work and the rest wait for its result.
     
     Args:
-        url: Product URL from Target or Trader Joe's
+        url: Product URL from a retailer in ``app.services.retailers``
         
     Returns:
         dict: Product information including name, price, and image URL
     """
-    driver = create_driver()
-    
-    try:
-        if 'target.com' in url:
-            info = scrape_target_product(url, driver)
-        elif 'traderjoes.com' in url:
-            info = scrape_trader_joes_product(url, driver)
-        else:
-            raise ValueError('URL must be from Target or Trader Joe\'s')
-            
-        # Convert price string to number
-        if isinstance(info['price'], str) and '$' in info['price']:
-            # Extract first number after $ sign
-            price_str = info['price'].split('$')[1].split()[0]
-            try:
-                info['price'] = float(price_str)
-            except ValueError:
-                info['price'] = 0.0
-        
-        return info
-    finally:
-        driver.quit()
+    adapter = retailers.for_url(url)
+    if adapter is None:
+        raise ValueError('Scraper not available for this retailer')
+
+    info = scrape_flights.do(canonicalize_url(url), _scrape_product_info, url, adapter)
+    # Every waiting caller gets its own copy of the shared result
+    return dict(info)
+
+def scrape_products(urls, max_workers=4, tabs_per_browser=None):
+    """Scrape several product URLs concurrently.
+
+    Each URL is scraped on its own pooled driver, so a batch takes about as
+    long as its slowest page rather than the sum of all of them. The pool's
+    max size still bounds how many browsers run at once.
+
+    With ``tabs_per_browser`` above 1 (``SCRAPER_TABS_PER_BROWSER``), pages
+    that need a browser are grouped by retailer and each group is loaded in
+    tabs of one browser, giving more pages in flight per GB of memory. Pages
+    the HTTP fast path can handle never open a tab.
+
+    Args:
+        urls: Product URLs to scrape
+        max_workers: Maximum number of pages (or tab groups) scraped at the same time
+        tabs_per_browser: Pages loaded at once in a single browser, defaults
+            to the driver pool's setting
+
+    Returns:
+        list: One dict per URL, in input order, with ``url``, ``ok`` and either
+            ``info`` (the scraped product) or ``error`` (the failure message)
+    """
+    if not urls:
+        return []
+
+    tabs = tabs_per_browser or driver_pool.tabs_per_browser
+
+    def scrape_one(url):
+        try:
+            return {"url": url, "ok": True, "info": scrape_product_info(url)}
+        except Exception as e:
+            print(f"Error scraping {url}: {str(e)}")
+            return {"url": url, "ok": False, "error": str(e)}
+
+    if tabs <= 1:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+            return list(executor.map(scrape_one, urls))
+
+    def fetch_http(url):
+        adapter = retailers.for_url(url)
+        if adapter is None or adapter.browser_scraper is None:
+            # Unsupported and HTTP-only pages take the regular path
+            return scrape_one(url)
+        if adapter.strategy == 'http' and http_extractor.enabled:
+            info = http_extractor.extract(replay.url(url, 'http'), adapter.domain, adapter.required_fields,
+                                          adapter.http_timeout, head_only=adapter.head_only)
+            if info is not None:
+                return {"url": url, "ok": True, "info": _parse_price(info)}
+        return None
+
+    def scrape_group(group):
+        adapter, group_urls = group
+        try:
+            return _scrape_in_tabs(adapter, group_urls)
+        except Exception as e:
+            print(f"Error scraping {adapter.store_name} pages in tabs: {str(e)}")
+            return {}
+
+    unique = list(dict.fromkeys(urls))
+    workers = max(1, min(max_workers, len(unique)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = dict(zip(unique, executor.map(fetch_http, unique)))
+
+        # Pages still needing a browser share tabs, one retailer per browser
+        by_retailer = {}
+        for url in unique:
+            if outcomes[url] is None:
+                by_retailer.setdefault(retailers.for_url(url).domain, []).append(url)
+        groups = [
+            (retailers.get(domain), group_urls[i:i + tabs])
+            for domain, group_urls in by_retailer.items()
+            for i in range(0, len(group_urls), tabs)
+        ]
+        for group_outcomes in executor.map(scrape_group, groups):
+            outcomes.update(group_outcomes)
+
+        # Anything a crashed browser never reached gets a regular scrape
+        missing = [url for url in unique if outcomes.get(url) is None]
+        outcomes.update(zip(missing, executor.map(scrape_one, missing)))
+
+    return [dict(outcomes[url]) for url in urls]
 
 # Example usage
 if __name__ == "__main__":
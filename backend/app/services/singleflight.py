@@ -0,0 +1,76 @@
+"""Coalesce concurrent calls that would do the same work.
+
+When several requests ask for the same product at once, only the first one
+(the leader) runs the scrape; the others wait on the leader's future and
+receive the same result or exception.
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its outcome."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {'calls': 0, 'coalesced': 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)`` unless a call for ``key`` is already running.
+
+        Args:
+            key: Identifies duplicate work, e.g. a canonical product URL
+            fn: Function to run if this caller becomes the leader
+
+        Returns:
+            The leader's return value; the leader's exception is re-raised
+            in every waiting caller.
+        """
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result=result)
+        return result
+
+    def begin(self, key):
+        """Join the running call for ``key``, or start one if there is none.
+
+        For callers that do the work themselves instead of through :meth:`do`,
+        e.g. several pages scraped together in one browser.
+
+        Returns:
+            tuple: The call's ``Future`` and whether this caller is the
+                leader. The leader must pass its outcome to :meth:`finish`;
+                everyone else waits on ``future.result()``.
+        """
+        with self._lock:
+            self._stats['calls'] += 1
+            future = self._calls.get(key)
+            if future is not None:
+                self._stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        """Hand the leader's ``result`` (or ``error``) to every caller waiting on ``key``."""
+        with self._lock:
+            del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def stats(self):
+        """Return total calls, duplicates avoided and calls currently in flight."""
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
@@ -0,0 +1,227 @@
+"""Local thumbnails of product images.
+
+Product and order image URLs point at retailer CDNs serving full-size
+images, which makes order lists heavy. Whenever a product is saved its
+image is scheduled on a small background pool that downloads it once,
+shrinks it to a fixed-size JPEG thumbnail and stores it content-addressed:
+
+    THUMBNAIL_DIR/ab/abcdef....jpg     thumbnail, named by its SHA-256
+    THUMBNAIL_DIR/index/<sha256 of image URL>   digest of the URL's thumbnail
+
+``GET /images/<digest>`` serves thumbnails with an ETag and an immutable,
+year-long ``Cache-Control``, since a digest's content never changes.
+Thumbnails need Pillow; without it nothing is scheduled and API responses
+simply carry no thumbnail URL.
+
+Image URLs come from scraped pages, so downloads are restricted like any
+other server-side fetch: http(s) only, public addresses only (or the
+``THUMBNAIL_HOSTS`` allowlist), every redirect re-checked, ``image/*``
+responses only and at most ``THUMBNAIL_MAX_BYTES``.
+
+Index lookups are kept in a bounded LRU, including misses for
+``THUMBNAIL_MISS_TTL`` seconds, so listing images without a thumbnail
+doesn't read the disk on every request.
+"""
+
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from app.utils.validators import is_public_url
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Thumbnails are disabled without Pillow
+    Image = None
+
+DIGEST_RE = re.compile(r'^[0-9a-f]{64}$')
+MAX_REDIRECTS = 3
+
+
+def _url_key(image_url):
+    return hashlib.sha256(image_url.encode('utf-8')).hexdigest()
+
+
+class ThumbnailStore:
+    """Fetches product images in the background and keeps their thumbnails on disk.
+
+    Args:
+        root (str): Directory holding thumbnails and the URL index
+        size (int): Maximum width and height of a thumbnail, in pixels
+        max_bytes (int): Largest source image downloaded
+        max_workers (int): Images fetched at the same time
+        cache_size (int): Image URLs whose index lookup is kept in memory
+        miss_ttl (float): Seconds a URL without a thumbnail is remembered as such
+        hosts (list): Hosts images may be downloaded from; empty allows any public host
+    """
+
+    def __init__(self, root=None, size=200, max_bytes=10 * 1024 * 1024, max_workers=2,
+                 cache_size=4096, miss_ttl=60, hosts=None):
+        self.root = root
+        self.size = size
+        self.max_bytes = max_bytes
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.miss_ttl = miss_ttl
+        self.hosts = list(hosts or [])
+        self._executor = None
+        self._pending = set()
+        self._digests = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read the thumbnail directory, sizes and download limits from the Flask config."""
+        self.root = app.config.get('THUMBNAIL_DIR', self.root)
+        self.size = app.config.get('THUMBNAIL_SIZE', self.size)
+        self.max_bytes = app.config.get('THUMBNAIL_MAX_BYTES', self.max_bytes)
+        self.max_workers = app.config.get('THUMBNAIL_MAX_WORKERS', self.max_workers)
+        self.cache_size = app.config.get('THUMBNAIL_CACHE_SIZE', self.cache_size)
+        self.miss_ttl = app.config.get('THUMBNAIL_MISS_TTL', self.miss_ttl)
+        self.hosts = app.config.get('THUMBNAIL_HOSTS', self.hosts)
+        with self._lock:
+            self._digests.clear()
+
+    @property
+    def enabled(self):
+        return bool(self.root) and Image is not None
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='thumbnail')
+            return self._executor
+
+    def path_for(self, digest):
+        return os.path.join(self.root, digest[:2], f'{digest}.jpg')
+
+    def _index_path(self, image_url):
+        return os.path.join(self.root, 'index', _url_key(image_url))
+
+    def _cached(self, image_url):
+        """Return ``(found, digest)`` from the in-memory index; a found None is a recent miss."""
+        with self._lock:
+            entry = self._digests.get(image_url)
+            if entry is None:
+                return False, None
+            digest, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._digests[image_url]
+                return False, None
+            self._digests.move_to_end(image_url)
+            return True, digest
+
+    def _cache(self, image_url, digest):
+        # Misses expire, since another process may create the thumbnail meanwhile
+        expires_at = None if digest else time.monotonic() + self.miss_ttl
+        with self._lock:
+            self._digests[image_url] = (digest, expires_at)
+            self._digests.move_to_end(image_url)
+            while len(self._digests) > self.cache_size:
+                self._digests.popitem(last=False)
+
+    def digest_for(self, image_url):
+        """Return the digest of ``image_url``'s thumbnail, or None if there is none yet."""
+        if not image_url or not self.enabled:
+            return None
+        found, digest = self._cached(image_url)
+        if found:
+            return digest
+        try:
+            with open(self._index_path(image_url)) as f:
+                digest = f.read().strip() or None
+        except OSError:
+            digest = None
+        self._cache(image_url, digest)
+        return digest
+
+    def thumbnail_url(self, image_url):
+        """Return the local URL of ``image_url``'s thumbnail, or None if there is none yet."""
+        digest = self.digest_for(image_url)
+        return f'/images/{digest}' if digest else None
+
+    def allowed(self, image_url):
+        """Return True if the server may download ``image_url``."""
+        return is_public_url(image_url, self.hosts)
+
+    def schedule(self, image_url):
+        """Fetch and thumbnail ``image_url`` in the background unless already done."""
+        if not image_url or not self.enabled or not self.allowed(image_url):
+            return
+        if self.digest_for(image_url):
+            return
+        with self._lock:
+            if image_url in self._pending:
+                return
+            self._pending.add(image_url)
+        self.executor.submit(self._create, image_url)
+
+    def _download(self, image_url):
+        from app.services.http_extractor import http_extractor
+
+        url = image_url
+        for _ in range(MAX_REDIRECTS + 1):
+            # Checked on every hop, so a redirect can't lead to an internal address
+            if not self.allowed(url):
+                raise ValueError(f'Not an allowed image URL: {url}')
+            response = http_extractor.session.get(url, timeout=10, stream=True, allow_redirects=False)
+            if not response.is_redirect:
+                break
+            url = urljoin(url, response.headers['Location'])
+            response.close()
+        else:
+            raise ValueError(f'Too many redirects for {image_url}')
+
+        with response:
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '')
+            if not content_type.startswith('image/'):
+                raise ValueError(f'Not an image: {content_type or "no content type"}')
+            if int(response.headers.get('Content-Length') or 0) > self.max_bytes:
+                raise ValueError(f'Image is larger than {self.max_bytes} bytes')
+
+            data = io.BytesIO()
+            for chunk in response.iter_content(64 * 1024):
+                data.write(chunk)
+                if data.tell() > self.max_bytes:
+                    raise ValueError(f'Image is larger than {self.max_bytes} bytes')
+        data.seek(0)
+        return data
+
+    def _create(self, image_url):
+        try:
+            with Image.open(self._download(image_url)) as image:
+                image = ImageOps.exif_transpose(image).convert('RGB')
+                image.thumbnail((self.size, self.size))
+                output = io.BytesIO()
+                image.save(output, format='JPEG', quality=80, optimize=True)
+            data = output.getvalue()
+            digest = hashlib.sha256(data).hexdigest()
+
+            path = self.path_for(digest)
+            if not os.path.exists(path):
+                self._write(path, data)
+            self._write(self._index_path(image_url), digest.encode('ascii'))
+            self._cache(image_url, digest)
+        except Exception as e:
+            print(f"Failed to create thumbnail for {image_url}: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending.discard(image_url)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+thumbnails = ThumbnailStore()
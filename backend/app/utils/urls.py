@@ -0,0 +1,41 @@
+import re
+from urllib.parse import urlparse
+
+TARGET_TCIN_RE = re.compile(r'/A-(\d+)')
+# Trailing numeric id of a product slug, e.g. Trader Joe's ``.../spicy-pink-salt-076362``
+SLUG_ID_RE = re.compile(r'[-/](\d{4,})/?$')
+
+def canonicalize_url(url):
+    """Return the canonical form of a retailer product URL.
+
+    Target items are identified by their ``A-<tcin>`` id alone; other
+    retailers drop the query string, fragment and trailing slash.
+
+    Args:
+        url: Product URL as submitted by the user
+
+    Returns:
+        str: Canonical URL used as the cache and ``Product.url`` key
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host and not host.startswith('www.') and host.count('.') == 1:
+        host = f'www.{host}'
+
+    if host.endswith('target.com'):
+        match = TARGET_TCIN_RE.search(parsed.path)
+        if match:
+            return f'https://www.target.com/p/-/A-{match.group(1)}'
+
+    path = parsed.path.rstrip('/') or '/'
+    return f'https://{host}{path}'
+
+def product_id_from_url(url):
+    """Return the retailer's product id from a product URL, or None.
+
+    Target's id is the TCIN in ``A-<tcin>``; other retailers end the
+    product slug with a numeric id.
+    """
+    path = urlparse(url.strip()).path
+    match = TARGET_TCIN_RE.search(path) or SLUG_ID_RE.search(path)
+    return match.group(1) if match else None
@@ -1,16 +1,46 @@
+import ipaddress
 import re
-
-APPROVED_DOMAINS = [
-    "target.com",
-    "traderjoes.com",
-    "ralphs.com"
-]
+import socket
+from urllib.parse import urlparse
 
 def is_valid_retailer_url(url):
-    from urllib.parse import urlparse
-    parsed_url = urlparse(url)
-    domain = parsed_url.netloc
-    return any(approved in domain for approved in APPROVED_DOMAINS)
+    # Check that a registered retailer adapter handles the URL's hostname
+    from app.services.retailers import retailers
+    return retailers.for_url(url) is not None
+
+def host_matches(host, allowed_hosts):
+    # Check if host is one of allowed_hosts or a subdomain of one
+    host = host.lower().rstrip('.')
+    return any(host == allowed or host.endswith('.' + allowed)
+               for allowed in (h.lower().strip() for h in allowed_hosts) if allowed)
+
+def is_public_url(url, allowed_hosts=None):
+    # Check that a URL the server will fetch is http(s) and can't reach internal services:
+    # with allowed_hosts its host must be one of them, otherwise every address it
+    # resolves to must be public (not private, loopback, link-local or reserved)
+    try:
+        parsed = urlparse(url)
+        host = parsed.hostname
+        port = parsed.port
+    except (TypeError, ValueError, AttributeError):
+        return False
+    if parsed.scheme not in ('http', 'https') or not host:
+        return False
+    if allowed_hosts:
+        return host_matches(host, allowed_hosts)
+
+    try:
+        addresses = socket.getaddrinfo(host, port or (443 if parsed.scheme == 'https' else 80),
+                                       proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError):
+        return False
+    for address in addresses:
+        ip = ipaddress.ip_address(address[4][0].split('%')[0])
+        if getattr(ip, 'ipv4_mapped', None):
+            ip = ip.ipv4_mapped
+        if not ip.is_global:
+            return False
+    return bool(addresses)
 
 def is_valid_email(email):
     # Check if the email has a valid format
@@ -17,6 +17,74 @@ class Config:
         SECRET_KEY (str): Secret key for session management and security
         SQLALCHEMY_DATABASE_URI (str): Database connection string
         SQLALCHEMY_TRACK_MODIFICATIONS (bool): Disable SQLAlchemy modification tracking
+        SCRAPER_POOL_MIN_SIZE (int): Chrome drivers kept warm for scraping
+        SCRAPER_POOL_MAX_SIZE (int): Maximum concurrent Chrome drivers
+        SCRAPER_POOL_MAX_PAGES (int): Recycle a driver after this many scrapes
+        SCRAPER_POOL_MAX_AGE (int): Recycle a driver after this many seconds
+        SCRAPER_POOL_CHECKOUT_TIMEOUT (int): Seconds to wait for a free driver
+        SCRAPER_POOL_MAX_RSS_MB (int): Recycle a driver whose Chrome process tree uses this much memory (0 disables)
+        SCRAPER_PROFILE_DIR (str): Directory for persistent Chrome profiles; empty uses a fresh profile per driver
+        SCRAPER_PROFILE_SLOTS (int): Number of persistent profiles (drivers that can start warm at once)
+        SCRAPER_PROFILE_MAX_CACHE_MB (int): Cache size a profile may keep before it is trimmed
+        SCRAPER_POOL_WARM_ON_START (bool): Start the minimum drivers when the app boots
+        SCRAPER_BATCH_CONCURRENCY (int): Pages scraped in parallel by /orders/batch_create
+        SCRAPER_TABS_PER_BROWSER (int): Pages a batch scrape loads at once in tabs of one browser (1 disables tabs)
+        SCRAPER_RETAILERS (dict): Per-retailer adapter overrides, e.g. strategy, http_timeout or concurrency
+        SCRAPER_RETAILER_PLUGINS (bool): Load extra retailer adapters from 'grabbit.retailers' entry points
+        SCRAPER_READY_DEADLINES (dict): Seconds to wait for product fields, per retailer
+        SCRAPER_SELECTOR_STATS_PATH (str): JSON file where selector success rates are kept across restarts
+        SCRAPER_SELECTOR_DECAY (float): Weight of past observations in selector success rates
+        SCRAPER_SELECTOR_ALERT_AFTER (int): Seconds without any selector matching before alerting
+        SCRAPER_SELECTOR_ALERT_MIN_MISSES (int): Pages without a match needed before alerting
+        SCRAPER_HTTP_FIRST (bool): Try plain HTTP extraction before starting a browser
+        SCRAPER_HTTP_TIMEOUT (float): Timeout for the HTTP fast path, in seconds
+        SCRAPER_HTTP_POOL_SIZE (int): Keep-alive connections per retailer host
+        SCRAPER_HTML_PARSER (str): 'auto' (lxml when installed), 'lxml' or 'html.parser'
+        SCRAPER_LOAD_PROFILE (str): 'light' to block heavy resources in scraper drivers, 'full' to load everything
+        SCRAPER_BLOCKED_RESOURCE_TYPES (list): Resource types blocked by the light profile
+        SCRAPER_RESOURCE_ALLOWLISTS (dict): Per-retailer resource types and domains never blocked
+        SCRAPER_REPLAY_URL (str): Replay server to load recorded product pages from instead of retailers (empty loads live pages)
+        THUMBNAIL_DIR (str): Directory where product image thumbnails are stored
+        THUMBNAIL_SIZE (int): Maximum thumbnail width and height, in pixels
+        THUMBNAIL_MAX_BYTES (int): Largest product image downloaded for a thumbnail
+        THUMBNAIL_MAX_WORKERS (int): Product images fetched at the same time
+        THUMBNAIL_CACHE_SIZE (int): Image URLs whose thumbnail lookup is kept in memory
+        THUMBNAIL_MISS_TTL (int): Seconds an image without a thumbnail is remembered as such
+        THUMBNAIL_HOSTS (list): Hosts product images may be downloaded from (empty allows any public host)
+        SCRAPER_RATE_LIMITS (dict): Page loads per second and burst size, per retailer
+        SCRAPER_MAX_RETRIES (int): Retries after a failed scrape
+        SCRAPER_RETRY_BACKOFF (float): Base retry backoff in seconds (jittered, doubling)
+        SCRAPER_BREAKER_THRESHOLD (int): Consecutive failures that open a retailer's breaker
+        SCRAPER_BREAKER_RESET (int): Seconds a retailer's breaker stays open
+        SCRAPER_PRODUCT_CACHE_SIZE (int): Products kept in the in-process LRU
+        SCRAPER_PRODUCT_CACHE_TTL (int): Seconds a product stays in the in-process LRU
+        SCRAPER_PRODUCT_FRESHNESS (int): Seconds a saved product is reused before re-scraping
+        SCRAPER_PRODUCT_DEMAND_FLUSH (int): Seconds between saves of product lookup counts for the price refresher
+        SCRAPE_JOBS_MAX_WORKERS (int): Background scrape jobs run at the same time
+        SCRAPE_JOBS_RETENTION (int): Seconds a finished scrape job stays queryable
+        SCRAPE_JOBS_BACKEND (str): 'thread' to scrape in the web process, 'queue' for worker.py
+        SCRAPE_JOBS_CALLBACK_HOSTS (list): Hosts scrape job callbacks may be sent to (empty allows any public host)
+        SCRAPE_QUEUE_LEASE_SECONDS (int): Seconds a leased job stays hidden from other workers
+        SCRAPE_QUEUE_MAX_ATTEMPTS (int): Attempts before a job is dead-lettered
+        SCRAPE_QUEUE_BACKOFF_BASE (int): Initial retry delay in seconds (doubles per attempt)
+        SCRAPE_QUEUE_BACKOFF_MAX (int): Longest retry delay in seconds
+        SCRAPE_WORKER_CONCURRENCY (int): Jobs processed at once by each worker.py process
+        SCRAPE_WORKER_POLL_INTERVAL (float): Seconds an idle worker waits before polling again
+        PRICE_REFRESH_ENABLED (bool): Run the price refresher in ``worker.py --scheduler``
+        PRICE_REFRESH_INTERVAL (int): Seconds between price refresh cycles
+        PRICE_REFRESH_STALE_AFTER (int): Seconds after which a product price is re-scraped
+        PRICE_REFRESH_BUDGET_PER_HOUR (int): Maximum refresh scrapes per rolling hour
+        PRICE_REFRESH_BATCH_SIZE (int): Maximum products refreshed per cycle
+        PRICE_REFRESH_CONCURRENCY (int): Refresh pages scraped at the same time
+        PRICE_REFRESH_FAILURE_BACKOFF (int): Seconds a product is skipped after a failed refresh (doubles per failure)
+        ORDER_EXPIRY_ENABLED (bool): Run the order expiry sweeper in ``worker.py --scheduler``
+        ORDER_EXPIRY_INTERVAL (int): Seconds between order expiry sweeps
+        ORDER_EXPIRY_BATCH_SIZE (int): Orders expired per transaction
+        ORDER_EXPIRY_MAX_BATCHES (int): Batches per sweep; any backlog is left for the next one
+        ORDER_EVENTS_TRANSPORT (str): 'local' for in-process order events, or a 'module:factory' cross-process transport
+        ORDER_EVENTS_HISTORY (int): Recent order events kept for clients resuming with Last-Event-ID
+        ORDER_EVENTS_QUEUE_SIZE (int): Events buffered per subscriber before its stream is closed
+        ORDER_EVENTS_HEARTBEAT (int): Seconds between keep-alives on idle event streams
     """
     # Security
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev_secret_key'
@@ -27,6 +95,113 @@ class Config:
     basedir = os.path.abspath(os.path.dirname(__file__))
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{os.path.join(basedir, "app.db")}'  # Using the same path as create_db.py
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Scraper driver pool
+    SCRAPER_POOL_MIN_SIZE = int(os.environ.get('SCRAPER_POOL_MIN_SIZE', 1))
+    SCRAPER_POOL_MAX_SIZE = int(os.environ.get('SCRAPER_POOL_MAX_SIZE', 4))
+    SCRAPER_POOL_MAX_PAGES = int(os.environ.get('SCRAPER_POOL_MAX_PAGES', 50))
+    SCRAPER_POOL_MAX_AGE = int(os.environ.get('SCRAPER_POOL_MAX_AGE', 1800))
+    SCRAPER_POOL_CHECKOUT_TIMEOUT = int(os.environ.get('SCRAPER_POOL_CHECKOUT_TIMEOUT', 60))
+    SCRAPER_POOL_MAX_RSS_MB = int(os.environ.get('SCRAPER_POOL_MAX_RSS_MB', 1024))
+    SCRAPER_PROFILE_DIR = os.environ.get('SCRAPER_PROFILE_DIR', '')
+    SCRAPER_PROFILE_SLOTS = int(os.environ.get('SCRAPER_PROFILE_SLOTS', 4))
+    SCRAPER_PROFILE_MAX_CACHE_MB = int(os.environ.get('SCRAPER_PROFILE_MAX_CACHE_MB', 256))
+    SCRAPER_POOL_WARM_ON_START = os.environ.get('SCRAPER_POOL_WARM_ON_START', '0') == '1'
+    SCRAPER_BATCH_CONCURRENCY = int(os.environ.get('SCRAPER_BATCH_CONCURRENCY', 4))
+    SCRAPER_TABS_PER_BROWSER = int(os.environ.get('SCRAPER_TABS_PER_BROWSER', 1))
+
+    # Retailer adapters (see app/services/retailers.py)
+    SCRAPER_RETAILERS = {}
+    SCRAPER_RETAILER_PLUGINS = os.environ.get('SCRAPER_RETAILER_PLUGINS', '1') == '1'
+    SCRAPER_READY_DEADLINES = {
+        'target.com': float(os.environ.get('SCRAPER_READY_DEADLINE_TARGET', 10)),
+        'traderjoes.com': float(os.environ.get('SCRAPER_READY_DEADLINE_TRADER_JOES', 5)),
+    }
+
+    # Learned price selector order (see app/services/selector_stats.py)
+    SCRAPER_SELECTOR_STATS_PATH = os.environ.get(
+        'SCRAPER_SELECTOR_STATS_PATH', os.path.join(basedir, 'selector_stats.json'))
+    SCRAPER_SELECTOR_DECAY = float(os.environ.get('SCRAPER_SELECTOR_DECAY', 0.9))
+    SCRAPER_SELECTOR_ALERT_AFTER = int(os.environ.get('SCRAPER_SELECTOR_ALERT_AFTER', 1800))
+    SCRAPER_SELECTOR_ALERT_MIN_MISSES = int(os.environ.get('SCRAPER_SELECTOR_ALERT_MIN_MISSES', 5))
+
+    SCRAPER_HTTP_FIRST = os.environ.get('SCRAPER_HTTP_FIRST', '1') == '1'
+    SCRAPER_HTTP_TIMEOUT = float(os.environ.get('SCRAPER_HTTP_TIMEOUT', 5))
+    SCRAPER_HTTP_POOL_SIZE = int(os.environ.get('SCRAPER_HTTP_POOL_SIZE', 10))
+    SCRAPER_HTML_PARSER = os.environ.get('SCRAPER_HTML_PARSER', 'auto')
+
+    # Recorded pages for offline runs and benchmarks (see scraper_bench/)
+    SCRAPER_REPLAY_URL = os.environ.get('SCRAPER_REPLAY_URL', '')
+
+    # Page-load profile for scraper drivers
+    SCRAPER_LOAD_PROFILE = os.environ.get('SCRAPER_LOAD_PROFILE', 'light')
+    SCRAPER_BLOCKED_RESOURCE_TYPES = os.environ.get(
+        'SCRAPER_BLOCKED_RESOURCE_TYPES', 'image,font,media,stylesheet').split(',')
+    # What each retailer still needs loaded; anything listed here is not blocked
+    SCRAPER_RESOURCE_ALLOWLISTS = {
+        'target.com': {'resource_types': [], 'domains': []},
+        'traderjoes.com': {'resource_types': [], 'domains': []},
+    }
+
+    # Product image thumbnails
+    THUMBNAIL_DIR = os.environ.get('THUMBNAIL_DIR', os.path.join(basedir, 'thumbnails'))
+    THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE', 200))
+    THUMBNAIL_MAX_BYTES = int(os.environ.get('THUMBNAIL_MAX_BYTES', 10 * 1024 * 1024))
+    THUMBNAIL_MAX_WORKERS = int(os.environ.get('THUMBNAIL_MAX_WORKERS', 2))
+    THUMBNAIL_CACHE_SIZE = int(os.environ.get('THUMBNAIL_CACHE_SIZE', 4096))
+    THUMBNAIL_MISS_TTL = int(os.environ.get('THUMBNAIL_MISS_TTL', 60))
+    THUMBNAIL_HOSTS = [host for host in os.environ.get('THUMBNAIL_HOSTS', '').split(',') if host]
+
+    # Per-retailer rate limits, retries and circuit breakers
+    SCRAPER_RATE_LIMITS = {
+        'target.com': (float(os.environ.get('SCRAPER_RATE_TARGET', 1)), 4),
+        'traderjoes.com': (float(os.environ.get('SCRAPER_RATE_TRADER_JOES', 1)), 4),
+    }
+    SCRAPER_MAX_RETRIES = int(os.environ.get('SCRAPER_MAX_RETRIES', 2))
+    SCRAPER_RETRY_BACKOFF = float(os.environ.get('SCRAPER_RETRY_BACKOFF', 1))
+    SCRAPER_BREAKER_THRESHOLD = int(os.environ.get('SCRAPER_BREAKER_THRESHOLD', 5))
+    SCRAPER_BREAKER_RESET = int(os.environ.get('SCRAPER_BREAKER_RESET', 60))
+
+    # Product lookup cache
+    SCRAPER_PRODUCT_CACHE_SIZE = int(os.environ.get('SCRAPER_PRODUCT_CACHE_SIZE', 1024))
+    SCRAPER_PRODUCT_CACHE_TTL = int(os.environ.get('SCRAPER_PRODUCT_CACHE_TTL', 600))
+    SCRAPER_PRODUCT_FRESHNESS = int(os.environ.get('SCRAPER_PRODUCT_FRESHNESS', 6 * 3600))
+    SCRAPER_PRODUCT_DEMAND_FLUSH = int(os.environ.get('SCRAPER_PRODUCT_DEMAND_FLUSH', 60))
+
+    # Asynchronous scrape jobs
+    SCRAPE_JOBS_MAX_WORKERS = int(os.environ.get('SCRAPE_JOBS_MAX_WORKERS', 4))
+    SCRAPE_JOBS_RETENTION = int(os.environ.get('SCRAPE_JOBS_RETENTION', 3600))
+    SCRAPE_JOBS_BACKEND = os.environ.get('SCRAPE_JOBS_BACKEND', 'thread')
+    SCRAPE_JOBS_CALLBACK_HOSTS = [host for host in os.environ.get('SCRAPE_JOBS_CALLBACK_HOSTS', '').split(',') if host]
+
+    # Durable scrape queue (worker.py)
+    SCRAPE_QUEUE_LEASE_SECONDS = int(os.environ.get('SCRAPE_QUEUE_LEASE_SECONDS', 120))
+    SCRAPE_QUEUE_MAX_ATTEMPTS = int(os.environ.get('SCRAPE_QUEUE_MAX_ATTEMPTS', 5))
+    SCRAPE_QUEUE_BACKOFF_BASE = int(os.environ.get('SCRAPE_QUEUE_BACKOFF_BASE', 10))
+    SCRAPE_QUEUE_BACKOFF_MAX = int(os.environ.get('SCRAPE_QUEUE_BACKOFF_MAX', 600))
+    SCRAPE_WORKER_CONCURRENCY = int(os.environ.get('SCRAPE_WORKER_CONCURRENCY', 2))
+    SCRAPE_WORKER_POLL_INTERVAL = float(os.environ.get('SCRAPE_WORKER_POLL_INTERVAL', 1))
+
+    # Background price refresh (keep STALE_AFTER below SCRAPER_PRODUCT_FRESHNESS)
+    PRICE_REFRESH_ENABLED = os.environ.get('PRICE_REFRESH_ENABLED', '1') == '1'
+    PRICE_REFRESH_INTERVAL = int(os.environ.get('PRICE_REFRESH_INTERVAL', 300))
+    PRICE_REFRESH_STALE_AFTER = int(os.environ.get('PRICE_REFRESH_STALE_AFTER', 4 * 3600))
+    PRICE_REFRESH_BUDGET_PER_HOUR = int(os.environ.get('PRICE_REFRESH_BUDGET_PER_HOUR', 120))
+    PRICE_REFRESH_BATCH_SIZE = int(os.environ.get('PRICE_REFRESH_BATCH_SIZE', 20))
+    PRICE_REFRESH_CONCURRENCY = int(os.environ.get('PRICE_REFRESH_CONCURRENCY', 2))
+    PRICE_REFRESH_FAILURE_BACKOFF = int(os.environ.get('PRICE_REFRESH_FAILURE_BACKOFF', 3600))
+
+    # Order expiry sweeper
+    ORDER_EXPIRY_ENABLED = os.environ.get('ORDER_EXPIRY_ENABLED', '1') == '1'
+    ORDER_EXPIRY_INTERVAL = int(os.environ.get('ORDER_EXPIRY_INTERVAL', 60))
+    ORDER_EXPIRY_BATCH_SIZE = int(os.environ.get('ORDER_EXPIRY_BATCH_SIZE', 500))
+    ORDER_EXPIRY_MAX_BATCHES = int(os.environ.get('ORDER_EXPIRY_MAX_BATCHES', 20))
+
+    # Order event streams (/events/stream)
+    ORDER_EVENTS_TRANSPORT = os.environ.get('ORDER_EVENTS_TRANSPORT', 'local')
+    ORDER_EVENTS_HISTORY = int(os.environ.get('ORDER_EVENTS_HISTORY', 1000))
+    ORDER_EVENTS_QUEUE_SIZE = int(os.environ.get('ORDER_EVENTS_QUEUE_SIZE', 256))
+    ORDER_EVENTS_HEARTBEAT = int(os.environ.get('ORDER_EVENTS_HEARTBEAT', 15))
     
     # Debug
     DEBUG = True
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""Index open orders by expiry for the /orders/available feed
+
+Revision ID: 3f2a9c1d7b4e
+Revises: 
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b4e'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tables are created by db.create_all(), which already adds this index to new databases
+    op.create_index('ix_orders_status_expiry_time', 'orders', ['status', 'expiry_time'], unique=False,
+                    if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_orders_status_expiry_time', table_name='orders', if_exists=True)
@@ -0,0 +1,48 @@
+"""Create the scrape_jobs table for the durable scrape queue
+
+Revision ID: 8b6e2d4f1a93
+Revises: 3f2a9c1d7b4e
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6e2d4f1a93'
+down_revision = '3f2a9c1d7b4e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() may already have created the table on databases that ran a newer app
+    op.create_table(
+        'scrape_jobs',
+        sa.Column('id', sa.String(length=32), nullable=False),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('leased_by', sa.String(length=120), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('callback_url', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+    op.create_index('ix_scrape_jobs_status_available_at', 'scrape_jobs', ['status', 'available_at'], unique=False,
+                    if_not_exists=True)
+    op.create_index('ix_scrape_jobs_status_lease_expires_at', 'scrape_jobs', ['status', 'lease_expires_at'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_scrape_jobs_status_lease_expires_at', table_name='scrape_jobs', if_exists=True)
+    op.drop_index('ix_scrape_jobs_status_available_at', table_name='scrape_jobs', if_exists=True)
+    op.drop_table('scrape_jobs', if_exists=True)
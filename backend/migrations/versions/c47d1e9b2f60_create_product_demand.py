@@ -0,0 +1,32 @@
+"""Create the product_demand table shared by the product cache and price refresher
+
+Revision ID: c47d1e9b2f60
+Revises: 8b6e2d4f1a93
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47d1e9b2f60'
+down_revision = '8b6e2d4f1a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() may already have created the table on databases that ran a newer app
+    op.create_table(
+        'product_demand',
+        sa.Column('url', sa.String(length=500), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('url'),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_table('product_demand', if_exists=True)
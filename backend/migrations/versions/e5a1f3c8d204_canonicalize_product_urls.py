@@ -0,0 +1,43 @@
+"""Store retailer products under their canonical URL
+
+Revision ID: e5a1f3c8d204
+Revises: c47d1e9b2f60
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.retailers import retailers
+from app.utils.urls import canonicalize_url
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1f3c8d204'
+down_revision = 'c47d1e9b2f60'
+branch_labels = None
+depends_on = None
+
+product = sa.table('product', sa.column('id', sa.Integer), sa.column('url', sa.String))
+
+
+def upgrade():
+    # Products added through /products or the old /scrape kept the raw URL, so
+    # demand (keyed by canonical URL) never matched them
+    conn = op.get_bind()
+    rows = conn.execute(sa.select(product.c.id, product.c.url)).all()
+    taken = {url for _, url in rows}
+    for product_id, url in rows:
+        if not url or retailers.for_url(url) is None:
+            continue
+        key = canonicalize_url(url)
+        if key == url or key in taken:
+            # Leave duplicates of an already canonical row for the product cache to merge
+            continue
+        conn.execute(product.update().where(product.c.id == product_id).values(url=key))
+        taken.add(key)
+
+
+def downgrade():
+    # The raw URLs aren't kept, and canonical ones work with older code too
+    pass
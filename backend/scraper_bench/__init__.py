@@ -0,0 +1,23 @@
+"""Offline scraper benchmarks against recorded retailer pages.
+
+Live target.com and traderjoes.com pages change from one run to the next,
+so scrape timings and accuracy can't be compared across scraper changes
+against them. This package records product pages once into a fixture
+corpus and replays them from a local HTTP server:
+
+    python -m scraper_bench.record URL [URL ...]   # snapshot pages into the corpus
+    python -m scraper_bench.serve                   # serve the corpus (SCRAPER_REPLAY_URL)
+    python -m scraper_bench.bench --json run.json   # time and check the scrapers against it
+
+Each fixture is a directory ``<corpus>/<retailer>/<id>/`` holding:
+
+- ``manifest.json``: the live URL, when it was recorded and the expected
+  ``name``/``price``/``image_url`` (edit these if the live scrape was wrong);
+- ``raw.html``: the retailer's server response, read by the HTTP fast path;
+- ``rendered.html``: the DOM once the browser scraper found its fields,
+  with scripts removed so replay is deterministic;
+- ``assets/``: the stylesheets and images the rendered page references.
+
+The corpus defaults to ``scraper_bench/corpus`` (``SCRAPER_BENCH_CORPUS``).
+Recorded pages belong to the retailers, so it is not committed.
+"""
@@ -0,0 +1,212 @@
+"""Benchmark the scrapers against the recorded corpus.
+
+Starts a replay server on a free port, then scrapes every fixture with
+each method its retailer supports (``http`` for the HTTP fast path,
+``browser`` for the Selenium scraper on one reused driver) and reports,
+per retailer and method:
+
+- latency (mean, p50 and p95 seconds per page);
+- extraction accuracy: the share of fields matching the fixture's expected
+  ``name``, ``price`` and ``image_url``, and failed scrapes.
+
+It also times Chrome driver startup. Save a run with ``--json`` and pass it
+as ``--baseline`` to a later run to see what a scraper change did.
+
+Usage:
+    python3 -m scraper_bench.bench [--retailer DOMAIN] [--repeat N] [--startup-runs N]
+                                   [--no-browser] [--json OUT] [--baseline PREVIOUS]
+"""
+
+import argparse
+import datetime
+import json
+import math
+import statistics
+import time
+
+from app import create_app
+from app.services.http_extractor import http_extractor
+from app.services.load_profile import load_profile
+from app.services.replay import replay
+from app.services.retailers import retailers
+from app.services.selector_stats import selector_stats
+from app.services.selenium_scraper import _parse_price, create_driver, quit_driver
+from scraper_bench.corpus import CORPUS_DIR, RAW_PAGE, RENDERED_PAGE, load_fixtures
+from scraper_bench.serve import ReplayServer
+
+FIELDS = ('name', 'price', 'image_url')
+
+
+def percentile(values, q):
+    """Return the ``q`` percentile (0-100) of ``values`` by nearest rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def time_driver_startup(runs):
+    """Start and quit ``runs`` Chrome drivers, returning startup seconds."""
+    timings = []
+    for _ in range(runs):
+        started = time.monotonic()
+        driver = create_driver()
+        timings.append(time.monotonic() - started)
+        quit_driver(driver)
+    return {
+        'runs': runs,
+        'mean': statistics.mean(timings) if timings else None,
+        'p50': percentile(timings, 50),
+        'max': max(timings) if timings else None
+    }
+
+
+def scrape_fixture(fixture, adapter, method, driver=None):
+    """Scrape one fixture from the replay server with ``method``.
+
+    Returns:
+        tuple: Seconds taken and the parsed product info, or None if the scrape failed
+    """
+    started = time.monotonic()
+    try:
+        if method == 'http':
+            info = http_extractor.extract(replay.url(fixture.url, 'http'), adapter.domain, adapter.required_fields,
+                                          adapter.http_timeout, head_only=adapter.head_only)
+        else:
+            load_profile.prepare(driver, adapter.domain)
+            info = adapter.get_browser_scraper()(replay.url(fixture.url, 'browser'), driver)
+    except Exception as e:
+        print(f"  {method} scrape of {fixture.url} failed: {str(e)}")
+        info = None
+    elapsed = time.monotonic() - started
+    return elapsed, _parse_price(dict(info)) if info else None
+
+
+def summarize(samples):
+    """Reduce ``[(seconds, info, expected), ...]`` to latency and accuracy figures."""
+    timings = [seconds for seconds, _, _ in samples]
+    matches = {field: 0 for field in FIELDS}
+    for _, info, expected in samples:
+        for field in FIELDS:
+            if info is not None and info.get(field) == expected.get(field):
+                matches[field] += 1
+    return {
+        'pages': len(samples),
+        'errors': sum(1 for _, info, _ in samples if info is None),
+        'mean': statistics.mean(timings),
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'field_accuracy': {field: count / len(samples) for field, count in matches.items()},
+        'accuracy': sum(matches.values()) / (len(samples) * len(FIELDS))
+    }
+
+
+def run(fixtures, repeat=1, browser=True):
+    """Scrape every fixture ``repeat`` times and summarize by retailer and method."""
+    samples = {}
+    driver = None
+    try:
+        for _ in range(repeat):
+            for fixture in fixtures:
+                adapter = retailers.get(fixture.retailer)
+                if adapter is None:
+                    print(f"  no adapter for {fixture.retailer}, skipping {fixture.url}")
+                    continue
+
+                methods = []
+                if fixture.file(RAW_PAGE):
+                    methods.append('http')
+                if browser and adapter.browser_scraper is not None and fixture.file(RENDERED_PAGE):
+                    methods.append('browser')
+
+                for method in methods:
+                    if method == 'browser' and driver is None:
+                        driver = create_driver()
+                    seconds, info = scrape_fixture(fixture, adapter, method, driver)
+                    samples.setdefault(fixture.retailer, {}).setdefault(method, []).append(
+                        (seconds, info, fixture.expected))
+    finally:
+        if driver is not None:
+            quit_driver(driver)
+
+    return {
+        retailer: {method: summarize(method_samples) for method, method_samples in methods.items()}
+        for retailer, methods in samples.items()
+    }
+
+
+def report(results, baseline=None):
+    """Print a run, with changes against ``baseline`` where it has the same retailer and method."""
+    startup = results.get('driver_startup')
+    if startup and startup['runs']:
+        print(f"\nDriver startup: mean {startup['mean']:.2f}s, p50 {startup['p50']:.2f}s, "
+              f"max {startup['max']:.2f}s over {startup['runs']} run(s)")
+
+    print(f"\n{'retailer':<18}{'method':<9}{'pages':>6}{'errors':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'accuracy':>10}")
+    for retailer, methods in sorted(results['retailers'].items()):
+        for method, summary in sorted(methods.items()):
+            line = (f"{retailer:<18}{method:<9}{summary['pages']:>6}{summary['errors']:>7}"
+                    f"{summary['mean']:>8.3f}s{summary['p50']:>8.3f}s{summary['p95']:>8.3f}s"
+                    f"{summary['accuracy']:>9.0%}")
+            previous = (baseline or {}).get('retailers', {}).get(retailer, {}).get(method)
+            if previous:
+                line += (f"   p50 {summary['p50'] - previous['p50']:+.3f}s,"
+                         f" accuracy {(summary['accuracy'] - previous['accuracy']) * 100:+.0f} pts")
+            print(line)
+            misses = [field for field, rate in summary['field_accuracy'].items() if rate < 1]
+            if misses:
+                print(f"{'':<27}fields off: " + ', '.join(
+                    f"{field} {summary['field_accuracy'][field]:.0%}" for field in misses))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scrapers against recorded pages.')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Fixture corpus directory')
+    parser.add_argument('--retailer', help='Only benchmark this retailer domain')
+    parser.add_argument('--repeat', type=int, default=3, help='Times each page is scraped')
+    parser.add_argument('--startup-runs', type=int, default=3, help='Chrome drivers started to time startup')
+    parser.add_argument('--latency', type=float, default=0, help='Seconds added to every replayed page')
+    parser.add_argument('--no-browser', action='store_true', help='Only benchmark the HTTP fast path')
+    parser.add_argument('--json', help='Write the results to this file')
+    parser.add_argument('--baseline', help='Results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    create_app()
+    # Benchmark scrapes must not train the production selector order
+    selector_stats.path = None
+
+    fixtures = load_fixtures(args.corpus, args.retailer)
+    if not fixtures:
+        print(f"No recorded pages in {args.corpus}; record some with python3 -m scraper_bench.record URL")
+        return
+
+    server = ReplayServer(args.corpus, port=0, latency=args.latency).start()
+    replay.base_url = server.base_url
+    print(f"Benchmarking {len(fixtures)} recorded page(s) x{args.repeat} against {server.base_url}")
+    try:
+        results = {
+            'generated_at': datetime.datetime.utcnow().isoformat(),
+            'pages': len(fixtures),
+            'repeat': args.repeat,
+            'load_profile': load_profile.name,
+            'driver_startup': time_driver_startup(0 if args.no_browser else args.startup_runs),
+            'retailers': run(fixtures, args.repeat, browser=not args.no_browser)
+        }
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Fixture corpus layout shared by the recorder, replay server and benchmark."""
+
+import hashlib
+import json
+import os
+
+from app.utils.urls import canonicalize_url
+
+CORPUS_DIR = os.environ.get(
+    'SCRAPER_BENCH_CORPUS', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus'))
+
+MANIFEST = 'manifest.json'
+RAW_PAGE = 'raw.html'
+RENDERED_PAGE = 'rendered.html'
+ASSETS = 'assets'
+
+
+def fixture_id(url):
+    """Return the directory name of ``url``'s fixture, stable across URL variants."""
+    return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()[:16]
+
+
+class Fixture:
+    """One recorded product page.
+
+    Args:
+        path (str): Fixture directory
+        manifest (dict): Contents of its ``manifest.json``
+    """
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @property
+    def url(self):
+        return self.manifest['url']
+
+    @property
+    def retailer(self):
+        return self.manifest['retailer']
+
+    @property
+    def expected(self):
+        return self.manifest.get('expected', {})
+
+    def file(self, name):
+        """Return the path of ``name`` inside the fixture, or None if it wasn't recorded."""
+        path = os.path.join(self.path, name)
+        return path if os.path.exists(path) else None
+
+    def save(self):
+        with open(os.path.join(self.path, MANIFEST), 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+
+
+def fixture_path(corpus, retailer, url):
+    return os.path.join(corpus, retailer, fixture_id(url))
+
+
+def load_fixtures(corpus=CORPUS_DIR, retailer=None):
+    """Return every fixture in ``corpus``, optionally only ``retailer``'s, sorted by URL."""
+    fixtures = []
+    if not os.path.isdir(corpus):
+        return fixtures
+    for domain in sorted(os.listdir(corpus)):
+        if retailer and domain != retailer:
+            continue
+        domain_dir = os.path.join(corpus, domain)
+        if not os.path.isdir(domain_dir):
+            continue
+        for name in sorted(os.listdir(domain_dir)):
+            path = os.path.join(domain_dir, name)
+            try:
+                with open(os.path.join(path, MANIFEST)) as f:
+                    fixtures.append(Fixture(path, json.load(f)))
+            except (OSError, ValueError) as e:
+                print(f"Skipping fixture {path}: {str(e)}")
+    return sorted(fixtures, key=lambda fixture: fixture.url)
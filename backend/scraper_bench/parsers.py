@@ -0,0 +1,71 @@
+"""Microbenchmark of the HTML parsing backends over recorded pages.
+
+Times :func:`app.services.http_extractor.parse_product_html` on every
+recorded page (raw and rendered) with each installed backend, with and
+without ``head_only``, next to the old full ``html.parser`` tree the
+extractors used to build. ``matches`` is the share of pages where a variant
+extracted the same fields as ``html.parser`` on the whole document.
+
+Usage:
+    python3 -m scraper_bench.parsers [--corpus DIR] [--retailer DOMAIN] [--iterations N]
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from app.services.html_parser import html_parser, lxml
+from app.services.http_extractor import parse_product_html
+from scraper_bench.corpus import CORPUS_DIR, RAW_PAGE, RENDERED_PAGE, load_fixtures
+
+
+def _variants():
+    backends = ['html.parser'] + (['lxml'] if lxml is not None else [])
+    variants = [('html.parser, full tree (old)', lambda html: BeautifulSoup(html, 'html.parser'))]
+    for backend in backends:
+        variants.append((backend, lambda html, backend=backend: parse_product_html(html, backend=backend)))
+        variants.append((f'{backend}, head only',
+                         lambda html, backend=backend: parse_product_html(html, head_only=True, backend=backend)))
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML parsing backends on recorded pages.')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Fixture corpus directory')
+    parser.add_argument('--retailer', help='Only use this retailer\'s pages')
+    parser.add_argument('--iterations', type=int, default=5, help='Times each page is parsed per variant')
+    args = parser.parse_args()
+
+    pages = []
+    for fixture in load_fixtures(args.corpus, args.retailer):
+        for name in (RAW_PAGE, RENDERED_PAGE):
+            path = fixture.file(name)
+            if path:
+                with open(path, encoding='utf-8') as f:
+                    pages.append(f.read())
+    if not pages:
+        print(f"No recorded pages in {args.corpus}; record some with python3 -m scraper_bench.record URL")
+        return
+
+    total_mb = sum(len(page.encode('utf-8')) for page in pages) / (1024 * 1024)
+    expected = [parse_product_html(page, backend='html.parser') for page in pages]
+    print(f"Parsing {len(pages)} page(s), {total_mb:.1f} MB, x{args.iterations} "
+          f"(configured backend: {html_parser.backend})\n")
+    print(f"{'variant':<32}{'ms/page':>10}{'MB/s':>9}{'speedup':>9}{'matches':>9}")
+
+    reference = None
+    for name, parse in _variants():
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            results = [parse(page) for page in pages]
+        elapsed = (time.perf_counter() - started) / args.iterations
+        reference = reference or elapsed
+        matches = '' if not isinstance(results[0], dict) else \
+            f"{sum(r == e for r, e in zip(results, expected)) / len(pages):.0%}"
+        print(f"{name:<32}{elapsed / len(pages) * 1000:>10.1f}{total_mb / elapsed:>9.1f}"
+              f"{reference / elapsed:>8.1f}x{matches:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Record live product pages into the fixture corpus.
+
+Each URL is fetched once over plain HTTP (the raw server response) and,
+for retailers with a browser scraper, once in Chrome. The rendered DOM is
+saved with its scripts removed and its stylesheets and images downloaded
+next to it, so the replayed page looks the same to the scrapers without
+reaching the retailer. What the scraper extracted is saved as the
+fixture's expected result.
+
+Usage:
+    python3 -m scraper_bench.record URL [URL ...] [--corpus DIR] [--max-assets N]
+"""
+
+import argparse
+import datetime
+import hashlib
+import mimetypes
+import os
+from urllib.parse import urljoin, urlparse
+
+from bs4 import BeautifulSoup
+
+from app import create_app
+from app.services.http_extractor import http_extractor, parse_product_html
+from app.services.retailers import retailers
+from app.services.selenium_scraper import _parse_price, create_driver, quit_driver
+from app.utils.urls import product_id_from_url
+from scraper_bench.corpus import (ASSETS, CORPUS_DIR, RAW_PAGE, RENDERED_PAGE, Fixture,
+                                  fixture_path)
+
+# Scripts that only carry data; the HTTP extractor reads them, and they don't run
+DATA_SCRIPT_TYPES = ('application/ld+json', 'application/json')
+
+MAX_ASSET_BYTES = 5 * 1024 * 1024
+
+
+def _download_asset(url, assets_dir):
+    """Save ``url`` into ``assets_dir`` and return its file name, or None on failure."""
+    try:
+        response = http_extractor.session.get(url, timeout=10)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"  skipped asset {url}: {str(e)}")
+        return None
+    if len(response.content) > MAX_ASSET_BYTES:
+        print(f"  skipped asset {url}: larger than {MAX_ASSET_BYTES} bytes")
+        return None
+
+    content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+    extension = (mimetypes.guess_extension(content_type) or os.path.splitext(urlparse(url).path)[1] or '')
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + extension
+    os.makedirs(assets_dir, exist_ok=True)
+    with open(os.path.join(assets_dir, name), 'wb') as f:
+        f.write(response.content)
+    return name
+
+
+def snapshot(html, page_url, fixture_dir, asset_prefix, max_assets=40):
+    """Return a self-contained copy of a rendered page.
+
+    Args:
+        html: ``driver.page_source`` once the scraper has read the page
+        page_url: Live URL of the page, for resolving relative links
+        fixture_dir: Fixture directory the assets are saved under
+        asset_prefix: URL path the replay server serves the assets from
+        max_assets: Stylesheets and images downloaded at most; the rest are dropped
+
+    Returns:
+        str: The page HTML
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Replayed pages must not run retailer code or reach the network on their own
+    for script in soup.find_all('script'):
+        if script.get('type') not in DATA_SCRIPT_TYPES:
+            script.decompose()
+    for tag in soup.find_all(['iframe', 'base']):
+        tag.decompose()
+    for tag in soup.find_all(srcset=True):
+        del tag['srcset']
+
+    assets_dir = os.path.join(fixture_dir, ASSETS)
+    downloaded = {}
+    references = [(tag, 'href') for tag in soup.find_all('link', rel='stylesheet', href=True)]
+    references += [(tag, 'src') for tag in soup.find_all('img', src=True)]
+    for tag, attribute in references:
+        url = urljoin(page_url, tag[attribute])
+        if not url.startswith(('http://', 'https://')):
+            continue
+        if url not in downloaded and len(downloaded) < max_assets:
+            downloaded[url] = _download_asset(url, assets_dir)
+        name = downloaded.get(url)
+        if name:
+            tag[attribute] = f'{asset_prefix}/{name}'
+        elif tag.name == 'link':
+            tag.decompose()
+        else:
+            del tag[attribute]
+
+    # Without a canonical link the scraper would report the replay URL
+    if soup.head and not soup.find('link', rel='canonical'):
+        soup.head.append(soup.new_tag('link', rel='canonical', href=page_url))
+    return str(soup)
+
+
+def record(url, corpus, get_driver, max_assets=40):
+    """Record ``url`` into ``corpus`` and return its fixture.
+
+    Args:
+        url: Live product URL
+        corpus: Corpus directory
+        get_driver: Returns the Chrome driver to render pages with
+        max_assets: Stylesheets and images saved per page
+    """
+    adapter = retailers.for_url(url)
+    if adapter is None:
+        raise ValueError('Scraper not available for this retailer')
+
+    path = fixture_path(corpus, adapter.domain, url)
+    os.makedirs(path, exist_ok=True)
+
+    response = http_extractor.session.get(url, timeout=adapter.http_timeout)
+    response.raise_for_status()
+    with open(os.path.join(path, RAW_PAGE), 'w', encoding='utf-8') as f:
+        f.write(response.text)
+
+    scraper = adapter.get_browser_scraper()
+    if scraper is None:
+        info = parse_product_html(response.text, product_id=product_id_from_url(url))
+        info['price'] = info['price'] or "Price not listed"
+    else:
+        driver = get_driver()
+        info = scraper(url, driver)
+        asset_prefix = f'/assets/{adapter.domain}/{os.path.basename(path)}'
+        html = snapshot(driver.page_source, driver.current_url, path, asset_prefix, max_assets)
+        with open(os.path.join(path, RENDERED_PAGE), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    info = _parse_price(dict(info))
+    fixture = Fixture(path, {
+        'url': url,
+        'retailer': adapter.domain,
+        'recorded_at': datetime.datetime.utcnow().isoformat(),
+        'expected': {field: info.get(field) for field in ('name', 'price', 'image_url')}
+    })
+    fixture.save()
+    return fixture
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record product pages for offline scraper benchmarks.')
+    parser.add_argument('urls', nargs='+', help='Live product URLs')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Fixture corpus directory')
+    parser.add_argument('--max-assets', type=int, default=40,
+                        help='Stylesheets and images saved per page')
+    args = parser.parse_args()
+
+    create_app()
+    drivers = []
+
+    def get_driver():
+        if not drivers:
+            drivers.append(create_driver())
+        return drivers[0]
+
+    try:
+        for url in args.urls:
+            print(f"Recording {url}")
+            try:
+                fixture = record(url, args.corpus, get_driver, args.max_assets)
+                print(f"  saved to {fixture.path}: {fixture.expected}")
+            except Exception as e:
+                print(f"  failed: {str(e)}")
+    finally:
+        for driver in drivers:
+            quit_driver(driver)
+
+
+if __name__ == '__main__':
+    main()
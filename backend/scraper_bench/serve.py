@@ -0,0 +1,128 @@
+"""Local HTTP server replaying the fixture corpus.
+
+Serves recorded pages at the addresses :mod:`app.services.replay` rewrites
+product URLs to, so the unmodified scrapers can run against them:
+
+    /browser/<host><path>   rendered snapshot, for Selenium
+    /http/<host><path>      raw server response, for the HTTP fast path
+    /assets/<retailer>/<id>/<file>
+
+Any URL variant of a recorded product finds its fixture, since fixtures
+are looked up by canonical URL. ``--latency`` delays every page response
+to approximate a real network.
+
+Usage:
+    python3 -m scraper_bench.serve [--port 8765] [--corpus DIR] [--latency SECONDS]
+    SCRAPER_REPLAY_URL=http://127.0.0.1:8765 python3 run.py
+"""
+
+import argparse
+import mimetypes
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from app.utils.urls import canonicalize_url
+from scraper_bench.corpus import ASSETS, CORPUS_DIR, RAW_PAGE, RENDERED_PAGE, load_fixtures
+
+PAGES = {'browser': RENDERED_PAGE, 'http': RAW_PAGE}
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    server_version = 'GrabbitReplay/1.0'
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        mode, _, rest = parsed.path.lstrip('/').partition('/')
+
+        if mode in PAGES:
+            fixture = self.server.fixtures.get(canonicalize_url(f'https://{rest}'))
+            path = fixture.file(PAGES[mode]) if fixture else None
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            return self._send_file(path, 'text/html; charset=utf-8')
+
+        if mode == 'assets':
+            retailer, _, rest = rest.partition('/')
+            fixture_id, _, name = rest.partition('/')
+            path = os.path.realpath(os.path.join(self.server.corpus, retailer, fixture_id, ASSETS, unquote(name)))
+            # Never serve anything outside the corpus
+            if not path.startswith(os.path.realpath(self.server.corpus) + os.sep):
+                path = None
+            content_type = mimetypes.guess_type(path)[0] if path else None
+            return self._send_file(path, content_type or 'application/octet-stream')
+
+        self._send_file(None, None)
+
+    def _send_file(self, path, content_type):
+        if not path or not os.path.isfile(path):
+            self.send_error(404, 'Not recorded')
+            return
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Serves a fixture corpus over HTTP.
+
+    Args:
+        corpus (str): Corpus directory
+        host (str): Interface to listen on
+        port (int): Port to listen on, 0 for any free port
+        latency (float): Seconds added to every page response
+        verbose (bool): Log every request
+    """
+
+    daemon_threads = True
+
+    def __init__(self, corpus=CORPUS_DIR, host='127.0.0.1', port=8765, latency=0, verbose=False):
+        self.corpus = corpus
+        self.latency = latency
+        self.verbose = verbose
+        self.fixtures = {canonicalize_url(fixture.url): fixture for fixture in load_fixtures(corpus)}
+        super().__init__((host, port), ReplayHandler)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """Serve from a background thread and return the server."""
+        threading.Thread(target=self.serve_forever, name='replay-server', daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded product pages to the scrapers.')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='Fixture corpus directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help='Seconds added to every page response')
+    args = parser.parse_args()
+
+    server = ReplayServer(args.corpus, args.host, args.port, args.latency, verbose=True)
+    print(f"Replaying {len(server.fixtures)} recorded page(s) from {args.corpus} at {server.base_url}")
+    print(f"Point the scrapers at it with SCRAPER_REPLAY_URL={server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
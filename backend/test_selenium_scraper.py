@@ -1,25 +1,33 @@
-from app.services.selenium_scraper import (
-    create_driver,
-    scrape_target_product,
-    scrape_ralphs_product,
-    scrape_trader_joes_product
-)
+from app.services.retailers import retailers
+from app.services.selenium_scraper import create_driver
+from app.services.http_extractor import http_extractor
 
 def main():
     url = input("Paste a product URL: ").strip()
 
+    adapter = retailers.for_url(url)
+    if adapter is None:
+        supported = ", ".join(adapter.store_name for adapter in retailers)
+        print(f"Unsupported retailer. Only {supported} are supported.")
+        return
+
+    scraper = adapter.get_browser_scraper()
+    if scraper is None:
+        # HTTP-only retailers are read from their server-rendered HTML
+        result = http_extractor.extract(url, adapter.domain, adapter.required_fields, adapter.http_timeout,
+                                        head_only=adapter.head_only)
+        if result is None:
+            print("Scraping failed: product details not found in page HTML")
+            return
+        print("\nScraped Product Info:")
+        for key, value in result.items():
+            print(f"{key}: {value}")
+        return
+
     driver = create_driver()  # <- Start Selenium browser
 
     try:
-        if "target.com" in url:
-            result = scrape_target_product(url, driver)
-        elif "ralphs.com" in url:
-            result = scrape_ralphs_product(url, driver)
-        elif "traderjoes.com" in url:
-            result = scrape_trader_joes_product(url, driver)
-        else:
-            print("Unsupported retailer. Only Target, Ralph's, and Trader Joe's are supported.")
-            return
+        result = scraper(url, driver)
 
         print("\nScraped Product Info:")
         for key, value in result.items():
@@ -0,0 +1,28 @@
+import pytest
+
+from app import create_app, db
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on a fresh SQLite database, with an application context pushed."""
+
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SCRAPER_POOL_WARM_ON_START = False
+        SCRAPER_SELECTOR_STATS_PATH = ''
+        THUMBNAIL_DIR = ''
+        SCRAPE_QUEUE_BACKOFF_BASE = 0
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from app.services import selenium_scraper
+from app.services.chrome_profiles import ChromeProfiles, is_profile_error
+
+
+@pytest.fixture
+def profiles(tmp_path):
+    return ChromeProfiles(root=str(tmp_path), slots=1)
+
+
+def corrupt(profiles):
+    path = os.path.join(profiles.root, 'slot-0', 'Default')
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, 'Preferences'), 'w') as f:
+        f.write('{not json')
+
+
+def test_a_slot_whose_reset_fails_is_unlocked(profiles, monkeypatch):
+    corrupt(profiles)
+
+    def broken_reset(profile):
+        raise OSError('read-only file system')
+
+    monkeypatch.setattr(profiles, 'reset', broken_reset)
+    assert profiles.acquire() is None
+
+    # The slot was released, so it can be claimed once resetting works again
+    monkeypatch.undo()
+    profile = profiles.acquire()
+    assert profile is not None and profile.slot == 0
+    profiles.release(profile)
+
+
+def test_profile_errors_are_told_apart_from_transient_ones():
+    assert is_profile_error('session not created: user data directory is already in use')
+    assert is_profile_error("unknown error: Chrome failed to start: exited abnormally")
+    assert not is_profile_error('unknown error: cannot bind to port 9515: Address already in use')
+
+
+@pytest.mark.parametrize('error, resets', [
+    ('unknown error: Chrome failed to start: crashed', 1),
+    ('unknown error: cannot bind to port 9515: Address already in use', 0),
+])
+def test_create_driver_only_wipes_profiles_for_profile_errors(profiles, monkeypatch, error, resets):
+    monkeypatch.setattr(selenium_scraper, 'chrome_profiles', profiles)
+    monkeypatch.setattr(selenium_scraper, 'Service', lambda: None)
+
+    def chrome(service=None, options=None):
+        raise RuntimeError(error)
+
+    monkeypatch.setattr(selenium_scraper.webdriver, 'Chrome', chrome)
+    with pytest.raises(RuntimeError):
+        selenium_scraper.create_driver()
+
+    assert profiles.stats()['reset'] == resets
+    # Either way the slot is free again
+    profile = profiles.acquire()
+    assert profile is not None
+    profiles.release(profile)
@@ -0,0 +1,54 @@
+import json
+import os
+
+from app.services.http_extractor import parse_product_html
+from app.utils.urls import product_id_from_url
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+TARGET_URL = 'https://www.target.com/p/dove-beauty-white-moisturizing-beauty-bar-soap/-/A-84780837?preselect=11012602'
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def next_data_page(blob):
+    return (f'<html><head><meta property="og:title" content="Page title"></head><body>'
+            f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(blob)}</script></body></html>')
+
+
+def test_product_id_from_url():
+    assert product_id_from_url(TARGET_URL) == '84780837'
+    assert product_id_from_url(
+        'https://www.traderjoes.com/home/products/pdp/spicy-pink-salt-with-crushed-red-chili-pepper-076362') == '076362'
+    assert product_id_from_url('https://www.target.com/c/snacks') is None
+
+
+def test_next_data_picks_the_page_product_over_related_items():
+    info = parse_product_html(read_fixture('target_related_products.html'),
+                              product_id=product_id_from_url(TARGET_URL))
+
+    assert info['name'] == 'Dove Beauty White Moisturizing Beauty Bar Soap'
+    assert info['price'] == '$5.79'
+    assert info['image_url'] == 'https://target.scene7.com/is/image/Target/GUEST_84780837'
+
+
+def test_next_data_without_the_page_product_leaves_price_missing():
+    # Only related items: the price must not come from one of them
+    blob = {'recommendations': [
+        {'tcin': '13288451', 'title': 'Dove Deep Moisture Body Wash', 'price': {'current_retail': 8.99}},
+    ]}
+    info = parse_product_html(next_data_page(blob), product_id='84780837')
+
+    assert info['name'] == 'Page title'
+    assert info['price'] is None
+
+
+def test_next_data_without_product_id_needs_a_single_candidate():
+    single = {'product': {'title': 'Spicy Pink Salt', 'price': '2.49'}}
+    assert parse_product_html(next_data_page(single))['price'] == '$2.49'
+
+    ambiguous = {'product': {'title': 'Spicy Pink Salt', 'price': '2.49'},
+                 'related': [{'title': 'Everything Bagel Seasoning', 'price': '2.29'}]}
+    assert parse_product_html(next_data_page(ambiguous))['price'] is None
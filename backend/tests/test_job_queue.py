@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.services import job_queue
+from app.services.job_queue import (complete_job, enqueue_job, fail_job, get_job, keep_lease, lease_job,
+                                    process_next_job, renew_lease)
+from app.services.product_cache import product_cache
+from app.services.scrape_jobs import scrape_jobs
+
+URL = 'https://www.target.com/p/-/A-84780837'
+
+
+@pytest.fixture
+def callbacks(monkeypatch):
+    sent = []
+    monkeypatch.setattr(scrape_jobs, 'send_callback', lambda url, payload: sent.append(payload))
+    return sent
+
+
+def expire_lease(job):
+    job.lease_expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.session.commit()
+
+
+def test_a_leased_job_is_hidden_from_other_workers(app):
+    job = enqueue_job(URL)
+
+    leased = lease_job('worker-a')
+    assert leased.id == job.id
+    assert leased.status == 'running'
+    assert leased.leased_by == 'worker-a'
+    assert leased.attempts == 1
+    assert lease_job('worker-b') is None
+
+
+def test_a_worker_that_lost_its_lease_cannot_record_an_outcome(app):
+    enqueue_job(URL)
+    first = lease_job('worker-a')
+    expire_lease(first)
+    second = lease_job('worker-b')
+    assert second.id == first.id and second.attempts == 2
+
+    assert complete_job(first, 'worker-a', {'name': 'stale'}) is False
+    assert fail_job(first, 'worker-a', 'stale failure') is None
+    assert renew_lease(first.id, 'worker-a') is False
+
+    assert complete_job(second, 'worker-b', {'name': 'fresh'}) is True
+    job = get_job(first.id)
+    assert (job.status, job.result, job.error, job.attempts) == ('succeeded', {'name': 'fresh'}, None, 2)
+
+
+def test_keep_lease_renews_while_the_scrape_runs(app):
+    enqueue_job(URL)
+    job = lease_job('worker-a', lease_seconds=0.6)
+
+    with keep_lease(job, 'worker-a', lease_seconds=0.6):
+        time.sleep(1.2)
+        assert lease_job('worker-b') is None
+    assert get_job(job.id).leased_by == 'worker-a'
+
+
+def test_failures_retry_then_dead_letter_with_one_callback(app, callbacks):
+    job = enqueue_job(URL, callback_url='https://hooks.example.com/done')
+    job.max_attempts = 2
+    db.session.commit()
+
+    assert fail_job(lease_job('worker-a'), 'worker-a', 'timeout') == 'queued'
+    assert get_job(job.id).status == 'queued'
+    assert callbacks == []
+
+    assert fail_job(lease_job('worker-a'), 'worker-a', 'timeout again') == 'dead'
+    assert [payload['status'] for payload in callbacks] == ['dead']
+    assert get_job(job.id).error == 'timeout again'
+
+
+def test_an_expired_final_lease_dead_letters_with_a_callback(app, callbacks):
+    job = enqueue_job(URL, callback_url='https://hooks.example.com/done')
+    job.max_attempts = 1
+    db.session.commit()
+    expire_lease(lease_job('worker-a'))
+
+    assert lease_job('worker-b') is None
+    assert get_job(job.id).status == 'dead'
+    assert [payload['status'] for payload in callbacks] == ['dead']
+
+
+def test_process_next_job_records_the_scraped_product(app, callbacks, monkeypatch):
+    monkeypatch.setattr(product_cache, 'lookup', lambda url: {'name': 'Soap', 'url': url})
+    job = enqueue_job(URL, callback_url='https://hooks.example.com/done')
+
+    assert process_next_job('worker-a') is True
+    assert get_job(job.id).status == 'succeeded'
+    assert callbacks[0]['result'] == {'name': 'Soap', 'url': URL}
+    assert process_next_job('worker-a') is False
+    assert job_queue.queue_stats() == {'succeeded': 1}
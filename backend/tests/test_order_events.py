@@ -0,0 +1,76 @@
+from app.services.order_events import OrderEvents, order_events
+
+
+def publish(events, count, store_name='Target'):
+    for order_id in range(count):
+        events.publish('order.created', {'order_id': order_id, 'store_name': store_name})
+    return [event['id'] for event in list(events._buffer)[-count:]]
+
+
+def test_resume_returns_only_the_events_after_last_event_id():
+    events = OrderEvents(history=10)
+    ids = publish(events, 5)
+
+    subscription, backlog, missed = events.subscribe(last_event_id=ids[1])
+
+    assert [event['id'] for event in backlog] == ids[2:]
+    assert not missed
+    events.publish('order.accepted', {'order_id': 9, 'store_name': 'Target'})
+    assert subscription.get(timeout=1)['type'] == 'order.accepted'
+
+
+def test_resume_past_the_buffer_asks_for_a_resync():
+    events = OrderEvents(history=3)
+    first = publish(events, 1)[0]
+    publish(events, 5)
+
+    _, backlog, missed = events.subscribe(last_event_id=first)
+
+    # The first two events after it fell out of the buffer, so the client can't catch up from it
+    assert missed
+    assert [event['id'] for event in backlog] == [event['id'] for event in events._buffer]
+
+
+def test_resume_applies_the_subscription_filters():
+    events = OrderEvents()
+    first = publish(events, 1, 'Target')[0]
+    publish(events, 2, "Trader Joe's")
+    publish(events, 1, 'Target')
+
+    _, backlog, missed = events.subscribe(store_name='Target', last_event_id=first)
+
+    assert not missed
+    assert [event['data']['store_name'] for event in backlog] == ['Target']
+
+
+def read_stream(response, chunks):
+    body = iter(response.response)
+    return ''.join(next(body).decode() for _ in range(chunks))
+
+
+def test_stream_resumes_from_the_last_event_id_header(client):
+    ids = publish(order_events, 3)
+
+    response = client.get('/events/stream', headers={'Last-Event-ID': str(ids[0])})
+    text = read_stream(response, 3)
+    response.close()
+
+    assert text.startswith('retry: ')
+    assert f'id: {ids[1]}\n' in text and f'id: {ids[2]}\n' in text
+    assert f'id: {ids[0]}\n' not in text
+    assert 'event: resync' not in text
+
+
+def test_stream_sends_resync_for_an_unknown_last_event_id(client):
+    publish(order_events, 1)
+
+    response = client.get('/events/stream', headers={'Last-Event-ID': '1'})
+    text = read_stream(response, 2)
+    response.close()
+
+    assert 'event: resync' in text
+
+
+def test_stream_rejects_a_non_integer_last_event_id(client):
+    response = client.get('/events/stream', headers={'Last-Event-ID': 'abc'})
+    assert response.status_code == 400
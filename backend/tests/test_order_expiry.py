@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import Order, User
+from app.services.order_events import order_events
+from app.services.order_expiry import OrderExpirySweeper, order_expiry
+
+
+@pytest.fixture
+def buyer(app):
+    user = User(email='buyer@example.com', role='buyer')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_orders(buyer, count, status='open', expires_in=timedelta(minutes=-5)):
+    orders = [Order(buyer_id=buyer.id, store_name='Target', items=[], delivery_address='1 Main St',
+                    status=status, expiry_time=datetime.now(timezone.utc) + expires_in)
+              for _ in range(count)]
+    db.session.add_all(orders)
+    db.session.commit()
+    return [order.id for order in orders]
+
+
+def statuses(order_ids):
+    return [db.session.get(Order, order_id).status for order_id in order_ids]
+
+
+def test_run_expires_overdue_open_orders_in_batches(buyer):
+    overdue = add_orders(buyer, 5)
+    future = add_orders(buyer, 2, expires_in=timedelta(hours=1))
+    assigned = add_orders(buyer, 1, status='assigned')
+
+    sweeper = OrderExpirySweeper(batch_size=2, max_batches=10)
+    batches = []
+    sweeper.on_expired(lambda orders: batches.append([order.id for order in orders]))
+
+    assert sweeper.run_once() == {'expired': 5, 'remaining': False}
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert sorted(sum(batches, [])) == sorted(overdue)
+
+    db.session.expire_all()
+    assert set(statuses(overdue)) == {'expired'}
+    assert statuses(future) == ['open', 'open']
+    assert statuses(assigned) == ['assigned']
+
+
+def test_run_stops_at_max_batches_and_reports_remaining(buyer):
+    add_orders(buyer, 5)
+    sweeper = OrderExpirySweeper(batch_size=2, max_batches=2)
+
+    assert sweeper.run_once() == {'expired': 4, 'remaining': True}
+    assert sweeper.run_once() == {'expired': 1, 'remaining': False}
+    assert sweeper.run_once() == {'expired': 0, 'remaining': False}
+
+
+def test_a_failing_hook_does_not_stop_the_sweep(buyer):
+    add_orders(buyer, 3)
+    sweeper = OrderExpirySweeper(batch_size=1, max_batches=10)
+    seen = []
+
+    @sweeper.on_expired
+    def broken(orders):
+        raise RuntimeError('cache unavailable')
+
+    sweeper.on_expired(seen.extend)
+
+    assert sweeper.run_once()['expired'] == 3
+    assert len(seen) == 3
+
+
+def test_expired_orders_are_published_as_status_changes(buyer):
+    overdue = add_orders(buyer, 2)
+    subscription, _, _ = order_events.subscribe(order_ids=overdue)
+    try:
+        order_expiry.run_once()
+        events = [subscription.get(timeout=1) for _ in overdue]
+    finally:
+        order_events.unsubscribe(subscription)
+
+    assert [event['type'] for event in events] == ['order.status_changed'] * 2
+    assert {event['data']['order_id'] for event in events} == set(overdue)
+    assert all(event['data']['previous_status'] == 'open' for event in events)
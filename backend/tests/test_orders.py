@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import db
+from app.models import Order, User
+from app.routes import orders as orders_routes
+from app.services.product_cache import product_cache
+
+TARGET_URL = 'https://www.target.com/p/dove-beauty-bar/-/A-84780837'
+OTHER_TARGET_URL = 'https://www.target.com/p/dove-body-wash/-/A-13288451'
+
+
+@pytest.fixture
+def buyer(app):
+    user = User(email='buyer@example.com', role='buyer', display_name='Buyer')
+    user.set_password('secret')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def buyer_client(client, buyer):
+    with client.session_transaction() as session:
+        session['_user_id'] = str(buyer.id)
+    return client
+
+
+def add_open_orders(buyer, count, expiry_time=None):
+    expiry_time = expiry_time or datetime.now(timezone.utc) + timedelta(hours=1)
+    db.session.add_all(Order(buyer_id=buyer.id, store_name='Target', items=[], delivery_address='1 Main St',
+                             status='open', expiry_time=expiry_time + timedelta(minutes=i % 3))
+                       for i in range(count))
+    db.session.commit()
+
+
+def test_available_pages_round_trip_through_the_cursor(client, buyer):
+    add_open_orders(buyer, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        query = {'limit': 3, 'cursor': cursor} if cursor else {'limit': 3}
+        response = client.get('/orders/available', query_string=query)
+        assert response.status_code == 200
+        seen.extend(order['order_id'] for order in response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            assert 'Link' not in response.headers
+            break
+        assert 'rel="next"' in response.headers['Link']
+
+    # Every order exactly once, ordered by expiry then id across pages
+    expected = [order.id for order in Order.query.order_by(Order.expiry_time, Order.id)]
+    assert seen == expected and len(seen) == 7
+
+
+def test_available_rejects_bad_cursors_and_limits(client):
+    assert client.get('/orders/available?cursor=not-a-cursor').status_code == 400
+    assert client.get('/orders/available?limit=0').status_code == 400
+    assert client.get('/orders/available?limit=abc').status_code == 400
+    assert client.get('/orders/available?limit=').status_code == 400
+
+
+def test_available_filters_by_store_and_creation_time(client, buyer):
+    now = datetime.now(timezone.utc)
+    expiry_time = now + timedelta(hours=1)
+    db.session.add_all([
+        Order(buyer_id=buyer.id, store_name='Target', items=[], delivery_address='1 Main St', status='open',
+              expiry_time=expiry_time, created_at=now - timedelta(days=2)),
+        Order(buyer_id=buyer.id, store_name='Target', items=[], delivery_address='1 Main St', status='open',
+              expiry_time=expiry_time, created_at=now),
+        Order(buyer_id=buyer.id, store_name="Trader Joe's", items=[], delivery_address='1 Main St',
+              status='open', expiry_time=expiry_time, created_at=now),
+    ])
+    db.session.commit()
+
+    def stores(**query):
+        response = client.get('/orders/available', query_string=query)
+        assert response.status_code == 200
+        return [order['store_name'] for order in response.get_json()]
+
+    assert stores(store_name='Target') == ['Target', 'Target']
+    since = (now - timedelta(days=1)).replace(tzinfo=None).isoformat()
+    assert sorted(stores(created_since=since)) == ['Target', "Trader Joe's"]
+    assert stores(store_name='Target', created_since=since) == ['Target']
+    assert sorted(stores()) == ['Target', 'Target', "Trader Joe's"]
+
+
+def test_available_rejects_a_bad_created_since(client):
+    response = client.get('/orders/available?created_since=yesterday')
+    assert response.status_code == 400
+    assert 'created_since' in response.get_json()['error']
+
+
+def scraped(urls, max_workers=None):
+    return [{'url': url, 'ok': True, 'info': {'name': url.rsplit('/', 1)[-1], 'price': 5.79}}
+            for url in urls]
+
+
+@pytest.fixture
+def no_scraping(monkeypatch):
+    monkeypatch.setattr(orders_routes, 'scrape_products', scraped)
+    monkeypatch.setattr(product_cache, 'get', lambda url: None)
+    monkeypatch.setattr(product_cache, 'put', lambda url, info: info)
+
+
+def batch(client, mode):
+    return client.post('/orders/batch_create', json={
+        'delivery_address': '1 Main St',
+        'mode': mode,
+        'products': [{'url': TARGET_URL, 'quantity': 2}, {'url': 'https://example.org/p/1'},
+                     {'url': OTHER_TARGET_URL}],
+    })
+
+
+def test_best_effort_batch_creates_what_it_can(buyer_client, no_scraping):
+    response = batch(buyer_client, 'best_effort')
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == ['ok', 'error', 'ok']
+    assert Order.query.count() == 2
+    assert body['orders'][0]['quantity'] == 2
+
+
+def test_atomic_batch_creates_nothing_if_any_product_fails(buyer_client, no_scraping):
+    response = batch(buyer_client, 'atomic')
+
+    assert response.status_code == 400
+    body = response.get_json()
+    assert [result['status'] for result in body['results']] == ['skipped', 'error', 'skipped']
+    assert Order.query.count() == 0
+
+
+def test_malformed_products_are_per_item_errors(buyer_client, no_scraping):
+    response = buyer_client.post('/orders/batch_create', json={
+        'delivery_address': '1 Main St',
+        'products': [TARGET_URL, {'url': 42}, {'url': OTHER_TARGET_URL}],
+    })
+
+    assert response.status_code == 201
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == ['error', 'error', 'ok']
+    assert results[0]['error'] == 'Product must be an object with a url'
+    assert Order.query.count() == 1
@@ -0,0 +1,118 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.routes.products import Product
+from app.services import price_refresh
+from app.services.price_refresh import PriceRefresher, price_refresher
+from app.services.product_cache import product_cache
+
+TARGET = 'https://www.target.com/p/-/A-84780837'
+
+
+def test_lookup_demand_is_shared_through_the_database_and_decays(app, monkeypatch):
+    monkeypatch.setattr(product_cache, 'demand_flush', 0)
+    for _ in range(3):
+        product_cache.get(TARGET + '?preselect=1')
+
+    assert price_refresher.demand() == {TARGET: 3}
+    assert price_refresher.demand() == {TARGET: 1.5}
+
+    product_cache.get(TARGET)
+    assert price_refresher.demand() == {TARGET: 1.75}
+
+
+def target_url(tcin):
+    return f'https://www.target.com/p/-/A-{tcin}'
+
+
+def add_products(*urls, age=timedelta(days=1)):
+    # Oldest first, so the fill order is the argument order
+    for i, url in enumerate(urls):
+        updated_at = datetime.utcnow() - age - timedelta(minutes=len(urls) - i)
+        db.session.add(Product(name=url, price=1.0, url=url, updated_at=updated_at))
+    db.session.commit()
+
+
+@pytest.fixture
+def scrapes(monkeypatch):
+    """Record refresh scrapes; URLs in ``failing`` fail."""
+    scraped = []
+    failing = set()
+
+    def scrape_products(urls, max_workers=None):
+        scraped.extend(urls)
+        return [{'url': url, 'ok': False, 'error': 'page changed'} if url in failing
+                else {'url': url, 'ok': True, 'info': {'name': url, 'price': 2.0}} for url in urls]
+
+    def put(url, info):
+        product = Product.query.filter_by(url=url).one()
+        product.updated_at = datetime.utcnow()
+        db.session.commit()
+
+    monkeypatch.setattr(price_refresh, 'scrape_products', scrape_products)
+    monkeypatch.setattr(product_cache, 'put', put)
+    return scraped, failing
+
+
+def test_candidates_come_in_demand_order_then_oldest_first(app, monkeypatch):
+    urls = [target_url(tcin) for tcin in (1, 2, 3, 4)]
+    add_products(*urls)
+    refresher = PriceRefresher()
+    monkeypatch.setattr(refresher, 'demand', lambda: {urls[2]: 5, urls[3]: 9})
+
+    assert [product.url for product in refresher.candidates(3)] == [urls[3], urls[2], urls[0]]
+
+
+def test_fresh_products_are_not_candidates(app, monkeypatch):
+    add_products(target_url(1), age=timedelta(0))
+    refresher = PriceRefresher()
+    monkeypatch.setattr(refresher, 'demand', lambda: {target_url(1): 5})
+
+    assert refresher.candidates(5) == []
+
+
+def test_the_hourly_budget_caps_run_once(app, scrapes):
+    scraped, _ = scrapes
+    add_products(*[target_url(tcin) for tcin in range(1, 6)])
+    refresher = PriceRefresher(budget_per_hour=3, batch_size=2)
+
+    assert refresher.run_once() == {'refreshed': 2, 'failed': 0, 'budget': 1}
+    assert refresher.run_once() == {'refreshed': 1, 'failed': 0, 'budget': 0}
+    assert refresher.run_once() == {'refreshed': 0, 'failed': 0, 'budget': 0}
+    assert len(scraped) == 3
+
+
+def test_unsupported_and_failing_products_do_not_use_up_every_slot(app, scrapes):
+    scraped, failing = scrapes
+    dead = ['https://example.org/p/1', 'https://example.org/p/2']
+    broken = target_url(1)
+    healthy = [target_url(tcin) for tcin in (2, 3, 4)]
+    add_products(*dead, broken, *healthy)
+    failing.add(broken)
+    refresher = PriceRefresher(batch_size=2)
+
+    # Unsupported rows are never scraped or charged for
+    assert refresher.run_once() == {'refreshed': 1, 'failed': 1, 'budget': 118}
+    assert scraped == [broken, healthy[0]]
+
+    # The failed product backs off instead of taking a slot every cycle
+    assert refresher.run_once()['refreshed'] == 2
+    assert scraped[2:] == healthy[1:]
+    assert refresher.run_once() == {'refreshed': 0, 'failed': 0, 'budget': 116}
+
+
+def test_products_added_by_hand_match_their_demand(client, monkeypatch):
+    raw = 'https://www.target.com/p/dove-beauty-bar/-/A-7?preselect=1#reviews'
+    response = client.post('/products/add', json={'name': 'Dove', 'price': 1.0, 'url': raw, 'store': 'Target'})
+    assert response.get_json()['url'] == target_url(7)
+
+    add_products(target_url(1), age=timedelta(days=365 * 10))
+    Product.query.filter_by(url=target_url(7)).update({'updated_at': datetime.utcnow() - timedelta(days=1)})
+    db.session.commit()
+    refresher = PriceRefresher()
+    monkeypatch.setattr(refresher, 'demand', lambda: {target_url(7): 1})
+
+    # Demand puts it ahead of the older product
+    assert [product.url for product in refresher.candidates(1)] == [target_url(7)]
@@ -0,0 +1,26 @@
+from app.models import ProductDemand
+from app.services.product_cache import product_cache
+
+
+def test_scrape_rejects_unsupported_urls_before_the_cache(client, monkeypatch):
+    monkeypatch.setattr(product_cache, 'demand_flush', 0)
+    looked_up = []
+    monkeypatch.setattr(product_cache, 'lookup', looked_up.append)
+
+    for url in ['https://example.org/p/1', 'not a url', 42]:
+        response = client.post('/scrape/', json={'url': url})
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Invalid retailer URL'}
+
+    assert looked_up == []
+    product_cache.flush_demand()
+    assert ProductDemand.query.count() == 0
+
+
+def test_scrape_serves_supported_urls_from_the_cache(client, monkeypatch):
+    monkeypatch.setattr(product_cache, 'lookup', lambda url: {'name': 'Dove', 'url': url})
+
+    response = client.post('/scrape/', json={'url': 'https://www.target.com/p/-/A-84780837'})
+
+    assert response.status_code == 200
+    assert response.get_json()['name'] == 'Dove'
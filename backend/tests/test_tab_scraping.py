@@ -0,0 +1,134 @@
+import threading
+import time
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from app.services import selenium_scraper
+from app.services.driver_pool import DriverPool
+from app.services.retailers import RetailerAdapter
+from app.services.selenium_scraper import _scrape_in_tabs, scrape_flights
+from app.utils.urls import canonicalize_url
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def new_window(self, kind):
+        self.driver.tabs += 1
+        self.driver.current_window_handle = f'tab-{self.driver.tabs}'
+        self.driver.locations[self.driver.current_window_handle] = None
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """Just enough of a Chrome session for tab scraping and the pool's checks."""
+
+    def __init__(self):
+        self.tabs = 0
+        self.current_window_handle = 'home'
+        self.locations = {'home': None}
+        self.switch_to = FakeSwitchTo(self)
+        self.quit_called = False
+
+    def execute_script(self, script, *args):
+        if script.startswith('window.location.href'):
+            self.locations[self.current_window_handle] = args[0]
+            return None
+        return {} if 'performance' in script else 1
+
+    def execute_cdp_cmd(self, command, params):
+        return {}
+
+    def get(self, url):
+        self.locations[self.current_window_handle] = url
+
+    def close(self):
+        self.locations.pop(self.current_window_handle, None)
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def pool(app, monkeypatch):
+    # A pool of its own, so no fake driver is left idle in the shared one
+    pool = DriverPool(factory=FakeDriver)
+    monkeypatch.setattr(selenium_scraper, 'driver_pool', pool)
+    yield pool
+    pool.shutdown()
+
+
+def adapter_with(scraper, concurrency=4):
+    return RetailerAdapter('example.com', 'Example', strategy='browser', browser_scraper=scraper,
+                           concurrency=concurrency)
+
+
+def product(url):
+    return {'name': url.rsplit('/', 1)[-1], 'price': '$1.50', 'image_url': None}
+
+
+def test_tabs_pass_navigated_at_only_to_scrapers_that_take_it(pool):
+    urls = ['https://example.com/p/1', 'https://example.com/p/2']
+    calls = []
+
+    def new_style(url, driver, navigated_at=None):
+        calls.append(navigated_at)
+        return product(url)
+
+    def plugin_style(url, driver):
+        # Old plugin scrapers navigate themselves
+        driver.get(url)
+        return product(url)
+
+    outcomes = _scrape_in_tabs(adapter_with(new_style), urls)
+    assert [outcomes[url]['info']['price'] for url in urls] == [1.5, 1.5]
+    assert all(isinstance(started, float) for started in calls)
+
+    outcomes = _scrape_in_tabs(adapter_with(plugin_style), urls)
+    assert all(outcomes[url]['ok'] for url in urls)
+
+
+def test_tabs_hold_the_retailer_concurrency_slots(pool):
+    adapter = adapter_with(lambda url, driver: product(url), concurrency=2)
+    urls = [f'https://example.com/p/{i}' for i in range(3)]
+
+    outcomes = _scrape_in_tabs(adapter, urls)
+
+    # The page without a free slot is left for a regular scrape
+    assert sorted(outcomes) == urls[:2]
+    assert adapter.acquire_slot(blocking=False) and adapter.acquire_slot(blocking=False)
+
+
+def test_tabs_wait_for_scrapes_already_in_flight(pool):
+    scraped = []
+    adapter = adapter_with(lambda url, driver: scraped.append(url) or product(url))
+    urls = ['https://example.com/p/1', 'https://example.com/p/2']
+    future, leader = scrape_flights.begin(canonicalize_url(urls[1]))
+    assert leader
+
+    def finish_elsewhere():
+        time.sleep(0.2)
+        scrape_flights.finish(canonicalize_url(urls[1]), future, result={'name': 'elsewhere', 'price': 2.0})
+
+    threading.Thread(target=finish_elsewhere).start()
+    outcomes = _scrape_in_tabs(adapter, urls)
+
+    assert scraped == [urls[0]]
+    assert outcomes[urls[1]]['info']['name'] == 'elsewhere'
+
+
+def test_a_crashed_browser_is_discarded_and_its_pages_left_for_retry(pool):
+    def crash(url, driver):
+        raise WebDriverException('tab crashed')
+
+    discarded = pool.stats()['discarded']
+    urls = ['https://example.com/p/1', 'https://example.com/p/2']
+    outcomes = _scrape_in_tabs(adapter_with(crash), urls)
+
+    assert outcomes == {}
+    assert pool.stats()['discarded'] == discarded + 1
+    assert scrape_flights.stats()['in_flight'] == 0
@@ -0,0 +1,130 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.services.http_extractor import http_extractor
+from app.services.thumbnails import ThumbnailStore
+
+IMAGE_URL = 'https://93.184.216.34/image.jpg'
+
+
+class FakeResponse:
+    def __init__(self, status=200, headers=None, body=b''):
+        self.status_code = status
+        self.headers = headers or {}
+        self.body = body
+        self.is_redirect = status in (301, 302, 303, 307, 308)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise ValueError(self.status_code)
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def jpeg():
+    data = io.BytesIO()
+    Image.new('RGB', (400, 300), 'red').save(data, 'JPEG')
+    return data.getvalue()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ThumbnailStore(root=str(tmp_path), cache_size=2, miss_ttl=60)
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    served = {}
+    fetched = []
+
+    def get(url, **kwargs):
+        assert kwargs['allow_redirects'] is False
+        fetched.append(url)
+        return served[url]
+
+    monkeypatch.setattr(http_extractor.session, 'get', get)
+    return served, fetched
+
+
+def test_thumbnail_is_created_and_cached(store, responses):
+    served, _ = responses
+    served[IMAGE_URL] = FakeResponse(headers={'Content-Type': 'image/jpeg'}, body=jpeg())
+
+    assert store.digest_for(IMAGE_URL) is None
+    store._create(IMAGE_URL)
+
+    digest = store.digest_for(IMAGE_URL)
+    with Image.open(store.path_for(digest)) as image:
+        assert max(image.size) <= store.size
+
+
+def test_misses_are_cached_and_the_cache_is_bounded(store, monkeypatch):
+    opened = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', counting_open)
+    for _ in range(3):
+        assert store.digest_for(IMAGE_URL) is None
+    assert len(opened) == 1
+
+    store.digest_for('https://93.184.216.34/a.jpg')
+    store.digest_for('https://93.184.216.34/b.jpg')
+    assert len(store._digests) == 2
+    assert IMAGE_URL not in store._digests
+
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1/image.jpg',
+    'http://169.254.169.254/latest/meta-data',
+    'file:///etc/passwd',
+])
+def test_internal_image_urls_are_not_fetched(store, responses, url):
+    _, fetched = responses
+    store.schedule(url)
+    with pytest.raises(ValueError):
+        store._download(url)
+    assert fetched == []
+
+
+def test_redirects_to_internal_hosts_are_refused(store, responses):
+    served, fetched = responses
+    served[IMAGE_URL] = FakeResponse(302, {'Location': 'http://127.0.0.1/admin'})
+
+    with pytest.raises(ValueError, match='Not an allowed image URL'):
+        store._download(IMAGE_URL)
+    assert fetched == [IMAGE_URL]
+
+
+def test_non_images_and_oversized_images_are_refused(store, responses):
+    served, _ = responses
+    store.max_bytes = 1024
+
+    served[IMAGE_URL] = FakeResponse(headers={'Content-Type': 'text/html'}, body=b'<html>')
+    with pytest.raises(ValueError, match='Not an image'):
+        store._download(IMAGE_URL)
+
+    served[IMAGE_URL] = FakeResponse(headers={'Content-Type': 'image/jpeg', 'Content-Length': '4096'})
+    with pytest.raises(ValueError, match='larger than'):
+        store._download(IMAGE_URL)
+
+    # A missing or wrong Content-Length is caught while streaming
+    served[IMAGE_URL] = FakeResponse(headers={'Content-Type': 'image/jpeg'}, body=b'x' * 4096)
+    with pytest.raises(ValueError, match='larger than'):
+        store._download(IMAGE_URL)
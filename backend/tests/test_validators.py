@@ -0,0 +1,33 @@
+import pytest
+
+from app.utils.validators import is_public_url
+
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1:5001/hook',
+    'http://localhost/hook',
+    'http://10.0.0.5/hook',
+    'http://169.254.169.254/latest/meta-data',
+    'http://[::1]/hook',
+    'http://[::ffff:127.0.0.1]/hook',
+    'http://0.0.0.0/hook',
+    'ftp://93.184.216.34/hook',
+    'file:///etc/passwd',
+    'not a url',
+    None,
+])
+def test_internal_and_non_http_urls_are_rejected(url):
+    assert not is_public_url(url)
+
+
+def test_public_addresses_are_allowed():
+    assert is_public_url('http://93.184.216.34/hook')
+    assert is_public_url('https://8.8.8.8:8443/hook')
+
+
+def test_allowlist_matches_hosts_and_subdomains_only():
+    allowed = ['hooks.example.com']
+    assert is_public_url('https://hooks.example.com/done', allowed)
+    assert is_public_url('https://eu.hooks.example.com/done', allowed)
+    assert not is_public_url('https://evilhooks.example.com/done', allowed)
+    assert not is_public_url('https://93.184.216.34/done', allowed)
@@ -0,0 +1,96 @@
+"""Standalone scrape worker.
+
+Consumes the durable ``scrape_jobs`` queue that the web tier fills when
+``SCRAPE_JOBS_BACKEND=queue``. Each process has its own browser pool, so
+throughput scales by starting more workers, on this machine or others
+sharing the same ``DATABASE_URL``.
+
+With ``--scheduler`` the process also runs the periodic maintenance tasks
+(price refresh, order expiry). Run exactly one scheduler per deployment.
+
+Usage:
+    python3 worker.py [--concurrency N] [--scheduler]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import threading
+
+from app import create_app, db
+from app.services.job_queue import process_next_job
+from app.services.scheduler import PeriodicTask
+
+app = create_app()
+stopping = threading.Event()
+
+
+def work(worker_id, poll_interval):
+    """Lease and process jobs until the process is asked to stop."""
+    with app.app_context():
+        while not stopping.is_set():
+            try:
+                processed = process_next_job(worker_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Worker {worker_id} error: {str(e)}")
+                processed = False
+            finally:
+                db.session.remove()
+
+            if not processed:
+                stopping.wait(poll_interval)
+
+
+def periodic_tasks():
+    """Return the maintenance tasks enabled in the config."""
+    from app.services.order_expiry import order_expiry
+    from app.services.price_refresh import price_refresher
+
+    tasks = []
+    if app.config['PRICE_REFRESH_ENABLED']:
+        tasks.append(PeriodicTask('price-refresh', price_refresher.run_once,
+                                  app.config['PRICE_REFRESH_INTERVAL']))
+    if app.config['ORDER_EXPIRY_ENABLED']:
+        tasks.append(PeriodicTask('order-expiry', order_expiry.run_once,
+                                  app.config['ORDER_EXPIRY_INTERVAL']))
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run scrape queue workers.')
+    parser.add_argument('--concurrency', type=int, default=app.config['SCRAPE_WORKER_CONCURRENCY'],
+                        help='Jobs processed at the same time by this process')
+    parser.add_argument('--scheduler', action='store_true',
+                        help='Also run periodic maintenance tasks in this process')
+    args = parser.parse_args()
+
+    # Finish in-flight scrapes on Ctrl+C / SIGTERM instead of abandoning their leases
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=work, args=(f"{prefix}:{i}", app.config['SCRAPE_WORKER_POLL_INTERVAL']))
+        for i in range(args.concurrency)
+    ]
+    print(f"Starting {len(threads)} scrape worker thread(s) as {prefix}")
+    for thread in threads:
+        thread.start()
+
+    tasks = periodic_tasks() if args.scheduler else []
+    for task in tasks:
+        print(f"Starting periodic task {task.name} every {task.interval}s")
+        task.start(app)
+
+    while not stopping.is_set():
+        stopping.wait(1)
+    for task in tasks:
+        task.stop()
+    for thread in threads:
+        thread.join()
+
+
+if __name__ == '__main__':
+    main()
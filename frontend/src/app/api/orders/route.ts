@@ -2,17 +2,26 @@ import { NextResponse } from 'next/server';
 
 export async function GET() {
   try {
-    const response = await fetch('http://localhost:5001/orders/available', {
-      // removed credentials since endpoint is public
-      headers: { 'Content-Type': 'application/json' }
-    });
+    // The feed is paginated; follow X-Next-Cursor until the last page
+    const data: any[] = [];
+    let cursor: string | null = null;
+    do {
+      const params = new URLSearchParams({ limit: '200' });
+      if (cursor) params.set('cursor', cursor);
+      const response = await fetch(`http://localhost:5001/orders/available?${params}`, {
+        // removed credentials since endpoint is public
+        headers: { 'Content-Type': 'application/json' }
+      });
 
-    if (!response.ok) {
-      const errorText = await response.text();
-      throw new Error(errorText || 'Failed to fetch orders');
-    }
+      if (!response.ok) {
+        const errorText = await response.text();
+        throw new Error(errorText || 'Failed to fetch orders');
+      }
+
+      data.push(...(await response.json()));
+      cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
 
-    const data = await response.json();
     return NextResponse.json(data);
   } catch (err: any) {
     console.error('[API/orders] GET error:', err.message);
@@ -38,12 +38,20 @@ export default function Home() {
   const fetchOrders = async () => {
     try {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:5001';
-      const response = await fetch(`${apiUrl}/orders/available`);
-      if (!response.ok) {
-        const errText = await response.text();
-        throw new Error(errText || `HTTP ${response.status}`);
-      }
-      const data = await response.json();
+      // The feed is paginated; follow X-Next-Cursor until the last page
+      const data: any[] = [];
+      let cursor: string | null = null;
+      do {
+        const params = new URLSearchParams({ limit: '200' });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${apiUrl}/orders/available?${params}`);
+        if (!response.ok) {
+          const errText = await response.text();
+          throw new Error(errText || `HTTP ${response.status}`);
+        }
+        data.push(...(await response.json()));
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
       console.log('Fetched orders from backend:', data);
       
       // Map backend order format to frontend Order interface